@@ -0,0 +1,118 @@
+import time
+from random import randrange
+from typing import Callable
+
+from gmpy2 import mpz
+
+from extras.math_extras.elliptic_curve import *
+
+
+def legacy_scalar_mul_jacobian_point(curve: Curve, k: int, p: JacobianPointABC) -> JacobianPointABC:
+    """The implementation of `Curve.scalar_mul_jacobian_point` before wNAF, for comparison."""
+    if p.is_at_infinity():
+        return p
+    if k == 0:
+        return JacobianPoint(1, 1, 0)
+
+    accumulator = legacy_scalar_mul_jacobian_point(curve, k >> 1, curve.double_jacobian_point(p))
+    if k % 2 == 0:
+        return accumulator
+    if curve.eq_jacobian_points(p, accumulator):
+        return curve.double_jacobian_point(p)
+    return curve.add_jacobian_points(p, accumulator)
+
+
+curves = {
+    "P-256": (
+        Curve(
+            p=0xffffffff00000001000000000000000000000000ffffffffffffffffffffffff,
+            a=-3,
+            b=0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+        ),
+        AffinePoint(
+            0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+            0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5,
+        ),
+        0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551,
+    ),
+    "cryptography-ex101 q13": (Curve(p=16001, a=1, b=5), AffinePoint(1300, 16000), 16001),
+}
+repetitions = 200
+multiple_count = 2000
+operation_count = 20000
+
+
+def benchmark(name: str, curve: Curve, multiply: Callable[[int], JacobianPointABC], scalars: list[int]) -> None:
+    started_at = time.perf_counter()
+    for k in scalars:
+        curve.to_affine(multiply(k))
+    elapsed = time.perf_counter() - started_at
+    print(f"  {name:<24} {elapsed / len(scalars) * 1e6:9.1f}us/multiplication")
+
+
+def benchmark_operations(curve: Curve, g: AffinePoint) -> None:
+    """Compare a doubling and an addition through the dataclass API with the raw core, with ints and with mpzs."""
+    g_jacobian = curve.scale_z_jacobian_point(7, curve.to_jacobian(g))
+    h_jacobian = curve.double_jacobian_point(g_jacobian)
+    implementations = {
+        "Curve methods": (
+            lambda: curve.double_jacobian_point(g_jacobian),
+            lambda: curve.add_jacobian_points(g_jacobian, h_jacobian),
+        ),
+    }
+    for element_name, element_type in (("int", int), ("mpz", mpz)):
+        p, a = element_type(curve.p), element_type(curve.a)
+        g_raw = tuple(map(element_type, (g_jacobian.x, g_jacobian.y, g_jacobian.z)))
+        h_raw = tuple(map(element_type, (h_jacobian.x, h_jacobian.y, h_jacobian.z)))
+        implementations[f"raw ({element_name})"] = (
+            lambda g_raw=g_raw, p=p, a=a: raw_double(g_raw, p, a),
+            lambda g_raw=g_raw, h_raw=h_raw, p=p, a=a: raw_add(g_raw, h_raw, p, a),
+        )
+
+    for implementation_name, (double, add) in implementations.items():
+        timings = []
+        for operation in (double, add):
+            started_at = time.perf_counter()
+            for _ in range(operation_count):
+                operation()
+            timings.append((time.perf_counter() - started_at) / operation_count * 1e6)
+        print(f"  {implementation_name:<24} {timings[0]:9.2f}us/doubling {timings[1]:9.2f}us/addition")
+
+
+def main():
+    for curve_name, (curve, g, order_bound) in curves.items():
+        g_jacobian = curve.to_jacobian(g)
+        scalars = [randrange(1, order_bound) for _ in range(repetitions)]
+
+        started_at = time.perf_counter()
+        comb = FixedBaseComb(curve, g)
+        comb_precomputation = time.perf_counter() - started_at
+
+        implementations = {
+            "legacy": lambda k: legacy_scalar_mul_jacobian_point(curve, k, g_jacobian),
+            "sliding window": lambda k: curve.scalar_mul_jacobian_point_sliding_window(k, g_jacobian),
+            "wNAF": lambda k: curve.scalar_mul_jacobian_point(k, g_jacobian),
+            "fixed-base comb": comb.mul,
+        }
+        print(f"{curve_name} (comb table built in {comb_precomputation * 1000:.1f}ms):")
+        for implementation_name, multiply in implementations.items():
+            benchmark(implementation_name, curve, multiply, scalars)
+
+        started_at = time.perf_counter()
+        multiple = JacobianPoint(1, 1, 0)
+        for _ in range(multiple_count):
+            multiple = curve.add_jacobian_points(multiple, g_jacobian)
+            curve.to_affine(multiple)
+        elapsed = time.perf_counter() - started_at
+        print(f"  {'multiples (one by one)':<24} {elapsed / multiple_count * 1e6:9.1f}us/multiple")
+
+        started_at = time.perf_counter()
+        curve.multiples_of_affine_point(g, multiple_count)
+        elapsed = time.perf_counter() - started_at
+        print(f"  {'multiples (batched)':<24} {elapsed / multiple_count * 1e6:9.1f}us/multiple")
+
+        benchmark_operations(curve, g)
+
+
+if __name__ == "__main__":
+    main()
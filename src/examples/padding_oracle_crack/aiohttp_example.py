@@ -17,7 +17,8 @@ from urllib.parse import unquote_plus as urlunquote, quote_plus as urlquote
 
 import aiohttp
 
-from utils.padding_oracle_crack import PaddingOracleCracker
+from utils.http_oracle import AiohttpTransport, HttpOracle, HttpOracleRequest, json_classifier
+from utils.padding_oracle_crack import BoundedOracleScheduler, PaddingOracleCracker
 
 service_origin = "http://localhost:3000"
 # service_origin = "http://challenge.ctf.games:31283"  # from https://snyk.ctf.games/challenges
@@ -33,33 +34,35 @@ async def get_token(session: aiohttp.ClientSession) -> (bytes, bytes):
     return iv, ciphertext
 
 
-async def try_token(session: aiohttp.ClientSession, iv: bytes, ciphertext: bytes) -> bool:
+def submit_token_request(iv: bytes, ciphertext: bytes) -> HttpOracleRequest:
     token_base64 = base64.b64encode(iv + ciphertext).decode("utf-8")
     token_base64_urlencoded = urlquote(token_base64)
-    response = await session.post(f"{service_origin}/api/submit/{token_base64_urlencoded}")
-    body = await response.json()
-    if body["error"] == 'Missing code in request body':
-        return True
-    return False
+    return HttpOracleRequest("POST", f"{service_origin}/api/submit/{token_base64_urlencoded}")
+
+
+# the service only complains about the missing code once it has successfully decrypted the token
+classify_response = json_classifier(lambda body: body["error"] == 'Missing code in request body')
 
 
 async def sanity_check():
     async with aiohttp.ClientSession() as session:
         iv, ciphertext = await get_token(session)
-        assert await try_token(session, iv, ciphertext)
+    async with HttpOracle(submit_token_request, classify_response) as oracle:
+        assert await oracle(iv, ciphertext)
 
 
 asyncio.run(sanity_check())
 
 
 async def main():
-    async def oracle(iv: bytes, ciphertext: bytes) -> bool:
-        nonlocal session
-        return await try_token(session, iv, ciphertext)
-
     async with aiohttp.ClientSession() as session:
         iv, ciphertext = await get_token(session)
-        cracker = PaddingOracleCracker(iv, ciphertext, oracle)
+
+    # keep the number of concurrent requests within what the service can sustain, over as many kept-alive connections
+    transport = AiohttpTransport(max_connections=32)
+    async with HttpOracle(submit_token_request, classify_response, transport=transport) as oracle:
+        scheduler = BoundedOracleScheduler(max_in_flight=32)
+        cracker = PaddingOracleCracker(iv, ciphertext, oracle, scheduler=scheduler)
         plaintext = await cracker.crack_plaintext()
     print(plaintext.decode("utf-8"))
 
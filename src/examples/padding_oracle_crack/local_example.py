@@ -29,7 +29,8 @@ asyncio.run(sanity_check())
 
 
 async def main():
-    cracker = PaddingOracleCracker(iv, ciphertext, oracle)
+    # work out the block length and padding scheme, as if they were unknown
+    cracker = await PaddingOracleCracker.from_token(iv + ciphertext, oracle)
     round_trip_plaintext = await cracker.crack_plaintext()
     round_trip_message = round_trip_plaintext.decode("ascii")
     print(round_trip_message)
@@ -0,0 +1,30 @@
+import asyncio
+
+from utils.padding_oracle_crack import PaddingOracleForger
+from utils.simple_crypto import SimpleCrypto
+
+
+crypto = SimpleCrypto()
+message = '{"username": "admin", "is_admin": true}'
+plaintext = message.encode("ascii")
+
+
+async def oracle(iv: bytes, ciphertext: bytes) -> bool:
+    global crypto
+    await asyncio.sleep(0.0005)  # to simulate delay of e.g. performing HTTP request
+    try:
+        crypto.decrypt(iv, ciphertext)
+    except (ValueError, AssertionError):
+        return False
+    return True
+
+
+async def main():
+    forger = PaddingOracleForger(plaintext, oracle)
+    iv, ciphertext = await forger.forge()
+    round_trip_message = crypto.decrypt(iv, ciphertext).decode("ascii")
+    print(round_trip_message)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+import asyncio
+import random
+
+from utils.padding_oracle_crack import (
+    BoundedOracleScheduler,
+    PaddingOracleCracker,
+    TimingPaddingOracle,
+    timed,
+)
+from utils.simple_crypto import SimpleCrypto
+
+
+crypto = SimpleCrypto()
+message = "a timing side channel"
+plaintext = message.encode("ascii")
+iv, ciphertext = crypto.encrypt(plaintext)
+
+
+async def request(iv: bytes, ciphertext: bytes) -> None:
+    """The service answers every query the same way, but takes a little longer over correctly padded ones."""
+    global crypto
+    delay = 0.005 + random.expovariate(1 / 0.001)  # to simulate delay of e.g. performing HTTP request
+    try:
+        crypto.decrypt(iv, ciphertext)
+    except (ValueError, AssertionError):
+        pass
+    else:
+        delay += 0.002  # to simulate e.g. the service going on to parse the plaintext
+    await asyncio.sleep(delay)
+
+
+async def main():
+    oracle = await TimingPaddingOracle.calibrated(timed(request), iv, ciphertext)
+    print(oracle.calibration)
+    # too many concurrent requests would drown the timing difference in scheduling noise
+    scheduler = BoundedOracleScheduler(max_in_flight=16)
+    cracker = PaddingOracleCracker(iv, ciphertext, oracle, scheduler=scheduler, wave_size=4)
+    round_trip_plaintext = await cracker.crack_plaintext()
+    round_trip_message = round_trip_plaintext.decode("ascii")
+    print(round_trip_message)
+    print(f"{oracle.mean_samples_per_decision:.1f} samples per decision")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
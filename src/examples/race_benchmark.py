@@ -0,0 +1,93 @@
+import asyncio
+import time
+from random import randrange
+from typing import Awaitable, Callable, Iterable
+
+from extras import asyncio_extras
+from extras.asyncio_extras.state import has_succeeded
+
+
+async def legacy_race_predicate[T](
+    predicate: Callable[[asyncio.Future[T]], bool],
+    awaitables: Iterable[Awaitable[T]],
+) -> T:
+    """The implementation of `asyncio_extras.race_predicate` before lazy waves and abort tokens, for comparison."""
+    futures = {asyncio.ensure_future(awaitable) for awaitable in set(awaitables)}
+    try:
+        async for future in asyncio.as_completed(futures):
+            if not predicate(future):
+                continue
+
+            result = await future
+            break
+        else:
+            raise BaseExceptionGroup(
+                'no completed future was satisfactory in asyncio_extras.race_predicate',
+                [task.exception() for task in futures]
+            )
+    finally:
+        for future in futures:
+            future.cancel()
+
+        await asyncio.gather(*futures, return_exceptions=True)  # exceptions are silenced
+    return result
+
+
+contestant_count = 256
+repetitions = 200
+latency = 0.001
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.sent = 0
+
+
+async def contestant(index: int, winner_index: int, counter: Counter) -> int:
+    await asyncio.sleep(0)
+    # what an oracle would do before sending its request
+    asyncio_extras.raise_if_race_aborted()
+    counter.sent += 1
+    await asyncio.sleep(latency)
+    if index != winner_index:
+        raise ValueError
+    return index
+
+
+async def benchmark(
+    name: str,
+    race: Callable[[Iterable[Awaitable[int]]], Awaitable[int]],
+    choose_winner: Callable[[], int],
+) -> None:
+    counter = Counter()
+    started_at = time.perf_counter()
+    for _ in range(repetitions):
+        winner_index = choose_winner()
+        result = await race(contestant(index, winner_index, counter) for index in range(contestant_count))
+        assert result == winner_index
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"  {name:<24} {elapsed / repetitions * 1000:7.2f}ms/race, "
+        f"{counter.sent / repetitions:6.1f} requests sent/race"
+    )
+
+
+async def main():
+    scenarios = {
+        "winner at random position": lambda: randrange(contestant_count),
+        "winner first": lambda: 0,
+    }
+    implementations = {
+        "legacy": lambda awaitables: legacy_race_predicate(has_succeeded, awaitables),
+        "lazy": lambda awaitables: asyncio_extras.race_predicate(has_succeeded, awaitables),
+        "lazy (waves of 16)": lambda awaitables: asyncio_extras.race_predicate(has_succeeded, awaitables, wave_size=16),
+    }
+
+    for scenario_name, choose_winner in scenarios.items():
+        print(f"{contestant_count} contestants, {scenario_name}:")
+        for implementation_name, race in implementations.items():
+            await benchmark(implementation_name, race, choose_winner)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,37 +1,142 @@
 import asyncio
-from typing import Awaitable, Callable, Iterable
+import contextvars
+from inspect import iscoroutine
+from itertools import islice
+from typing import Awaitable, Callable, Iterable, Iterator
 
 from .state import has_succeeded
 
 
-async def race_predicate[T](predicate: Callable[[asyncio.Future[T]], bool], awaitables: Iterable[Awaitable[T]]) -> T:
-    futures = {asyncio.ensure_future(awaitable) for awaitable in set(awaitables)}
-    try:
-        async for future in asyncio.as_completed(futures):
-            if not predicate(future):
-                continue
+class RaceAbortedException(Exception):
+    """The race this contestant belongs to has already been decided."""
+
+
+class AbortToken:
+    """
+    A cooperative signal that a race has been decided.
+
+    Cancellation only takes effect when a contestant next yields to the event loop; contestants which are about to do
+    something expensive or irreversible (e.g. send a request) can check the token of their race beforehand.
+    """
+
+    __slots__ = ("_aborted",)
+
+    def __init__(self) -> None:
+        self._aborted = False
+
+    @property
+    def aborted(self) -> bool:
+        return self._aborted
+
+    def abort(self) -> None:
+        self._aborted = True
+
+    def raise_if_aborted(self) -> None:
+        if self._aborted:
+            raise RaceAbortedException
+
+
+_current_abort_token = contextvars.ContextVar[AbortToken | None]("current_abort_token", default=None)
+
+
+def current_abort_token() -> AbortToken | None:
+    """Return the abort token of the race that the calling task is a contestant in, if any."""
+    return _current_abort_token.get()
 
-            result = await future
-            break
+
+def raise_if_race_aborted() -> None:
+    """Raise `RaceAbortedException` if the calling task is a contestant in a race which has already been decided."""
+    token = _current_abort_token.get()
+    if token is not None:
+        token.raise_if_aborted()
+
+
+async def race_predicate[T](
+    predicate: Callable[[asyncio.Future[T]], bool],
+    awaitables: Iterable[Awaitable[T]],
+    *,
+    wave_size: int = None,
+) -> T:
+    """
+    Return the result of the first awaitable to complete in a way that satisfies `predicate`.
+
+    Tasks are created lazily, in order: when `wave_size` is given, at most that many awaitables are started at once,
+    and the next wave is only started once every awaitable in the current wave has completed unsatisfactorily.
+    Once the race is decided, the contestants' abort token is set and any contestants still running are cancelled.
+
+    If no awaitable is satisfactory, a `BaseExceptionGroup` of the contestants' exceptions is raised.
+    """
+    if wave_size is not None:
+        assert wave_size >= 1
+
+    abort_token = AbortToken()
+    contestant_context = contextvars.copy_context()
+    contestant_context.run(_current_abort_token.set, abort_token)
+
+    awaitable_iterator: Iterator[Awaitable[T]] = iter(awaitables)
+    running: set[asyncio.Future[T]] = set()
+    completed = asyncio.Queue[asyncio.Future[T]]()
+    exceptions: list[BaseException] = []
+
+    def start(awaitable: Awaitable[T]) -> None:
+        if iscoroutine(awaitable):
+            future = asyncio.create_task(awaitable, context=contestant_context.copy())
         else:
-            raise BaseExceptionGroup(
-                'no completed future was satisfactory in asyncio_extras.race_predicate',
-                [task.exception() for task in futures]
-            )
+            future = asyncio.ensure_future(awaitable)
+        if future in running:
+            return
+        running.add(future)
+        future.add_done_callback(completed.put_nowait)
+
+    def start_wave() -> bool:
+        wave = awaitable_iterator if wave_size is None else islice(awaitable_iterator, wave_size)
+        for awaitable in wave:
+            start(awaitable)
+        return len(running) > 0
+
+    try:
+        while running or start_wave():
+            future = await completed.get()
+            running.discard(future)
+            if predicate(future):
+                return future.result()
+            if not future.cancelled() and (exception := future.exception()) is not None:
+                exceptions.append(exception)
+
+        if not exceptions:
+            raise ValueError("no awaitable was satisfactory in asyncio_extras.race_predicate")
+        raise BaseExceptionGroup(
+            'no completed future was satisfactory in asyncio_extras.race_predicate',
+            exceptions,
+        )
     finally:
-        for future in futures:
+        abort_token.abort()
+        # only contestants which were started are cancelled; the rest of `awaitables` (which may be endless) is left
+        # alone, so that its lazily-made awaitables are never made
+        for future in running:
             future.cancel()
 
-        await asyncio.gather(*futures, return_exceptions=True)  # exceptions are silenced
-    return result
+        if running:
+            await asyncio.wait(running)
+            for future in running:
+                if not future.cancelled():
+                    future.exception()  # exceptions are silenced
 
 
-async def race[T](awaitables: Iterable[Awaitable[T]]) -> T:
-    return await race_predicate(lambda _: True, awaitables)
+async def race[T](awaitables: Iterable[Awaitable[T]], *, wave_size: int = None) -> T:
+    return await race_predicate(lambda _: True, awaitables, wave_size=wave_size)
 
 
-async def race_success[T](awaitables: Iterable[Awaitable[T]]) -> T:
-    return await race_predicate(has_succeeded, awaitables)
+async def race_success[T](awaitables: Iterable[Awaitable[T]], *, wave_size: int = None) -> T:
+    return await race_predicate(has_succeeded, awaitables, wave_size=wave_size)
 
 
-__all__ = ("race", "race_predicate", "race_success",)
+__all__ = (
+    "AbortToken",
+    "RaceAbortedException",
+    "current_abort_token",
+    "raise_if_race_aborted",
+    "race",
+    "race_predicate",
+    "race_success",
+)
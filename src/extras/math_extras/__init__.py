@@ -1,5 +1,7 @@
+from .batch_inversion import *
 from .chinese_remainder_theorem import *
 from .extended_euclidian_algorithm import *
 from .isqrt import *
 from .primality import *
 from .prime_sieve import *
+from .prime_table import *
@@ -0,0 +1,30 @@
+from operator import index
+from typing import Iterable, SupportsIndex
+
+
+def batch_mod_inverse(values: Iterable[SupportsIndex], mod: SupportsIndex) -> list[int]:
+    """
+    Invert many values modulo `mod` at the cost of a single modular inversion and 3(n - 1) multiplications, using
+    Montgomery's trick: invert the product of all the values, then peel each inverse off the running products.
+
+    Raises ValueError if any value is not invertible modulo `mod` (without identifying which).
+    """
+    mod = index(mod)
+    values = [index(value) % mod for value in values]
+    if not values:
+        return []
+
+    prefix_products = [values[0]]
+    for value in values[1:]:
+        prefix_products.append((prefix_products[-1] * value) % mod)
+
+    inverse = pow(prefix_products[-1], -1, mod)
+    inverses = [0] * len(values)
+    for i in range(len(values) - 1, 0, -1):
+        inverses[i] = (inverse * prefix_products[i - 1]) % mod
+        inverse = (inverse * values[i]) % mod
+    inverses[0] = inverse
+    return inverses
+
+
+__all__ = ("batch_mod_inverse",)
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from functools import reduce
-from typing import Iterable
+from math import gcd
+from typing import Generator, Iterable
 
 from .extended_euclidian_algorithm import extended_euclidian_algorithm
 
@@ -31,4 +32,16 @@ def solve_congruences(congruences: Iterable[Congruence]) -> int:
     return total_congruence.value % total_congruence.modulus
 
 
-__all__ = ("Congruence", "reduce_congruences", "solve_congruences",)
+def solve_linear_congruence(a: int, b: int, modulus: int) -> Generator[int]:
+    """Yield every k (mod `modulus`) such that a k = b (mod `modulus`)."""
+    divisor = gcd(a, modulus)
+    if b % divisor != 0:
+        return
+    reduced_modulus = modulus // divisor
+    k = ((b // divisor) * pow(a // divisor, -1, reduced_modulus)) % reduced_modulus
+    for _ in range(divisor):
+        yield k
+        k += reduced_modulus
+
+
+__all__ = ("Congruence", "reduce_congruences", "solve_congruences", "solve_linear_congruence",)
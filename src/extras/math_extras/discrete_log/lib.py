@@ -1,6 +1,7 @@
 from typing import NamedTuple, Self
 
 from toy_cryptography.dh.params import DiffieHellmanParams
+from toy_cryptography.dsa.params import DSAParams
 
 
 class Group(NamedTuple):
@@ -12,5 +13,10 @@ class Group(NamedTuple):
     def from_dhparams(cls, params: DiffieHellmanParams) -> Self:
         return cls(params.prime, params.generator, params.prime - 1)
 
+    @classmethod
+    def from_dsaparams(cls, params: DSAParams) -> Self:
+        """the subgroup of prime order q generated by g"""
+        return cls(params.p, params.g, params.q)
+
 
 __all__ = ("Group",)
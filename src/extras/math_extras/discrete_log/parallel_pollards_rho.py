@@ -0,0 +1,128 @@
+"""
+https://en.wikipedia.org/wiki/Pollard%27s_rho_algorithm_for_logarithms, parallelised by van Oorschot and Wiener's
+method of distinguished points: https://doi.org/10.1007/s001459900030
+
+Every walk uses the same r-adding iteration x -> x M_i, where i is given by the low bits of x and each multiplier M_i =
+g^(c_i) h^(d_i) is precomputed, so walks which meet merge for good. A walk runs until it reaches a 'distinguished'
+point (one whose next few bits are zero), which is reported to a central table along with the walk's starting
+exponents; when two walks starting from different exponents report the same distinguished point, both are replayed to
+recover their exponents at it, and the logarithm follows. Walks therefore only multiply during the search, which
+parallelises across processes with no communication besides the (rare) distinguished points.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from random import randrange
+
+from extras.math_extras.chinese_remainder_theorem import solve_linear_congruence
+from extras.math_extras.discrete_log.lib import Group
+from extras.math_extras.discrete_log.walk import (
+    DistinguishedPoint,
+    Walker,
+    max_steps_per_sqrt_order,
+    partition_count,
+    replay,
+)
+from extras.math_extras.isqrt import isqrt_ceil
+
+
+def parallel_pollard_rho_discrete_log(
+    group: Group,
+    group_element: int,
+    *,
+    max_workers: int = None,
+    distinguishing_bits: int = None,
+    steps_per_task: int = 1 << 16,
+) -> int:
+    """
+    Find k such that g^k = h (mod p), where g has order `group.order` (ideally prime), by parallel collision search
+    over `max_workers` processes (by default, one per CPU), or in this process if `max_workers` is 1.
+
+    Each process runs `steps_per_task` steps at a time before reporting its distinguished points, so that the search
+    stops soon after a collision. By default, a fraction of about 2^-distinguishing_bits of points are distinguished,
+    such that each process finds a few dozen distinguished points in the expected sqrt(pi n / 2) steps in total.
+
+    :raise Exception: if no solution is found in `max_steps_per_sqrt_order` * sqrt(n) steps (as when h is not in the
+        subgroup generated by g)
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    modulus, generator, order = group.modulus, group.generator % group.modulus, group.order
+    group_element %= modulus
+    if group_element == 1:
+        return 0
+    if order <= partition_count:
+        return next(k for k in range(order) if pow(generator, k, mod=modulus) == group_element)
+
+    if distinguishing_bits is None:
+        distinguishing_bits = max(0, (isqrt_ceil(order) // (32 * max_workers)).bit_length() - 1)
+    exponents = tuple((randrange(order), randrange(order)) for _ in range(partition_count))
+    multipliers = tuple(
+        (pow(generator, c, mod=modulus) * pow(group_element, d, mod=modulus)) % modulus for c, d in exponents
+    )
+    walker = Walker(
+        modulus,
+        order,
+        generator,
+        group_element,
+        multipliers,
+        (1 << distinguishing_bits) - 1,
+        20 << distinguishing_bits,
+    )
+
+    distinguished_points: dict[int, DistinguishedPoint] = {}
+
+    def check(point: DistinguishedPoint) -> int | None:
+        other = distinguished_points.setdefault(point.value, point)
+        if other is point or other.start == point.start:
+            return None
+        a, b = replay(walker, exponents, point)
+        other_a, other_b = replay(walker, exponents, other)
+        # g^a h^b = g^a' h^b', so (b - b') k = a' - a (mod n)
+        coefficient = (b - other_b) % order
+        if coefficient == 0:
+            # the collision tells us nothing about k (and every k would be a candidate)
+            return None
+        for k in solve_linear_congruence(coefficient, (other_a - a) % order, order):
+            if pow(generator, k, mod=modulus) == group_element:
+                return k
+        return None
+
+    max_step_count = max_steps_per_sqrt_order * isqrt_ceil(order)
+    step_count = 0
+    no_solution = Exception(
+        f"No solution found. Prime: {group.modulus}; Generator: {group.generator}; Group element: {group_element}"
+    )
+
+    if max_workers == 1:
+        state = None
+        while step_count < max_step_count:
+            found, state = walker.walk(state, steps_per_task, randrange(1 << 64))
+            step_count += steps_per_task
+            for point in found:
+                k = check(point)
+                if k is not None:
+                    return k
+        raise no_solution
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        futures: set[Future] = {
+            executor.submit(walker.walk, None, steps_per_task, randrange(1 << 64)) for _ in range(max_workers)
+        }
+        try:
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found, state = future.result()
+                    step_count += steps_per_task
+                    for point in found:
+                        k = check(point)
+                        if k is not None:
+                            return k
+                    if step_count + len(futures) * steps_per_task < max_step_count:
+                        futures.add(executor.submit(walker.walk, state, steps_per_task, randrange(1 << 64)))
+            raise no_solution
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+__all__ = ("parallel_pollard_rho_discrete_log",)
@@ -1,13 +1,23 @@
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
 from typing import NamedTuple
 
 from extras.math_extras.chinese_remainder_theorem import Congruence, solve_congruences
 from extras.math_extras.discrete_log.lib import Group
+from extras.math_extras.discrete_log.parallel_pollards_rho import parallel_pollard_rho_discrete_log
 from extras.math_extras.discrete_log.pollards_rho import pollard_rho_discrete_log
 from extras.math_extras.discrete_log.shanks import shanks_discrete_log
 from extras.math_extras.factorise import prime_factorise
+from utils.typedefs.factorise import PrimeFactorisation
 
 
-def basic_discrete_log_for_group_of_prime_order(group: Group, group_element: int) -> int:
+_parallel_min_order_bit_length = 40
+
+
+def basic_discrete_log_for_group_of_prime_order(group: Group, group_element: int, *, max_workers: int = None) -> int:
+    if group.order.bit_length() >= _parallel_min_order_bit_length:
+        return parallel_pollard_rho_discrete_log(group, group_element, max_workers=max_workers)
     if group.order >= 100:
         return pollard_rho_discrete_log(group, group_element)
     return shanks_discrete_log(group, group_element)
@@ -24,8 +34,17 @@ class GroupOfPrimePowerOrder(NamedTuple):
     order: PrimePower
 
 
+@functools.cache
+def factorise_group_order(order: int) -> tuple[PrimePower, ...]:
+    """
+    The prime factorisation of a group order, memoised: the same group (and so the same order) tends to be attacked
+    repeatedly, and factorising its order can take far longer than the discrete logarithms themselves.
+    """
+    return tuple(PrimePower(prime, exponent) for prime, exponent in sorted(prime_factorise(order).items()))
+
+
 def pohlig_hellman_discrete_log_for_group_of_prime_power_order(
-    group: GroupOfPrimePowerOrder, group_element: int
+    group: GroupOfPrimePowerOrder, group_element: int, *, max_workers: int = None
 ) -> int:
     """
     https://en.wikipedia.org/wiki/Pohlig%E2%80%93Hellman_algorithm#Groups_of_prime-power_order
@@ -40,35 +59,78 @@ def pohlig_hellman_discrete_log_for_group_of_prime_power_order(
             pow(group.order.prime, group.order.exponent - 1 - k), mod=group.modulus
         )
         subproblem_group_element_discrete_log = basic_discrete_log_for_group_of_prime_order(
-            subproblem_group, subproblem_group_element
+            subproblem_group, subproblem_group_element, max_workers=max_workers
         )
         x += pow(group.order.prime, k) * subproblem_group_element_discrete_log
-        x %= group.modulus
     return x
 
 
-def pohlig_hellman_discrete_log(group: Group, group_element: int) -> int:
+def _solve_subproblem(group: GroupOfPrimePowerOrder, group_element: int) -> int:
+    # in a worker process, which is one of several already, so solve in-process
+    return pohlig_hellman_discrete_log_for_group_of_prime_power_order(group, group_element, max_workers=1)
+
+
+def pohlig_hellman_discrete_log(
+    group: Group,
+    group_element: int,
+    factorisation: PrimeFactorisation = None,
+    *,
+    max_workers: int = None,
+) -> int:
     """
     Solves an instance of the discrete logarithm problem:
-    Given a (large) prime $p$, a generator $g$ for the multiplicative group of integers modulo $p$,
-    and a group element $A$, find the exponent $a$ which satisfies $g^a = A mod p$.
+    Given a prime $p$, a group element $g$ whose multiplicative order modulo $p$ is $n$ (`group.order`, e.g. $p - 1$
+    for a primitive root, or $q$ for a DSA subgroup generator), and a power $A$ of $g$, find the exponent $a$ (modulo
+    $n$) which satisfies $g^a = A mod p$.
+
+    The factorisation of $n$ is cached between calls (see `factorise_group_order`) unless given. The subproblems in
+    the subgroups of prime-power order are independent, so those of large enough order are solved concurrently across
+    `max_workers` processes (by default, one per CPU), and their solutions then combined by the Chinese remainder
+    theorem. A single large subproblem is instead solved by parallel collision search.
     """
-    assert group.order == group.modulus - 1
-    factorisation = prime_factorise(group.order)
-    congruences = []
-    for prime_factor, exponent in factorisation.items():
-        q = pow(prime_factor, exponent)
-        magic_number = group.order // q
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if factorisation is None:
+        prime_powers = factorise_group_order(group.order)
+    else:
+        prime_powers = tuple(PrimePower(prime, exponent) for prime, exponent in factorisation.items())
+
+    subproblems = []
+    for prime_factor, exponent in prime_powers:
+        magic_number = group.order // pow(prime_factor, exponent)
         subproblem_generator = pow(group.generator, magic_number, mod=group.modulus)
         subproblem_group = GroupOfPrimePowerOrder(
             group.modulus, subproblem_generator, PrimePower(prime_factor, exponent)
         )
         subproblem_group_element = pow(group_element, magic_number, mod=group.modulus)
-        congruence_value = pohlig_hellman_discrete_log_for_group_of_prime_power_order(
-            subproblem_group, subproblem_group_element
-        )
-        congruences.append(Congruence(congruence_value, q))
-    return solve_congruences(congruences)
+        subproblems.append((subproblem_group, subproblem_group_element))
+
+    def is_large(subproblem: tuple[GroupOfPrimePowerOrder, int]) -> bool:
+        return subproblem[0].order.prime.bit_length() >= _parallel_min_order_bit_length
+
+    congruence_values = {}
+    large_subproblem_indices = [index for index, subproblem in enumerate(subproblems) if is_large(subproblem)]
+    if max_workers > 1 and len(large_subproblem_indices) > 1:
+        with ProcessPoolExecutor(min(max_workers, len(large_subproblem_indices))) as executor:
+            futures = {
+                index: executor.submit(_solve_subproblem, *subproblems[index]) for index in large_subproblem_indices
+            }
+            for index, subproblem in enumerate(subproblems):
+                if index not in futures:
+                    congruence_values[index] = _solve_subproblem(*subproblem)
+            for index, future in futures.items():
+                congruence_values[index] = future.result()
+    else:
+        for index, subproblem in enumerate(subproblems):
+            congruence_values[index] = pohlig_hellman_discrete_log_for_group_of_prime_power_order(
+                *subproblem, max_workers=max_workers
+            )
+
+    congruences = [
+        Congruence(congruence_values[index], pow(*subproblem_group.order))
+        for index, (subproblem_group, _) in enumerate(subproblems)
+    ]
+    return solve_congruences(congruences) if congruences else 0
 
 
-__all__ = ("pohlig_hellman_discrete_log",)
+__all__ = ("factorise_group_order", "pohlig_hellman_discrete_log")
@@ -1,48 +1,116 @@
-from typing import Iterable, TypeAlias
+from typing import Generator, NamedTuple, Self
+
+import numpy as np
 
 from extras.math_extras.discrete_log.lib import Group
 from extras.math_extras.isqrt import isqrt_ceil
 
-StepLookup: TypeAlias = dict[int, int]  # a mapping of value: step number
+_block_length = 1 << 14
+_bytes_per_baby_step = 20  # an 8-byte key and a 4-byte exponent, plus 8 bytes for the exponents while sorting
+_key_mask = (1 << 64) - 1
+
+
+def _geometric_blocks(first: int, ratio: int, count: int, modulus: int) -> Generator[np.ndarray]:
+    """
+    Yield the `count` terms first, first r, first r^2, ... modulo `modulus`, in blocks. After the first block, each
+    block is the previous block times r^(block length), so the multiplications are vectorised: in uint64 arrays if the
+    products fit, and otherwise in object arrays (of Python ints), which at least avoid the interpreter's overhead.
+    """
+    length = min(_block_length, count)
+    block = np.empty(length, dtype=np.uint64 if modulus < (1 << 32) else object)
+    term = first % modulus
+    for i in range(length):
+        block[i] = term
+        term = (term * ratio) % modulus
+    stride = pow(ratio, length, mod=modulus)
+
+    for start in range(0, count, length):
+        yield block[:count - start]
+        block = (block * stride) % modulus
+
+
+def _keys(block: np.ndarray) -> np.ndarray:
+    """the low 64 bits of each group element"""
+    if block.dtype == np.uint64:
+        return block
+    return (block & _key_mask).astype(np.uint64)
+
+
+class BabyStepTable(NamedTuple):
+    """
+    The baby steps g^j (0 <= j < m) of baby-step giant-step, as a sorted NumPy array of 64-bit keys (the low bits of
+    each step), with a parallel array of their exponents j: about 12 bytes each, rather than ~100 for a dict of ints.
+    """
+    keys: np.ndarray
+    exponents: np.ndarray
+
+    @property
+    def length(self) -> int:
+        return len(self.keys)
 
+    @classmethod
+    def build(cls, group: Group, length: int) -> Self:
+        modulus, generator = group.modulus, group.generator % group.modulus
+        keys = np.empty(length, dtype=np.uint64)
+        position = 0
+        for block in _geometric_blocks(1, generator, length, modulus):
+            keys[position:position + len(block)] = _keys(block)
+            position += len(block)
+        exponents = np.argsort(keys)
+        keys.sort()
+        return cls(keys, exponents.astype(np.uint32 if length <= (1 << 32) else np.uint64))
 
-def shanks_discrete_log(group: Group, group_element: int) -> int:
-    m = isqrt_ceil(int(group.order))
+    def search(self, group: Group, group_element: int) -> int | None:
+        """
+        Giant steps h g^(-m i) are computed and looked up (by binary search) a block at a time, and any match is
+        checked, since keys are truncated.
 
-    def generate_giant_steps() -> Iterable[int]:
-        nonlocal m
+        :return: k such that g^k = h (mod p), or None if h is not a power of g
+        """
+        modulus, generator, order = group.modulus, group.generator % group.modulus, group.order
+        group_element %= modulus
+        keys, exponents, table_length = self.keys, self.exponents, self.length
 
-        giant_step = pow(group.generator, m, mod=group.modulus)
-        cursor = 1
-        yield cursor
-        for step_count in range(1, m):
-            cursor = (cursor * giant_step) % group.modulus
-            yield cursor
+        giant_step_count = -(-order // table_length)
+        giant_step = pow(generator, -table_length, mod=modulus)
+        i = 0
+        for block in _geometric_blocks(group_element, giant_step, giant_step_count, modulus):
+            block_keys = _keys(block)
+            positions = np.minimum(np.searchsorted(keys, block_keys), table_length - 1)
+            for offset in np.flatnonzero(keys[positions] == block_keys):
+                position = int(positions[offset])
+                # h g^(-m i) = g^j, so h = g^(m i + j)
+                while position < table_length and keys[position] == block_keys[offset]:
+                    k = ((i + int(offset)) * table_length + int(exponents[position])) % order
+                    if pow(generator, k, mod=modulus) == group_element:
+                        return k
+                    position += 1
+            i += len(block)
+        return None
 
-    def generate_baby_steps() -> Iterable[int]:
-        generator_inverse = pow(group.generator, -1, mod=group.modulus)
-        cursor = group_element
-        yield cursor
-        for step_count in range(1, m):
-            cursor = (cursor * generator_inverse) % group.modulus
-            yield cursor
 
-    giant_step_lookup: StepLookup = {}
-    for giant_step_count, giant_step_group_element in enumerate(generate_giant_steps()):
-        if giant_step_group_element in giant_step_lookup:
-            break  # a cycle has been entered
-        giant_step_lookup[giant_step_group_element] = giant_step_count
+def baby_step_count(order: int, memory_budget: int, query_count: int = 1) -> int:
+    """
+    :return: the number m of baby steps minimising the total cost m + q n / m of q logarithms in a group of order n,
+        m = sqrt(q n), unless the table would exceed `memory_budget` bytes
+    """
+    return min(isqrt_ceil(order * query_count), order, max(1, memory_budget // _bytes_per_baby_step))
 
-    for baby_step_count, baby_step_group_element in enumerate(generate_baby_steps()):
-        giant_step_count = giant_step_lookup.get(baby_step_group_element, None)
-        if giant_step_count is None:
-            continue
 
-        return (m * giant_step_count + baby_step_count) % (group.modulus - 1)
+def shanks_discrete_log(group: Group, group_element: int, *, memory_budget: int = 1 << 30) -> int:
+    """
+    https://en.wikipedia.org/wiki/Baby-step_giant-step
 
-    raise Exception(
-        f"No solution found. Prime: {group.modulus}; Generator: {group.generator}; Group element: {group_element}"
-    )
+    Normally m = ceil(sqrt(n)); if the table of baby steps (see `BabyStepTable`) would exceed `memory_budget` bytes, m
+    is reduced to fit, at the cost of proportionately more giant steps (n / m of them).
+    """
+    table = BabyStepTable.build(group, baby_step_count(group.order, memory_budget))
+    k = table.search(group, group_element)
+    if k is None:
+        raise Exception(
+            f"No solution found. Prime: {group.modulus}; Generator: {group.generator}; Group element: {group_element}"
+        )
+    return k
 
 
-__all__ = ("shanks_discrete_log",)
+__all__ = ("BabyStepTable", "baby_step_count", "shanks_discrete_log",)
@@ -0,0 +1,195 @@
+"""
+Many discrete logarithms to the same base, e.g. of the public keys of many parties sharing Diffie-Hellman parameters,
+with the precomputation shared between them.
+"""
+from pathlib import Path
+from random import randrange
+from typing import Self
+
+import numpy as np
+
+from extras.math_extras.chinese_remainder_theorem import solve_linear_congruence
+from extras.math_extras.discrete_log.lib import Group
+from extras.math_extras.discrete_log.walk import (
+    DistinguishedPoint,
+    Walker,
+    WalkStart,
+    max_steps_per_sqrt_order,
+    partition_count,
+    replay,
+)
+from extras.math_extras.discrete_log.shanks import BabyStepTable, baby_step_count
+from extras.math_extras.isqrt import isqrt_ceil
+
+
+class DiscreteLogSolver:
+    """
+    Find logarithms to the base `group.generator` by one of two methods, each of whose precomputation is done once and
+    may be saved to (and loaded from) a file:
+
+    - `shanks_log`: baby-step giant-step with a single table of baby steps, of length sqrt(q n) for q expected queries,
+      so that each query then takes sqrt(n / q) giant steps;
+    - `rho_log`: Pollard's rho, with the Kuhn-Struik reuse of distinguished points
+      (https://doi.org/10.1007/3-540-45537-X_17). Walks use multipliers which are powers of g alone, so every walk,
+      whatever logarithm it is for, follows the same iteration. Once a logarithm is found, the logarithm of every
+      distinguished point met while searching for it is known, and any later walk which reaches one of them is
+      solved; the i-th logarithm takes about sqrt(2 n / i) steps, rather than sqrt(pi n / 2).
+    """
+
+    def __init__(
+        self,
+        group: Group,
+        *,
+        query_count: int = 1,
+        memory_budget: int = 1 << 30,
+        distinguishing_bits: int = None,
+    ) -> None:
+        self.group = Group(group.modulus, group.generator % group.modulus, group.order)
+        self.query_count = query_count
+        self.memory_budget = memory_budget
+        self._baby_steps: BabyStepTable | None = None
+
+        if distinguishing_bits is None:
+            distinguishing_bits = max(0, (isqrt_ceil(group.order) // 32).bit_length() - 1)
+        self.distinguishing_bits = distinguishing_bits
+        self._walk_exponents = tuple((randrange(group.order), 0) for _ in range(partition_count))
+        # the distinguished points met so far, each as (e, l) for a walk of l steps to it from g^e; their logarithms are
+        # only worked out (by replaying the walk) if they are met again
+        self._distinguished_points: dict[int, tuple[int, int]] = {}
+
+    @property
+    def baby_steps(self) -> BabyStepTable:
+        if self._baby_steps is None:
+            length = baby_step_count(self.group.order, self.memory_budget, self.query_count)
+            self._baby_steps = BabyStepTable.build(self.group, length)
+        return self._baby_steps
+
+    @property
+    def distinguished_point_count(self) -> int:
+        return len(self._distinguished_points)
+
+    def _walker(self, group_element: int) -> Walker:
+        modulus = self.group.modulus
+        return Walker(
+            modulus,
+            self.group.order,
+            self.group.generator,
+            group_element % modulus,
+            tuple(pow(self.group.generator, c, mod=modulus) for c, _ in self._walk_exponents),
+            (1 << self.distinguishing_bits) - 1,
+            20 << self.distinguishing_bits,
+        )
+
+    def _no_solution(self, group_element: int) -> Exception:
+        return Exception(
+            f"No solution found. Prime: {self.group.modulus}; Generator: {self.group.generator}; "
+            f"Group element: {group_element}"
+        )
+
+    def shanks_log(self, group_element: int) -> int:
+        k = self.baby_steps.search(self.group, group_element)
+        if k is None:
+            raise self._no_solution(group_element)
+        return k
+
+    def rho_log(self, group_element: int, *, steps_per_batch: int = 1 << 12) -> int:
+        modulus, generator, order = self.group
+        group_element %= modulus
+        if group_element == 1:
+            return 0
+        if order <= partition_count:
+            return next(k for k in range(order) if pow(generator, k, mod=modulus) == group_element)
+
+        walker = self._walker(group_element)
+        # the distinguished points met by this query's walks
+        pending: dict[int, DistinguishedPoint] = {}
+
+        def check(point: DistinguishedPoint) -> int | None:
+            other = pending.setdefault(point.value, point)
+            if point.value in self._distinguished_points:
+                other = self._distinguished_point(point.value)
+            elif other is point:
+                return None
+            # the multipliers are powers of g alone, so walks from g^s h^t and g^s' h^t' only reach points g^a h^t and
+            # g^a' h^t'; where they meet, (t - t') k = a' - a (mod n)
+            coefficient = (point.start.t - other.start.t) % order
+            if coefficient == 0:
+                # the collision tells us nothing about k
+                return None
+            constant = replay(walker, self._walk_exponents, other)[0] - replay(walker, self._walk_exponents, point)[0]
+            for k in solve_linear_congruence(coefficient, constant % order, order):
+                if pow(generator, k, mod=modulus) == group_element:
+                    return k
+            return None
+
+        max_step_count = max_steps_per_sqrt_order * isqrt_ceil(order)
+        state = None
+        for _ in range(0, max_step_count, steps_per_batch):
+            found, state = walker.walk(state, steps_per_batch, randrange(1 << 64))
+            for point in found:
+                k = check(point)
+                if k is not None:
+                    # a walk from g^s h^t is a walk from g^(s + t k)
+                    for value, pending_point in pending.items():
+                        start = (pending_point.start.s + pending_point.start.t * k) % order
+                        self._distinguished_points.setdefault(value, (start, pending_point.length))
+                    return k
+        raise self._no_solution(group_element)
+
+    def _distinguished_point(self, value: int) -> DistinguishedPoint:
+        """a known distinguished point, as the end of a walk from a power of g (and h^0)"""
+        start, length = self._distinguished_points[value]
+        return DistinguishedPoint(value, WalkStart(start, 0), length)
+
+    def precompute_distinguished_points(self, step_count: int) -> None:
+        """
+        Walk from known powers of g for `step_count` steps, recording the distinguished points met, so that later
+        `rho_log` queries are quicker (by the method of Bernstein and Lange).
+        """
+        # walks from g^s 1^t
+        walker = self._walker(1)
+        found, _ = walker.walk(None, step_count, randrange(1 << 64))
+        for point in found:
+            self._distinguished_points.setdefault(point.value, (point.start.s, point.length))
+
+    def save(self, path: Path) -> None:
+        """
+        Save the group and precomputation to a NumPy .npz file. Integers which may not fit in 64 bits are stored as
+        decimal strings, so that the file can be loaded without unpickling.
+        """
+        arrays = dict(
+            group=np.array([str(value) for value in self.group]),
+            settings=np.array([self.query_count, self.memory_budget, self.distinguishing_bits], dtype=np.uint64),
+            walk_exponents=np.array([str(c) for c, _ in self._walk_exponents]),
+            distinguished_values=np.array([str(value) for value in self._distinguished_points], dtype=str),
+            distinguished_starts=np.array([str(start) for start, _ in self._distinguished_points.values()], dtype=str),
+            distinguished_lengths=np.array(
+                [length for _, length in self._distinguished_points.values()], dtype=np.uint64
+            ),
+        )
+        if self._baby_steps is not None:
+            arrays.update(baby_step_keys=self._baby_steps.keys, baby_step_exponents=self._baby_steps.exponents)
+        with open(path, "wb") as file_handle:
+            np.savez(file_handle, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> Self:
+        with np.load(path) as arrays:
+            query_count, memory_budget, distinguishing_bits = map(int, arrays["settings"])
+            solver = cls(
+                Group(*map(int, arrays["group"])),
+                query_count=query_count,
+                memory_budget=memory_budget,
+                distinguishing_bits=distinguishing_bits,
+            )
+            solver._walk_exponents = tuple((int(c), 0) for c in arrays["walk_exponents"])
+            solver._distinguished_points = dict(zip(
+                map(int, arrays["distinguished_values"]),
+                zip(map(int, arrays["distinguished_starts"]), map(int, arrays["distinguished_lengths"])),
+            ))
+            if "baby_step_keys" in arrays:
+                solver._baby_steps = BabyStepTable(arrays["baby_step_keys"], arrays["baby_step_exponents"])
+        return solver
+
+
+__all__ = ("DiscreteLogSolver",)
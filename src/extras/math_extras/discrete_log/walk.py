@@ -0,0 +1,94 @@
+"""
+The r-adding walk shared by the Pollard rho discrete logarithm solvers: x -> x M_i, where i is given by the low bits of
+x and each multiplier M_i = g^(c_i) h^(d_i) is precomputed, so walks which meet merge for good. Walks run until they
+reach a 'distinguished' point (one whose next few bits are zero), from which their exponents can be recovered by
+replaying them.
+"""
+from random import Random
+from typing import NamedTuple
+
+partition_bits = 5
+partition_count = 1 << partition_bits
+# a collision is expected within sqrt(pi n / 2) steps, so many times that means h is not a power of g
+max_steps_per_sqrt_order = 16
+
+
+class WalkStart(NamedTuple):
+    """a walk from g^s h^t"""
+    s: int
+    t: int
+
+
+class DistinguishedPoint(NamedTuple):
+    value: int
+    start: WalkStart
+    length: int
+
+
+class WalkState(NamedTuple):
+    value: int
+    start: WalkStart
+    length: int
+
+
+class Walker(NamedTuple):
+    modulus: int
+    order: int
+    generator: int
+    group_element: int
+    multipliers: tuple[int, ...]
+    distinguishing_mask: int
+    max_walk_length: int
+
+    def fresh_walk(self, rng: Random) -> WalkState:
+        start = WalkStart(rng.randrange(self.order), rng.randrange(self.order))
+        value = (pow(self.generator, start.s, mod=self.modulus) * pow(self.group_element, start.t, mod=self.modulus))
+        return WalkState(value % self.modulus, start, 0)
+
+    def walk(
+        self,
+        state: WalkState | None,
+        step_count: int,
+        seed: int,
+    ) -> tuple[list[DistinguishedPoint], WalkState]:
+        """
+        Run walks for `step_count` steps in total, continuing from `state` (or starting afresh). New walks start from
+        random exponents drawn with the given seed, since forked processes would otherwise share a random state.
+
+        :return: the distinguished points found, and the state of the walk in progress
+        """
+        modulus = self.modulus
+        multipliers = self.multipliers
+        mask = self.distinguishing_mask << partition_bits
+        rng = Random(seed)
+        found = []
+        if state is None:
+            state = self.fresh_walk(rng)
+        x, start, length = state
+        for _ in range(step_count):
+            x = (x * multipliers[x & (partition_count - 1)]) % modulus
+            length += 1
+            if x & mask == 0:
+                found.append(DistinguishedPoint(x, start, length))
+                x, start, length = self.fresh_walk(rng)
+            elif length > self.max_walk_length:
+                # the walk has (most likely) entered a cycle without distinguished points
+                x, start, length = self.fresh_walk(rng)
+        return found, WalkState(x, start, length)
+
+
+def replay(walker: Walker, exponents: tuple[tuple[int, int], ...], point: DistinguishedPoint) -> tuple[int, int]:
+    """:return: (a, b) such that the distinguished point is g^a h^b"""
+    a, b = point.start
+    value = (pow(walker.generator, a, mod=walker.modulus) * pow(walker.group_element, b, mod=walker.modulus))
+    value %= walker.modulus
+    for _ in range(point.length):
+        index = value & (partition_count - 1)
+        value = (value * walker.multipliers[index]) % walker.modulus
+        a += exponents[index][0]
+        b += exponents[index][1]
+    assert value == point.value
+    return a % walker.order, b % walker.order
+
+
+__all__ = ("DistinguishedPoint", "WalkStart", "WalkState", "Walker", "max_steps_per_sqrt_order", "partition_bits", "partition_count", "replay",)
@@ -0,0 +1,9 @@
+from .curve import *
+from .scalar_multiplication import *
+from .raw import *
+from .comb import *
+from .discrete_log import *
+from .order import *
+from .schoof import *
+from .montgomery import *
+from .edwards import *
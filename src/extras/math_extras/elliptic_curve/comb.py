@@ -0,0 +1,81 @@
+from .curve import AffinePointABC, Curve, JacobianPointABC, from_raw_jacobian, to_raw_jacobian
+from .raw import *
+
+
+class FixedBaseComb:
+    """
+    A precomputed table for repeatedly multiplying one base point (e.g. a generator) by different scalars, using the
+    Lim-Lee comb method.
+
+    A scalar of up to `bits` bits is written as a `teeth` x d matrix of bits (d = ceil(bits / teeth)), row j holding
+    bits j d, ..., (j + 1) d - 1. The table holds sum(2^(j d) P) for every subset of rows, so that each column of the
+    matrix is a single lookup: a multiplication then costs d doublings and at most d (mixed) additions. The 2^teeth
+    points of the table are normalised to z = 1 (with a single inversion) so that additions are cheaper.
+
+    Scalars which don't fit in `bits` bits fall back to `Curve.scalar_mul_jacobian_point`. The default of one bit more
+    than the field size covers any scalar reduced modulo the curve's order, by Hasse's theorem.
+    """
+
+    def __init__(
+        self,
+        curve: Curve,
+        base: AffinePointABC | JacobianPointABC,
+        *,
+        teeth: int = 6,
+        bits: int = None,
+    ) -> None:
+        if teeth < 1:
+            raise ValueError
+        if isinstance(base, AffinePointABC):
+            base = curve.to_jacobian(base)
+        if bits is None:
+            bits = curve.p.bit_length() + 1
+
+        self.curve = curve
+        self.base = base
+        self.teeth = teeth
+        self.bits = bits
+        self.spacing = -(-bits // teeth)
+
+        p, a = curve.raw_parameters()
+        row_bases = [to_raw_jacobian(base)]
+        for _ in range(teeth - 1):
+            row_base = row_bases[-1]
+            for _ in range(self.spacing):
+                row_base = raw_double(row_base, p, a)
+            row_bases.append(row_base)
+
+        table = [raw_infinity]
+        for row_base in row_bases:
+            table += [raw_add(entry, row_base, p, a) for entry in table]
+        self.raw_table = raw_unit_z_batch(table, p)
+
+    @property
+    def table(self) -> list[JacobianPointABC]:
+        return [from_raw_jacobian(entry) for entry in self.raw_table]
+
+    def raw_mul(self, k: int) -> RawJacobianPoint:
+        if k < 0:
+            raise ValueError
+        p, a = self.curve.raw_parameters()
+        if k.bit_length() > self.bits:
+            return raw_scalar_mul(k, self.raw_table[1], p, a)
+
+        accumulator = raw_infinity
+        for column in reversed(range(self.spacing)):
+            accumulator = raw_double(accumulator, p, a)
+            index = 0
+            for row in range(self.teeth):
+                index |= ((k >> (row * self.spacing + column)) & 1) << row
+            if index:
+                accumulator = raw_add(accumulator, self.raw_table[index], p, a)
+        return accumulator
+
+    def mul(self, k: int) -> JacobianPointABC:
+        return from_raw_jacobian(self.raw_mul(k))
+
+    def mul_affine(self, k: int) -> AffinePointABC:
+        return self.curve.to_affine(self.mul(k))
+
+
+__all__ = ("FixedBaseComb",)
@@ -0,0 +1,390 @@
+from abc import ABCMeta, abstractmethod
+from dataclasses import dataclass
+from random import randrange
+from typing import Generator, Iterable
+
+from extras.math_extras.mod_sqrt import mod_sqrt
+
+from .raw import *
+from .scalar_multiplication import default_window_width
+
+
+class PointABC(metaclass=ABCMeta):
+    @abstractmethod
+    def is_at_infinity(self) -> bool: ...
+
+
+class AffinePointABC(PointABC, metaclass=ABCMeta):
+    pass
+
+
+class JacobianPointABC(PointABC, metaclass=ABCMeta):
+    pass
+
+
+@dataclass(frozen=True)
+class AffinePoint(AffinePointABC):
+    __slots__ = ("x", "y")
+
+    x: int
+    y: int
+
+    def is_at_infinity(self) -> bool:
+        return False
+
+    def __str__(self):
+        return f"({self.x}, {self.y})"
+
+
+@dataclass(frozen=True)
+class AffinePointAtInfinityType(AffinePointABC):
+    __slots__ = tuple()
+
+    def is_at_infinity(self) -> bool:
+        return True
+
+    def __repr__(self):
+        return "AffinePointAtInfinity"
+
+    def __str__(self):
+        return "inf"
+
+
+AffinePointAtInfinity = AffinePointAtInfinityType()
+
+
+@dataclass(frozen=True)
+class JacobianPoint(JacobianPointABC):
+    __slots__ = ("x", "y", "z")
+
+    x: int
+    y: int
+    z: int
+
+    def is_at_infinity(self) -> bool:
+        return self.z == 0
+
+    def __str__(self):
+        return f"({self.x}, {self.y})"
+
+
+type Point = AffinePointABC | JacobianPointABC
+
+
+def to_raw_affine(point: AffinePointABC) -> RawAffinePoint:
+    if isinstance(point, AffinePoint):
+        return point.x, point.y
+    if point.is_at_infinity():
+        return None
+    raise ValueError
+
+
+def from_raw_affine(point: RawAffinePoint) -> AffinePointABC:
+    if point is None:
+        return AffinePointAtInfinity
+    return AffinePoint(int(point[0]), int(point[1]))
+
+
+def to_raw_jacobian(point: JacobianPointABC) -> RawJacobianPoint:
+    if isinstance(point, JacobianPoint):
+        return point.x, point.y, point.z
+    if point.is_at_infinity():
+        return raw_infinity
+    raise ValueError
+
+
+def from_raw_jacobian(point: RawJacobianPoint) -> JacobianPoint:
+    return JacobianPoint(int(point[0]), int(point[1]), int(point[2]))
+
+
+@dataclass(frozen=True)
+class Curve:
+    __slots__ = ("p", "a", "b")
+
+    p: int  # prime field order and modulus for operations
+    a: int  # coefficient in Weierstrass equation
+    b: int  # coefficient in Weierstrass equation
+
+    def raw_parameters(self) -> tuple[int, int]:
+        """:return: the modulus p and coefficient a, as field elements for the raw arithmetic core"""
+        element_type = field_element_type(self.p)
+        return element_type(self.p), element_type(self.a)
+
+    def all_affine_points_by_exhaustion(self) -> Generator[AffinePointABC]:
+        yield AffinePointAtInfinity
+        for x in range(self.p):
+            yy = (pow(x, 3, mod=self.p) + (self.a * x) + self.b) % self.p
+            y = mod_sqrt(yy, self.p)
+            if y == 0:
+                continue
+            yield AffinePoint(x, y)
+            yield AffinePoint(x, self.p - y)
+
+    def random_affine_point(self) -> AffinePointABC:
+        """Choose a (finite) point uniformly at random by choosing x-coordinates until one is on the curve."""
+        while True:
+            x = randrange(self.p)
+            yy = (pow(x, 3, mod=self.p) + (self.a * x) + self.b) % self.p
+            y = mod_sqrt(yy, self.p)
+            if pow(y, 2, mod=self.p) != yy:
+                continue
+            if randrange(2):
+                y = -y % self.p
+            return AffinePoint(x, y)
+
+    def to_jacobian(self, affine: AffinePointABC) -> JacobianPointABC:
+        if affine.is_at_infinity():
+            return JacobianPoint(1, 1, 0)
+        if isinstance(affine, AffinePoint):
+            return JacobianPoint(affine.x, affine.y, 1)
+        raise ValueError
+
+    def to_affine(self, jacobian: JacobianPointABC) -> AffinePointABC:
+        return from_raw_affine(raw_to_affine(to_raw_jacobian(jacobian), self.raw_parameters()[0]))
+
+    def to_affine_batch(self, jacobians: Iterable[JacobianPointABC]) -> list[AffinePointABC]:
+        """Convert many points to affine coordinates with a single modular inversion."""
+        raw_jacobians = [to_raw_jacobian(jacobian) for jacobian in jacobians]
+        return [from_raw_affine(affine) for affine in raw_to_affine_batch(raw_jacobians, self.raw_parameters()[0])]
+
+    def is_jacobian_point_on_curve(self, point: JacobianPointABC) -> bool:
+        if point.is_at_infinity():
+            return True
+        if not isinstance(point, JacobianPoint): raise ValueError
+        left_side = pow(point.y, 2, mod=self.p)
+        right_side = (pow(point.x, 3, mod=self.p) + (self.a * point.x * pow(point.z, 4, mod=self.p)) + (self.b * pow(point.z, 6, mod=self.p))) % self.p
+        return left_side == right_side
+
+    def is_affine_point_on_curve(self, point: AffinePointABC) -> bool:
+        if point.is_at_infinity():
+            return True
+        if not isinstance(point, AffinePoint): raise ValueError
+        left_side = pow(point.y, 2, mod=self.p)
+        right_side = (pow(point.x, 3, mod=self.p) + (self.a * point.x) + self.b) % self.p
+        return left_side == right_side
+
+    def is_point_on_curve(self, point: Point) -> bool:
+        if isinstance(point, AffinePointABC):
+            return self.is_affine_point_on_curve(point)
+        if isinstance(point, JacobianPointABC):
+            return self.is_jacobian_point_on_curve(point)
+
+        raise ValueError
+
+    def scale_z_jacobian_point(self, a: int, p: JacobianPointABC) -> JacobianPointABC:
+        if p.is_at_infinity():
+            return p
+        if not isinstance(p, JacobianPoint):
+            raise ValueError
+
+        # https://www.hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html#scaling-z
+        aa = pow(a, 2, mod=self.p)
+        x3 = (p.x * aa) % self.p
+        y3 = (p.y * aa * a) % self.p
+        z3 = (p.z * a) % self.p
+        return JacobianPoint(x3, y3, z3)
+
+    def unit_z_jacobian_point(self, p: JacobianPointABC) -> JacobianPointABC:
+        if p.is_at_infinity():
+            return p
+        if not isinstance(p, JacobianPoint):
+            raise ValueError
+
+        a = pow(p.z, -1, mod=self.p)
+        return self.scale_z_jacobian_point(a, p)
+
+    def unit_z_jacobian_points(self, points: Iterable[JacobianPointABC]) -> list[JacobianPointABC]:
+        """Scale many points to z = 1 with a single modular inversion."""
+        raw_points = [to_raw_jacobian(point) for point in points]
+        return [from_raw_jacobian(point) for point in raw_unit_z_batch(raw_points, self.raw_parameters()[0])]
+
+    def eq_jacobian_points(self, p1: JacobianPointABC, p2: JacobianPointABC) -> bool:
+        if p1.is_at_infinity() and p2.is_at_infinity():
+            return True
+        if p1.is_at_infinity() or p2.is_at_infinity():
+            return False
+
+        if not isinstance(p1, JacobianPoint):
+            raise ValueError
+        if not isinstance(p2, JacobianPoint):
+            raise ValueError
+
+        if p1.z == p2.z:
+            return p1.x == p2.x and p1.y == p2.y
+
+        # (x1, y1, z1) ~ (x2, y2, z2) iff x1 z2^2 = x2 z1^2 and y1 z2^3 = y2 z1^3
+        z1z1 = pow(p1.z, 2, mod=self.p)
+        z2z2 = pow(p2.z, 2, mod=self.p)
+        if (p1.x * z2z2 - p2.x * z1z1) % self.p != 0:
+            return False
+        return (p1.y * z2z2 * p2.z - p2.y * z1z1 * p1.z) % self.p == 0
+
+    def double_affine_point(self, p: AffinePointABC) -> AffinePointABC:
+        p_raw = raw_to_jacobian(to_raw_affine(p))
+        return from_raw_affine(raw_to_affine(raw_double(p_raw, *self.raw_parameters()), self.raw_parameters()[0]))
+
+    def double_jacobian_point(self, p: JacobianPointABC) -> JacobianPointABC:
+        if p.is_at_infinity():
+            return p
+        return from_raw_jacobian(raw_double(to_raw_jacobian(p), *self.raw_parameters()))
+
+    def add_affine_points(self, p1: AffinePointABC, p2: AffinePointABC) -> AffinePointABC:
+        if p1.is_at_infinity():
+            return p2
+        if p2.is_at_infinity():
+            return p1
+
+        p1_raw = raw_to_jacobian(to_raw_affine(p1))
+        p2_raw = raw_to_jacobian(to_raw_affine(p2))
+        return from_raw_affine(raw_to_affine(raw_add(p1_raw, p2_raw, *self.raw_parameters()), self.raw_parameters()[0]))
+
+    def add_jacobian_points(self, p1: JacobianPointABC, p2: JacobianPointABC) -> JacobianPointABC:
+        if p1.is_at_infinity():
+            return p2
+        if p2.is_at_infinity():
+            return p1
+        return from_raw_jacobian(raw_add(to_raw_jacobian(p1), to_raw_jacobian(p2), *self.raw_parameters()))
+
+    def negate_affine_point(self, p: AffinePointABC) -> AffinePointABC:
+        if p.is_at_infinity():
+            return p
+        if not isinstance(p, AffinePoint):
+            raise ValueError
+        return AffinePoint(p.x, -p.y % self.p)
+
+    def negate_jacobian_point(self, p: JacobianPointABC) -> JacobianPointABC:
+        if p.is_at_infinity():
+            return p
+        if not isinstance(p, JacobianPoint):
+            raise ValueError
+        return JacobianPoint(p.x, -p.y % self.p, p.z)
+
+    def scalar_mul_affine_point(self, k: int, p: AffinePointABC) -> AffinePointABC:
+        if p.is_at_infinity():
+            return AffinePointAtInfinity
+        if k < 0:
+            raise ValueError
+        if k == 0:
+            return AffinePointAtInfinity
+
+        product = raw_scalar_mul(k, raw_to_jacobian(to_raw_affine(p)), *self.raw_parameters())
+        return from_raw_affine(raw_to_affine(product, self.raw_parameters()[0]))
+
+    def odd_multiples_of_jacobian_point(self, p: JacobianPointABC, count: int) -> list[JacobianPointABC]:
+        """
+        :return: the points P, 3P, 5P, ..., (2 count - 1)P, scaled to z = 1 so that adding them is cheaper
+        """
+        p_field, a_field = self.raw_parameters()
+        multiples = raw_unit_z_batch(raw_odd_multiples(to_raw_jacobian(p), count, p_field, a_field), p_field)
+        return [from_raw_jacobian(multiple) for multiple in multiples]
+
+    def scalar_mul_jacobian_point(self, k: int, p: JacobianPointABC, window_width: int = None) -> JacobianPointABC:
+        """
+        Multiply a point by a scalar, using its width-w non-adjacent form (wNAF): a signed-digit representation in
+        which at most one in every w digits is non-zero, and each digit is odd and less than 2^(w-1) in magnitude.
+        Since negating a point is free, this needs only about k.bit_length() / (w + 1) additions of the precomputed
+        odd multiples of the point.
+        """
+        if p.is_at_infinity():
+            return p
+        return from_raw_jacobian(raw_scalar_mul(k, to_raw_jacobian(p), *self.raw_parameters(), window_width))
+
+    def _raw_scalar_mul_many(self, pairs: list[tuple[int, RawJacobianPoint]]) -> list[RawJacobianPoint]:
+        if any(k < 0 for k, _ in pairs):
+            raise ValueError
+        p_field, a_field = self.raw_parameters()
+
+        window_widths: dict[RawJacobianPoint, int] = {}
+        for k, p in pairs:
+            if k == 0 or p[2] == 0:
+                continue
+            window_widths[p] = max(window_widths.get(p, 2), default_window_width(k))
+
+        unscaled_multiples = [
+            raw_odd_multiples(p, 1 << (window_width - 2), p_field, a_field)
+            for p, window_width in window_widths.items()
+        ]
+        scaled_multiples = iter(raw_unit_z_batch(
+            (multiple for multiples in unscaled_multiples for multiple in multiples),
+            p_field,
+        ))
+        odd_multiples_by_point = {
+            p: [next(scaled_multiples) for _ in multiples]
+            for p, multiples in zip(window_widths, unscaled_multiples)
+        }
+
+        products = []
+        for k, p in pairs:
+            if k == 0 or p[2] == 0:
+                products.append(raw_infinity)
+                continue
+            products.append(raw_scalar_mul_wnaf(k, odd_multiples_by_point[p], window_widths[p], p_field, a_field))
+        return products
+
+    def scalar_mul_jacobian_points(self, pairs: Iterable[tuple[int, JacobianPointABC]]) -> list[JacobianPointABC]:
+        """
+        Multiply many points by scalars. The odd multiples of each distinct point are precomputed once, and all of
+        them are scaled to z = 1 with a single modular inversion.
+        """
+        raw_pairs = [(k, to_raw_jacobian(p)) for k, p in pairs]
+        return [from_raw_jacobian(product) for product in self._raw_scalar_mul_many(raw_pairs)]
+
+    def scalar_mul_affine_points(self, pairs: Iterable[tuple[int, AffinePointABC]]) -> list[AffinePointABC]:
+        """Multiply many points by scalars, converting the products to affine coordinates with a single inversion."""
+        raw_pairs = [(k, raw_to_jacobian(to_raw_affine(p))) for k, p in pairs]
+        products = raw_to_affine_batch(self._raw_scalar_mul_many(raw_pairs), self.raw_parameters()[0])
+        return [from_raw_affine(product) for product in products]
+
+    def affine_progression(
+        self,
+        start: AffinePointABC,
+        step: AffinePointABC,
+        count: int,
+        chunk_length: int = 1024,
+    ) -> Generator[AffinePointABC]:
+        """
+        Yield the points start, start + step, ..., start + (count - 1) step, converting each chunk of them to affine
+        coordinates with a single inversion.
+        """
+        start_raw = raw_to_jacobian(to_raw_affine(start))
+        step_raw = raw_to_jacobian(to_raw_affine(step))
+        for point in raw_affine_progression(start_raw, step_raw, count, *self.raw_parameters(), chunk_length):
+            yield from_raw_affine(point)
+
+    def multiples_of_affine_point(self, p: AffinePointABC, count: int) -> list[AffinePointABC]:
+        """
+        :return: the points P, 2P, ..., (count)P, computed by repeated (mixed) addition with a single inversion
+        """
+        p_raw = raw_to_jacobian(to_raw_affine(p))
+        return list(map(from_raw_affine, raw_affine_progression(p_raw, p_raw, count, *self.raw_parameters(), max(count, 1))))
+
+    def scalar_mul_jacobian_point_sliding_window(
+        self,
+        k: int,
+        p: JacobianPointABC,
+        window_width: int = None,
+    ) -> JacobianPointABC:
+        """
+        Multiply a point by a scalar, consuming its bits in windows of up to w bits which start and end with a 1.
+        Needs about k.bit_length() / (w + 1) additions of the precomputed odd multiples of the point; wNAF does
+        slightly better for the same table size, but this also suits groups in which negation is not free.
+        """
+        if p.is_at_infinity():
+            return p
+        return from_raw_jacobian(raw_scalar_mul_sliding_window(k, to_raw_jacobian(p), *self.raw_parameters(), window_width))
+
+
+__all__ = (
+    "PointABC",
+    "AffinePointABC",
+    "JacobianPointABC",
+    "AffinePoint",
+    "AffinePointAtInfinity",
+    "JacobianPoint",
+    "Point",
+    "to_raw_affine",
+    "from_raw_affine",
+    "to_raw_jacobian",
+    "from_raw_jacobian",
+    "Curve",
+)
@@ -0,0 +1,260 @@
+from random import randrange
+
+from extras.math_extras.batch_inversion import batch_mod_inverse
+from extras.math_extras.chinese_remainder_theorem import Congruence, solve_congruences, solve_linear_congruence
+from extras.math_extras.factorise import prime_factorise
+from extras.math_extras.isqrt import isqrt_ceil
+from utils.typedefs import PrimeFactorisation
+
+from .comb import FixedBaseComb
+from .curve import AffinePointABC, Curve, to_raw_affine
+from .raw import *
+
+_x_key_mask = (1 << 64) - 1
+_partition_bits = 5
+_shanks_max_order_bit_length = 32
+
+
+def _normalise(curve: Curve, point: AffinePointABC) -> AffinePointABC:
+    return curve.to_affine(curve.to_jacobian(point))
+
+
+def _is_solution(curve: Curve, base: AffinePointABC, point: AffinePointABC, k: int) -> bool:
+    return curve.scalar_mul_affine_point(k, base) == point
+
+
+def shanks_elliptic_discrete_log(curve: Curve, base: AffinePointABC, point: AffinePointABC, order: int) -> int:
+    """
+    Find k such that kG = Q, where G (`base`) has order `order`, by baby-step giant-step.
+
+    Since jG and -jG share an x-coordinate, the table of m baby steps covers the 2m + 1 multiples -mG, ..., mG when
+    keyed by x-coordinate alone, with the sign of j recording the parity of the y-coordinate. Only the low 64 bits of
+    each x-coordinate are kept, so that the table stays compact; a (rare) false match is caught by checking the
+    solution. This halves the giant steps needed for a table of a given size.
+    """
+    point = _normalise(curve, point)
+    if point.is_at_infinity():
+        return 0
+    if base.is_at_infinity():
+        raise ValueError
+
+    p, a = curve.raw_parameters()
+    base_raw = raw_to_jacobian(to_raw_affine(base))
+    m = isqrt_ceil(order // 2 + 1)
+    table: dict[int, int] = {}
+    for j, baby_step in enumerate(raw_affine_progression(base_raw, base_raw, m, p, a), start=1):
+        if baby_step is None:
+            break  # G has order j, so the table is complete
+        x, y = baby_step
+        table.setdefault(x & _x_key_mask, j if y % 2 == 0 else -j)
+
+    stride = 2 * m + 1
+    giant_step = raw_to_jacobian(raw_to_affine(raw_negate(raw_scalar_mul(stride, base_raw, p, a), p), p))
+    giant_step_count = -(-order // stride)
+    residuals = raw_affine_progression(raw_to_jacobian(to_raw_affine(point)), giant_step, giant_step_count, p, a)
+    for i, residual in enumerate(residuals):
+        if residual is None:
+            return (i * stride) % order
+        x, y = residual
+        signed_j = table.get(x & _x_key_mask)
+        if signed_j is None:
+            continue
+        j = signed_j if y % 2 == 0 else -signed_j
+        k = (i * stride + j) % order
+        if _is_solution(curve, base, point, k):
+            return k
+
+    raise Exception(f"No solution found. Curve: {curve}; Base: {base}; Point: {point}")
+
+
+def pollard_rho_elliptic_discrete_log(
+    curve: Curve,
+    base: AffinePointABC,
+    point: AffinePointABC,
+    order: int,
+    *,
+    walk_count: int = 64,
+) -> int:
+    """
+    Find k such that kG = Q, where G (`base`) has order `order`, by Pollard's rho method.
+
+    Each walk visits points R = aG + bQ by an r-adding walk, in which the next point is R + M_i for one of 32
+    precomputed random combinations M_i of G and Q, chosen by the x-coordinate of R. Walks stop at 'distinguished'
+    points (those whose x-coordinate has a run of zero bits), which are stored; two walks reaching the same
+    distinguished point with different coefficients yield k. Many walks are stepped together, so that each step costs
+    a single modular inversion (shared by Montgomery's trick) in affine coordinates.
+
+    Walks move between classes {R, -R}, represented by whichever has the lesser y-coordinate (the negation map), which
+    reduces the expected number of steps by a factor of sqrt(2). The 'fruitless' 2-cycles this introduces are escaped
+    by doubling, and any longer cycles by abandoning walks which run for too long without reaching a distinguished
+    point.
+    """
+    point = _normalise(curve, point)
+    if point.is_at_infinity():
+        return 0
+    if base.is_at_infinity():
+        raise ValueError
+    p, curve_a = curve.raw_parameters()
+    partition_count = 1 << _partition_bits
+
+    expected_steps = isqrt_ceil(order)
+    walk_count = max(1, min(walk_count, expected_steps // 16))
+    distinguishing_bits = max(0, (expected_steps // (8 * walk_count)).bit_length() - 1)
+    distinguishing_mask = (1 << distinguishing_bits) - 1
+    max_walk_length = 20 << distinguishing_bits
+
+    base_comb = FixedBaseComb(curve, base, bits=order.bit_length())
+    point_comb = FixedBaseComb(curve, point, bits=order.bit_length())
+
+    def combination(c: int, d: int) -> RawAffinePoint:
+        return raw_to_affine(raw_add(base_comb.raw_mul(c), point_comb.raw_mul(d), p, curve_a), p)
+
+    def canonical(x: int, y: int, a: int, b: int) -> tuple[int, int, int, int]:
+        if y > p - y:
+            return x, p - y, (-a) % order, (-b) % order
+        return x, y, a, b
+
+    solutions: list[int] = []
+
+    def check_relation(a: int, b: int, other_a: int, other_b: int) -> None:
+        # aG + bQ = a'G + b'Q, so (b - b') k = a' - a
+        coefficient = (b - other_b) % order
+        if coefficient == 0:
+            # the relation tells us nothing about k (and every k would be a candidate)
+            return
+        for k in solve_linear_congruence(coefficient, (other_a - a) % order, order):
+            if _is_solution(curve, base, point, k):
+                solutions.append(k)
+                return
+
+    multipliers = []
+    while len(multipliers) < partition_count:
+        c, d = randrange(order), randrange(order)
+        multiple = combination(c, d)
+        if multiple is None:
+            check_relation(c, d, 0, 0)
+            if solutions:
+                return solutions[0]
+            continue
+        multipliers.append((*multiple, c, d))
+
+    def fresh_walk() -> list[int]:
+        while True:
+            c, d = randrange(order), randrange(order)
+            start = combination(c, d)
+            if start is None:
+                check_relation(c, d, 0, 0)
+                continue
+            # x, y, c, d, x-coordinate two steps ago, x-coordinate one step ago, length
+            return [*canonical(*start, c, d), -1, -1, 0]
+
+    walks = [fresh_walk() for _ in range(walk_count)]
+    distinguished_points: dict[int, tuple[int, int]] = {}
+
+    while not solutions:
+        # the multiplier to add to each walk's point, or None to double it
+        steps: list[tuple[int, int, int, int] | None] = []
+        denominators = []
+        for index, walk in enumerate(walks):
+            while True:
+                x, y = walk[0], walk[1]
+                step = multipliers[x & (partition_count - 1)]
+                if x == walk[4] or (x, y) == step[:2]:
+                    # escape a fruitless 2-cycle R -> -(R + M_i) -> R by doubling, or double R = M_i
+                    step = None
+                if (y == 0) if step is None else (x == step[0]):
+                    # the next point would be the point at infinity
+                    walks[index] = walk = fresh_walk()
+                    continue
+                break
+            steps.append(step)
+            denominators.append(2 * y if step is None else step[0] - x)
+
+        inverses = batch_mod_inverse(denominators, p)
+        for index, (walk, step, inverse) in enumerate(zip(walks, steps, inverses)):
+            x, y, a, b, _, previous_x, length = walk
+            if step is None:
+                slope = ((3 * x * x + curve_a) * inverse) % p
+                other_x, a_step, b_step = x, a, b
+            else:
+                other_x, other_y, a_step, b_step = step
+                slope = ((other_y - y) * inverse) % p
+            new_x = (slope * slope - x - other_x) % p
+            new_y = (slope * (x - new_x) - y) % p
+            walk[:4] = canonical(new_x, new_y, (a + a_step) % order, (b + b_step) % order)
+            walk[4:] = previous_x, x, length + 1
+
+            if (walk[0] >> _partition_bits) & distinguishing_mask == 0:
+                other = distinguished_points.get(walk[0])
+                if other is not None:
+                    check_relation(walk[2], walk[3], *other)
+                    if solutions:
+                        break
+                distinguished_points[walk[0]] = (walk[2], walk[3])
+                walks[index] = fresh_walk()
+            elif walk[6] > max_walk_length:
+                walks[index] = fresh_walk()
+
+    return solutions[0]
+
+
+def _elliptic_discrete_log_for_prime_order(
+    curve: Curve,
+    base: AffinePointABC,
+    point: AffinePointABC,
+    order: int,
+) -> int:
+    if order.bit_length() <= _shanks_max_order_bit_length:
+        return shanks_elliptic_discrete_log(curve, base, point, order)
+    return pollard_rho_elliptic_discrete_log(curve, base, point, order)
+
+
+def pohlig_hellman_elliptic_discrete_log(
+    curve: Curve,
+    base: AffinePointABC,
+    point: AffinePointABC,
+    order: int,
+    factorisation: PrimeFactorisation = None,
+) -> int:
+    """
+    Find k such that kG = Q, where G (`base`) has order exactly `order`.
+
+    The problem is reduced to one in the subgroup of each prime power q^e dividing the order, and each of those to e
+    problems in the subgroup of order q, which are solved by baby-step giant-step or Pollard's rho. The cost is
+    dominated by the largest prime factor of the order, so this is quick when the order is smooth.
+    """
+    point = _normalise(curve, point)
+    if factorisation is None:
+        factorisation = prime_factorise(order)
+
+    congruences = []
+    for prime, exponent in factorisation.items():
+        prime_power = pow(prime, exponent)
+        cofactor = order // prime_power
+        subgroup_base = curve.scalar_mul_affine_point(cofactor, base)
+        subgroup_point = curve.scalar_mul_affine_point(cofactor, point)
+        prime_order_base = curve.scalar_mul_affine_point(prime_power // prime, subgroup_base)
+
+        # k = k_0 + k_1 q + ... + k_(e-1) q^(e-1) (mod q^e)
+        x = 0
+        for digit_index in range(exponent):
+            residual = curve.add_affine_points(
+                subgroup_point,
+                curve.scalar_mul_affine_point((-x) % prime_power, subgroup_base),
+            )
+            prime_order_point = curve.scalar_mul_affine_point(pow(prime, exponent - 1 - digit_index), residual)
+            digit = _elliptic_discrete_log_for_prime_order(curve, prime_order_base, prime_order_point, prime)
+            x += digit * pow(prime, digit_index)
+        congruences.append(Congruence(x, prime_power))
+
+    k = solve_congruences(congruences) if congruences else 0
+    if not _is_solution(curve, base, point, k):
+        raise Exception(f"No solution found. Curve: {curve}; Base: {base}; Point: {point}")
+    return k
+
+
+__all__ = (
+    "shanks_elliptic_discrete_log",
+    "pollard_rho_elliptic_discrete_log",
+    "pohlig_hellman_elliptic_discrete_log",
+)
@@ -0,0 +1,235 @@
+"""
+https://en.wikipedia.org/wiki/Twisted_Edwards_curve
+
+Affine points are `AffinePoint`s; the identity is the (finite) point (0, 1). Arithmetic is done in extended
+coordinates (X : Y : Z : T), with x = X / Z, y = Y / Z and x y = T / Z, in which the unified addition formula costs 9M
+and needs no case analysis (and is complete, when a is a square and d is not).
+"""
+from dataclasses import dataclass
+from typing import Self
+
+from extras.math_extras.batch_inversion import batch_mod_inverse
+
+from .curve import AffinePoint, AffinePointABC, AffinePointAtInfinity, Curve
+from .montgomery import MontgomeryCurve
+from .raw import field_element_type
+from .scalar_multiplication import default_window_width, wnaf_digits
+
+type RawExtendedPoint = tuple[int, int, int, int]
+
+
+@dataclass(frozen=True)
+class ExtendedPoint:
+    __slots__ = ("x", "y", "z", "t")
+
+    x: int
+    y: int
+    z: int
+    t: int
+
+    def __str__(self):
+        return f"({self.x}, {self.y})"
+
+
+def _extended_add(p1: RawExtendedPoint, p2: RawExtendedPoint, p: int, a: int, d: int) -> RawExtendedPoint:
+    # https://www.hyperelliptic.org/EFD/g1p/auto-twisted-extended.html#addition-add-2008-hwcd
+    x1, y1, z1, t1 = p1
+    x2, y2, z2, t2 = p2
+    aa = x1 * x2 % p
+    bb = y1 * y2 % p
+    cc = t1 * d * t2 % p
+    dd = z1 * z2 % p
+    e = ((x1 + y1) * (x2 + y2) - aa - bb) % p
+    f = dd - cc
+    g = dd + cc
+    h = bb - a * aa
+    return e * f % p, g * h % p, f * g % p, e * h % p
+
+
+def _extended_add_cached(p1: RawExtendedPoint, p2: tuple[int, int, int], p: int, a: int) -> RawExtendedPoint:
+    """Add a point (x2, y2, d t2) with z2 = 1, saving two multiplications."""
+    x1, y1, z1, t1 = p1
+    x2, y2, dt2 = p2
+    aa = x1 * x2 % p
+    bb = y1 * y2 % p
+    cc = t1 * dt2 % p
+    e = ((x1 + y1) * (x2 + y2) - aa - bb) % p
+    f = z1 - cc
+    g = z1 + cc
+    h = bb - a * aa
+    return e * f % p, g * h % p, f * g % p, e * h % p
+
+
+def _extended_double(point: RawExtendedPoint, p: int, a: int, with_t: bool = True) -> RawExtendedPoint:
+    """
+    Double a point; T is not an input, so it may be skipped (with_t=False, saving a multiplication) when the result
+    will only be doubled again.
+    """
+    # https://www.hyperelliptic.org/EFD/g1p/auto-twisted-extended.html#doubling-dbl-2008-hwcd
+    x1, y1, z1, _ = point
+    aa = x1 * x1 % p
+    bb = y1 * y1 % p
+    c = 2 * z1 * z1 % p
+    d = a * aa
+    e = ((x1 + y1) * (x1 + y1) - aa - bb) % p
+    g = d + bb
+    f = g - c
+    h = d - bb
+    return e * f % p, g * h % p, f * g % p, e * h % p if with_t else 0
+
+
+@dataclass(frozen=True)
+class TwistedEdwardsCurve:
+    """The curve a x^2 + y^2 = 1 + d x^2 y^2 over F_p, for a d (a - d) != 0."""
+
+    __slots__ = ("p", "a", "d")
+
+    p: int  # prime field order and modulus for operations
+    a: int  # coefficient in twisted Edwards equation
+    d: int  # coefficient in twisted Edwards equation
+
+    @property
+    def identity(self) -> AffinePoint:
+        return AffinePoint(0, 1)
+
+    def _raw_parameters(self) -> tuple[int, int, int]:
+        """:return: p, a and d as field elements, with a in (-p/2, p/2] so that e.g. a = -1 is cheap to multiply by"""
+        element_type = field_element_type(self.p)
+        a = self.a % self.p
+        if a > self.p // 2:
+            a -= self.p
+        return element_type(self.p), element_type(a), element_type(self.d)
+
+    def is_affine_point_on_curve(self, point: AffinePoint) -> bool:
+        xx = pow(point.x, 2, mod=self.p)
+        yy = pow(point.y, 2, mod=self.p)
+        return (self.a * xx + yy - 1 - self.d * xx * yy) % self.p == 0
+
+    def to_extended(self, point: AffinePoint) -> ExtendedPoint:
+        return ExtendedPoint(point.x, point.y, 1, (point.x * point.y) % self.p)
+
+    def to_affine(self, point: ExtendedPoint) -> AffinePoint:
+        inv_z = pow(point.z, -1, self.p)
+        return AffinePoint((point.x * inv_z) % self.p, (point.y * inv_z) % self.p)
+
+    def eq_extended_points(self, p1: ExtendedPoint, p2: ExtendedPoint) -> bool:
+        return (p1.x * p2.z - p2.x * p1.z) % self.p == 0 and (p1.y * p2.z - p2.y * p1.z) % self.p == 0
+
+    def negate_extended_point(self, point: ExtendedPoint) -> ExtendedPoint:
+        return ExtendedPoint(-point.x % self.p, point.y, point.z, -point.t % self.p)
+
+    def negate_affine_point(self, point: AffinePoint) -> AffinePoint:
+        return AffinePoint(-point.x % self.p, point.y)
+
+    def add_extended_points(self, p1: ExtendedPoint, p2: ExtendedPoint) -> ExtendedPoint:
+        p, a, d = self._raw_parameters()
+        raw_sum = _extended_add((p1.x, p1.y, p1.z, p1.t), (p2.x, p2.y, p2.z, p2.t), p, a, d)
+        return ExtendedPoint(*map(int, raw_sum))
+
+    def double_extended_point(self, point: ExtendedPoint) -> ExtendedPoint:
+        p, a, _ = self._raw_parameters()
+        return ExtendedPoint(*map(int, _extended_double((point.x, point.y, point.z, point.t), p, a)))
+
+    def add_affine_points(self, p1: AffinePoint, p2: AffinePoint) -> AffinePoint:
+        return self.to_affine(self.add_extended_points(self.to_extended(p1), self.to_extended(p2)))
+
+    def double_affine_point(self, point: AffinePoint) -> AffinePoint:
+        return self.to_affine(self.double_extended_point(self.to_extended(point)))
+
+    def scalar_mul_extended_point(self, k: int, point: ExtendedPoint, window_width: int = None) -> ExtendedPoint:
+        """
+        Multiply a point by a scalar using its width-w non-adjacent form, as `Curve.scalar_mul_jacobian_point`. The
+        odd multiples are scaled to z = 1 (with a single inversion) and stored with d t precomputed, and doublings skip
+        computing T unless an addition follows.
+        """
+        if k < 0:
+            raise ValueError
+        p, a, d = self._raw_parameters()
+        if window_width is None:
+            window_width = default_window_width(k)
+
+        base = (point.x, point.y, point.z, point.t)
+        odd_multiples = [base]
+        if window_width > 2:
+            doubled = _extended_double(base, p, a)
+            for _ in range((1 << (window_width - 2)) - 1):
+                odd_multiples.append(_extended_add(odd_multiples[-1], doubled, p, a, d))
+        cached_multiples = []
+        for (x, y, _, _), inv_z in zip(odd_multiples, batch_mod_inverse((z for _, _, z, _ in odd_multiples), p)):
+            x, y = x * inv_z % p, y * inv_z % p
+            cached_multiples.append((x, y, x * y % p * d % p))
+        negated_multiples = [(-x % p, y, -dt % p) for x, y, dt in cached_multiples]
+
+        digits = wnaf_digits(k, window_width)
+        accumulator = (0, 1, 1, 0)
+        for index in reversed(range(len(digits))):
+            digit = digits[index]
+            accumulator = _extended_double(accumulator, p, a, with_t=digit != 0 or index == 0)
+            if digit > 0:
+                accumulator = _extended_add_cached(accumulator, cached_multiples[digit >> 1], p, a)
+            elif digit < 0:
+                accumulator = _extended_add_cached(accumulator, negated_multiples[-digit >> 1], p, a)
+        return ExtendedPoint(*map(int, accumulator))
+
+    def scalar_mul_affine_point(self, k: int, point: AffinePoint) -> AffinePoint:
+        return self.to_affine(self.scalar_mul_extended_point(k, self.to_extended(point)))
+
+    def to_montgomery(self) -> MontgomeryCurve:
+        """:return: the birationally equivalent Montgomery curve, with A = 2(a + d) / (a - d) and B = 4 / (a - d)"""
+        inv_a_minus_d = pow(self.a - self.d, -1, self.p)
+        return MontgomeryCurve(
+            self.p,
+            (2 * (self.a + self.d) * inv_a_minus_d) % self.p,
+            (4 * inv_a_minus_d) % self.p,
+        )
+
+    def to_montgomery_point(self, point: AffinePoint) -> AffinePointABC:
+        """(x, y) -> ((1 + y) / (1 - y), (1 + y) / ((1 - y) x)), taking the identity to the point at infinity"""
+        p = self.p
+        x, y = point.x % p, point.y % p
+        if y == 1:
+            return AffinePointAtInfinity
+        if x == 0:
+            # (0, -1) has order 2
+            return AffinePoint(0, 0)
+        u = ((1 + y) * pow(1 - y, -1, p)) % p
+        return AffinePoint(u, (u * pow(x, -1, p)) % p)
+
+    def from_montgomery_point(self, point: AffinePointABC) -> AffinePoint:
+        """(u, v) -> (u / v, (u - 1) / (u + 1)), the inverse of `to_montgomery_point`"""
+        if point.is_at_infinity():
+            return self.identity
+        if not isinstance(point, AffinePoint):
+            raise ValueError
+        p = self.p
+        u, v = point.x % p, point.y % p
+        if u == 0 and v == 0:
+            return AffinePoint(0, p - 1)
+        if v == 0 or u == p - 1:
+            raise ValueError(f"{point} corresponds to a point at infinity of {self}")
+        return AffinePoint((u * pow(v, -1, p)) % p, ((u - 1) * pow(u + 1, -1, p)) % p)
+
+    @classmethod
+    def from_montgomery(cls, curve: MontgomeryCurve) -> Self:
+        """:return: the curve whose `to_montgomery` is `curve`, with a = (A + 2) / B and d = (A - 2) / B"""
+        inv_b = pow(curve.b, -1, curve.p)
+        return cls(curve.p, ((curve.a + 2) * inv_b) % curve.p, ((curve.a - 2) * inv_b) % curve.p)
+
+    def to_weierstrass(self) -> Curve:
+        return self.to_montgomery().to_weierstrass()
+
+    def to_weierstrass_point(self, point: AffinePoint) -> AffinePointABC:
+        return self.to_montgomery().to_weierstrass_point(self.to_montgomery_point(point))
+
+    def from_weierstrass_point(self, point: AffinePointABC) -> AffinePoint:
+        return self.from_montgomery_point(self.to_montgomery().from_weierstrass_point(point))
+
+    @classmethod
+    def from_weierstrass(cls, curve: Curve) -> Self:
+        return cls.from_montgomery(MontgomeryCurve.from_weierstrass(curve))
+
+
+__all__ = (
+    "ExtendedPoint",
+    "TwistedEdwardsCurve",
+)
@@ -0,0 +1,191 @@
+"""
+https://en.wikipedia.org/wiki/Montgomery_curve
+
+Points are `AffinePoint`s (or `AffinePointAtInfinity`), as for `Curve`.
+"""
+from dataclasses import dataclass
+from typing import Self
+
+from extras.math_extras.batch_inversion import batch_mod_inverse
+from extras.math_extras.mod_sqrt import mod_sqrt
+
+from . import polynomial as poly
+from .curve import AffinePoint, AffinePointABC, AffinePointAtInfinity, Curve
+from .raw import field_element_type
+
+
+def _ladder(k: int, u: int, p: int, a24: int) -> tuple[int, int, int, int]:
+    """
+    The x-only Montgomery ladder, with the RFC 7748 formulas: keep (X2 : Z2) = x(nP) and (X3 : Z3) = x((n + 1)P),
+    whose difference is always P, for n running through the leading bits of k. Each bit costs one differential
+    addition and one doubling (5M + 4S + one multiplication by (A - 2) / 4), whatever its value.
+
+    :return: X2, Z2, X3, Z3 for n = k
+    """
+    x2, z2, x3, z3 = 1, 0, u, 1
+    for bit in bin(k)[2:]:
+        if bit == "1":
+            x2, z2, x3, z3 = x3, z3, x2, z2
+        a = x2 + z2
+        aa = a * a % p
+        b = x2 - z2
+        bb = b * b % p
+        e = aa - bb
+        c = x3 + z3
+        d = x3 - z3
+        da = d * a % p
+        cb = c * b % p
+        x3 = (da + cb) * (da + cb) % p
+        z3 = u * (da - cb) * (da - cb) % p
+        x2 = aa * bb % p
+        z2 = e * (aa + a24 * e) % p
+        if bit == "1":
+            x2, z2, x3, z3 = x3, z3, x2, z2
+    return x2, z2, x3, z3
+
+
+@dataclass(frozen=True)
+class MontgomeryCurve:
+    """The curve b y^2 = x^3 + a x^2 + x over F_p, for b (a^2 - 4) != 0."""
+
+    __slots__ = ("p", "a", "b")
+
+    p: int  # prime field order and modulus for operations
+    a: int  # coefficient in Montgomery equation
+    b: int  # coefficient in Montgomery equation
+
+    def is_affine_point_on_curve(self, point: AffinePointABC) -> bool:
+        if point.is_at_infinity():
+            return True
+        if not isinstance(point, AffinePoint):
+            raise ValueError
+        left_side = (self.b * pow(point.y, 2, mod=self.p)) % self.p
+        right_side = (pow(point.x, 3, mod=self.p) + self.a * pow(point.x, 2, mod=self.p) + point.x) % self.p
+        return left_side == right_side
+
+    def negate_affine_point(self, point: AffinePointABC) -> AffinePointABC:
+        if point.is_at_infinity():
+            return point
+        if not isinstance(point, AffinePoint):
+            raise ValueError
+        return AffinePoint(point.x, -point.y % self.p)
+
+    def add_affine_points(self, p1: AffinePointABC, p2: AffinePointABC) -> AffinePointABC:
+        if p1.is_at_infinity():
+            return p2
+        if p2.is_at_infinity():
+            return p1
+        if not isinstance(p1, AffinePoint):
+            raise ValueError
+        if not isinstance(p2, AffinePoint):
+            raise ValueError
+
+        p = self.p
+        if (p1.x - p2.x) % p == 0:
+            if (p1.y + p2.y) % p == 0:
+                return AffinePointAtInfinity
+            slope = ((3 * p1.x * p1.x + 2 * self.a * p1.x + 1) * pow(2 * self.b * p1.y, -1, p)) % p
+        else:
+            slope = ((p2.y - p1.y) * pow(p2.x - p1.x, -1, p)) % p
+        x3 = (self.b * slope * slope - self.a - p1.x - p2.x) % p
+        y3 = (slope * (p1.x - x3) - p1.y) % p
+        return AffinePoint(x3, y3)
+
+    def double_affine_point(self, point: AffinePointABC) -> AffinePointABC:
+        return self.add_affine_points(point, point)
+
+    def scalar_mul_x_coordinate(self, k: int, x: int) -> int | None:
+        """
+        Find the x-coordinate of kP from that of P alone, by the Montgomery ladder.
+
+        :return: the x-coordinate, or None if kP is the point at infinity
+        """
+        if k < 0:
+            raise ValueError
+        element_type = field_element_type(self.p)
+        p = element_type(self.p)
+        if x % p == 0:
+            # (0, 0) has order 2
+            return None if k % 2 == 0 else 0
+        a24 = element_type(((self.a - 2) * pow(4, -1, self.p)) % self.p)
+        x2, z2, _, _ = _ladder(k, element_type(x) % p, p, a24)
+        if z2 == 0:
+            return None
+        return int(x2 * pow(z2, -1, p) % p)
+
+    def scalar_mul_affine_point(self, k: int, point: AffinePointABC) -> AffinePointABC:
+        """
+        Multiply a point by a scalar with the Montgomery ladder, then recover the y-coordinate of kP from the
+        x-coordinates of kP and (k + 1)P (Okeya-Sakurai).
+        """
+        if k < 0:
+            raise ValueError
+        if point.is_at_infinity() or k == 0:
+            return AffinePointAtInfinity
+        if not isinstance(point, AffinePoint):
+            raise ValueError
+
+        element_type = field_element_type(self.p)
+        p = element_type(self.p)
+        x, y = element_type(point.x) % p, element_type(point.y) % p
+        if y == 0:
+            # P has order 2
+            return AffinePointAtInfinity if k % 2 == 0 else point
+        a24 = element_type(((self.a - 2) * pow(4, -1, self.p)) % self.p)
+        x2, z2, x3, z3 = _ladder(k, x, p, a24)
+        if z2 == 0:
+            return AffinePointAtInfinity
+        if z3 == 0:
+            # (k + 1)P = 0, so kP = -P
+            return self.negate_affine_point(point)
+
+        inv_z2, inv_z3, inv_2by = batch_mod_inverse([z2, z3, 2 * self.b * y], p)
+        kx = x2 * inv_z2 % p
+        next_x = x3 * inv_z3 % p
+        ky = ((x * kx + 1) * (x + kx + 2 * self.a) - 2 * self.a - (x - kx) * (x - kx) * next_x) * inv_2by % p
+        return AffinePoint(int(kx), int(ky))
+
+    def to_weierstrass(self) -> Curve:
+        """:return: the isomorphic short Weierstrass curve (in characteristic > 3)"""
+        p = self.p
+        a = ((3 - self.a * self.a) * pow(3 * self.b * self.b, -1, p)) % p
+        b = ((2 * pow(self.a, 3) - 9 * self.a) * pow(27 * pow(self.b, 3), -1, p)) % p
+        return Curve(p, a, b)
+
+    def to_weierstrass_point(self, point: AffinePointABC) -> AffinePointABC:
+        """(x, y) -> (x / b + a / 3b, y / b)"""
+        if point.is_at_infinity():
+            return AffinePointAtInfinity
+        if not isinstance(point, AffinePoint):
+            raise ValueError
+        p = self.p
+        inv_b = pow(self.b, -1, p)
+        return AffinePoint(((point.x + self.a * pow(3, -1, p)) * inv_b) % p, (point.y * inv_b) % p)
+
+    def from_weierstrass_point(self, point: AffinePointABC) -> AffinePointABC:
+        """(x, y) -> (b x - a / 3, b y), the inverse of `to_weierstrass_point`"""
+        if point.is_at_infinity():
+            return AffinePointAtInfinity
+        if not isinstance(point, AffinePoint):
+            raise ValueError
+        p = self.p
+        return AffinePoint((self.b * point.x - self.a * pow(3, -1, p)) % p, (self.b * point.y) % p)
+
+    @classmethod
+    def from_weierstrass(cls, curve: Curve) -> Self:
+        """
+        Find a Montgomery curve whose `to_weierstrass` is `curve`. One exists iff x^3 + a x + b has a root r for which
+        3 r^2 + a is a square; then b' = 1 / sqrt(3 r^2 + a) and a' = 3 r b'.
+        """
+        p = curve.p
+        for root in poly.roots([curve.b, curve.a, 0, 1], p):
+            square = (3 * root * root + curve.a) % p
+            square_root = mod_sqrt(square, p)
+            if square == 0 or pow(square_root, 2, mod=p) != square:
+                continue
+            b = pow(square_root, -1, p)
+            return cls(p, (3 * root * b) % p, b)
+        raise ValueError(f"{curve} has no Montgomery form")
+
+
+__all__ = ("MontgomeryCurve",)
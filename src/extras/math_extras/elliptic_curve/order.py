@@ -0,0 +1,280 @@
+import functools
+from math import gcd, isqrt
+from typing import NamedTuple
+
+from extras.math_extras.factorise import prime_factorise
+from extras.math_extras.prime_sieve import sieve_primes_less_than
+from utils.typedefs import PrimeFactorisation
+
+from .curve import AffinePointABC, Curve, to_raw_affine
+from .raw import *
+from .schoof import schoof_trace_of_frobenius
+
+_legendre_max_field_bit_length = 16
+_bsgs_max_candidate_count = 1 << 30
+_bsgs_max_solution_count = 64
+_max_random_points = 32
+
+
+class CurveOrder(NamedTuple):
+    order: int
+    """the number of points on the curve, including the point at infinity"""
+    factorisation: PrimeFactorisation
+
+    @property
+    def subgroup_order(self) -> int:
+        """the order of the largest subgroup of prime order, in which discrete logarithms are hardest"""
+        return max(self.factorisation, default=1)
+
+    @property
+    def cofactor(self) -> int:
+        return self.order // self.subgroup_order
+
+
+def _check_nonsingular(curve: Curve) -> None:
+    if (4 * pow(curve.a, 3, mod=curve.p) + 27 * pow(curve.b, 2, mod=curve.p)) % curve.p == 0:
+        raise ValueError(f"{curve} is singular")
+
+
+def _hasse_interval(curve: Curve) -> tuple[int, int]:
+    """|p + 1 - #E| <= 2 sqrt(p)"""
+    trace_bound = isqrt(4 * curve.p)
+    return curve.p + 1 - trace_bound, curve.p + 1 + trace_bound
+
+
+def legendre_curve_order(curve: Curve) -> int:
+    """Count points with one Legendre symbol per x-coordinate, in O(p) time."""
+    p = curve.p
+    order = p + 1
+    for x in range(p):
+        yy = (pow(x, 3, mod=p) + (curve.a * x) + curve.b) % p
+        if yy == 0:
+            continue
+        order += 1 if pow(yy, (p - 1) // 2, mod=p) == 1 else -1
+    return order
+
+
+def _quadratic_twist(curve: Curve) -> Curve:
+    """:return: the curve d y^2 = x^3 + a x + b for a non-residue d, in Weierstrass form, which has 2p + 2 - #E points"""
+    p = curve.p
+    d = 2
+    while pow(d, (p - 1) // 2, mod=p) != p - 1:
+        d += 1
+    return Curve(p, (curve.a * d * d) % p, (curve.b * d * d * d) % p)
+
+
+def _annihilating_orders(
+    curve: Curve,
+    point: AffinePointABC,
+    residue: int,
+    modulus: int,
+    lower_bound: int,
+    upper_bound: int,
+) -> list[int] | None:
+    """
+    Find every N in [lower_bound, upper_bound] with N = residue (mod modulus) and N P = 0, by baby-step giant-step.
+
+    :return: the orders found, or None if there would be too many of them (since P has small order)
+    """
+    first = lower_bound + (residue - lower_bound) % modulus
+    if first > upper_bound:
+        return []
+    span = (upper_bound - first) // modulus  # candidates are first + s modulus for 0 <= s <= span
+
+    p, a = curve.raw_parameters()
+    point_raw = raw_to_jacobian(to_raw_affine(point))
+    stride = raw_to_jacobian(raw_to_affine(raw_scalar_mul(modulus, point_raw, p, a), p))
+    if stride[2] == 0:
+        if raw_scalar_mul(first, point_raw, p, a)[2] != 0:
+            return []
+        if span + 1 > _bsgs_max_solution_count:
+            return None
+        return [first + s * modulus for s in range(span + 1)]
+
+    # solve A + u stride = 0 for |u| <= span / 2, where A = (first + centre modulus) P
+    centre = span // 2
+    m = isqrt(span // 2) + 1
+    table: dict[int, int] = {}
+    for j, baby_step in enumerate(raw_affine_progression(stride, stride, m, p, a), start=1):
+        if baby_step is None:
+            return None  # the stride has order at most m
+        x, y = baby_step
+        if x in table:
+            return None  # the stride has order at most 2m, so baby steps aren't unique up to sign
+        table[x] = j if y % 2 == 0 else -j
+
+    # -u = i (2m + 1) + j for |j| <= m, so that A - i (2m + 1) stride = j stride
+    giant_stride = 2 * m + 1
+    giant_step_bound = (span - centre + m) // giant_stride + 1
+    giant_step = raw_to_jacobian(raw_to_affine(raw_negate(raw_scalar_mul(giant_stride, stride, p, a), p), p))
+    start = raw_add(
+        raw_scalar_mul(first + centre * modulus, point_raw, p, a),
+        raw_scalar_mul(giant_step_bound * giant_stride, stride, p, a),
+        p,
+        a,
+    )
+
+    orders = []
+    for index, residual in enumerate(raw_affine_progression(start, giant_step, 2 * giant_step_bound + 1, p, a)):
+        i = index - giant_step_bound
+        if residual is None:
+            j = 0
+        else:
+            x, y = residual
+            signed_j = table.get(x)
+            if signed_j is None:
+                continue
+            j = signed_j if y % 2 == 0 else -signed_j
+        s = centre - (i * giant_stride + j)
+        if 0 <= s <= span:
+            orders.append(first + s * modulus)
+            if len(orders) > _bsgs_max_solution_count:
+                return None
+    return sorted(orders)
+
+
+def bsgs_curve_order(curve: Curve, trace_residue: int = 0, trace_modulus: int = 1) -> int:
+    """
+    Find the order of the curve by baby-step giant-step (Mestre's algorithm), given the trace of Frobenius t modulo
+    `trace_modulus`, in O(p^(1/4) / sqrt(trace_modulus)) time.
+
+    The orders N in the Hasse interval (with p + 1 - N = t) for which NP = 0 are found for random points P, until only
+    one is consistent with all of them. If the group's exponent is too small for that, points on the quadratic twist,
+    which has 2p + 2 - N points, break the tie.
+    """
+    _check_nonsingular(curve)
+    p = curve.p
+    lower_bound, upper_bound = _hasse_interval(curve)
+    order_residue = (p + 1 - trace_residue) % trace_modulus
+    twist = _quadratic_twist(curve)
+
+    candidates: set[int] | None = None
+    for attempt in range(_max_random_points):
+        # fall back to alternating with the twist, in case the curve's group has a small exponent
+        if attempt >= 4 and attempt % 2 == 1:
+            orders = _annihilating_orders(
+                twist,
+                twist.random_affine_point(),
+                (2 * p + 2 - order_residue) % trace_modulus,
+                trace_modulus,
+                lower_bound,
+                upper_bound,
+            )
+            if orders is not None:
+                orders = [2 * p + 2 - order for order in orders]
+        else:
+            orders = _annihilating_orders(
+                curve,
+                curve.random_affine_point(),
+                order_residue,
+                trace_modulus,
+                lower_bound,
+                upper_bound,
+            )
+        if orders is None:
+            continue
+        candidates = set(orders) if candidates is None else candidates & set(orders)
+        if len(candidates) == 1:
+            return candidates.pop()
+
+    raise Exception(f"Order not determined. Curve: {curve}")
+
+
+def schoof_curve_order(curve: Curve) -> int:
+    """
+    Find the trace of Frobenius modulo small primes by Schoof's algorithm, until few enough orders remain that
+    baby-step giant-step can pick out the right one.
+    """
+    _check_nonsingular(curve)
+    lower_bound, upper_bound = _hasse_interval(curve)
+    candidate_count = upper_bound - lower_bound + 1
+    primes = []
+    product = 1
+    for prime in sieve_primes_less_than(1 << 10):
+        if product * _bsgs_max_candidate_count >= candidate_count:
+            break
+        if prime == curve.p:
+            continue
+        primes.append(prime)
+        product *= prime
+    trace_residue, trace_modulus = schoof_trace_of_frobenius(curve, primes)
+    return bsgs_curve_order(curve, trace_residue, trace_modulus)
+
+
+@functools.cache
+def curve_order(curve: Curve) -> CurveOrder:
+    """
+    Count the points on the curve, choosing an algorithm by the size of the field: summing Legendre symbols for
+    tiny fields, baby-step giant-step for fields of up to about 64 bits, and Schoof's algorithm beyond that.
+    The result (including the factorised order) is cached, so that checks against it are cheap.
+    """
+    _check_nonsingular(curve)
+    if curve.p.bit_length() <= _legendre_max_field_bit_length:
+        order = legendre_curve_order(curve)
+    else:
+        lower_bound, upper_bound = _hasse_interval(curve)
+        if upper_bound - lower_bound < _bsgs_max_candidate_count:
+            order = bsgs_curve_order(curve)
+        else:
+            order = schoof_curve_order(curve)
+    return CurveOrder(order, prime_factorise(order))
+
+
+def point_order(curve: Curve, point: AffinePointABC) -> int:
+    """The order of a point is the least n > 0 such that nP = 0; it divides the order of the curve."""
+    order = curve_order(curve)
+    point_order = order.order
+    for prime, exponent in order.factorisation.items():
+        for _ in range(exponent):
+            if not curve.scalar_mul_affine_point(point_order // prime, point).is_at_infinity():
+                break
+            point_order //= prime
+    return point_order
+
+
+def is_anomalous(curve: Curve) -> bool:
+    """Anomalous curves, with exactly p points, are vulnerable to Smart's attack (lifting to the p-adic numbers)."""
+    return curve_order(curve).order == curve.p
+
+
+def is_smooth_order(curve: Curve, bound: int = 1 << 48) -> bool:
+    """Curves whose order has no prime factor above `bound` are vulnerable to Pohlig-Hellman."""
+    return curve_order(curve).subgroup_order <= bound
+
+
+def embedding_degree(curve: Curve, max_degree: int = 20) -> int | None:
+    """
+    :return: the least k (up to `max_degree`) such that the largest prime-order subgroup embeds in the multiplicative
+        group of F_(p^k), i.e. such that its order divides p^k - 1, or None if there is none
+    """
+    subgroup_order = curve_order(curve).subgroup_order
+    if subgroup_order == 1 or gcd(subgroup_order, curve.p) != 1:
+        return None
+    power = 1
+    for degree in range(1, max_degree + 1):
+        power = (power * curve.p) % subgroup_order
+        if power == 1:
+            return degree
+    return None
+
+
+def is_mov_vulnerable(curve: Curve, max_degree: int = 6) -> bool:
+    """
+    Curves of small embedding degree (e.g. supersingular curves, whose embedding degree is at most 6) are vulnerable
+    to the MOV/Frey-Ruck attack, which reduces discrete logarithms to the (easier) finite field F_(p^k).
+    """
+    return embedding_degree(curve, max_degree) is not None
+
+
+__all__ = (
+    "CurveOrder",
+    "legendre_curve_order",
+    "bsgs_curve_order",
+    "schoof_curve_order",
+    "curve_order",
+    "point_order",
+    "is_anomalous",
+    "is_smooth_order",
+    "embedding_degree",
+    "is_mov_vulnerable",
+)
@@ -0,0 +1,111 @@
+"""
+Polynomials over F_p, as lists of coefficients, least significant first, without trailing zeroes.
+
+They are multiplied by Kronecker substitution: packed into (large) integers, multiplied as integers, and unpacked.
+"""
+from random import randrange
+
+type Polynomial = list[int]
+
+
+def trim(a: Polynomial) -> Polynomial:
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+
+def add(a: Polynomial, b: Polynomial, p: int) -> Polynomial:
+    if len(a) < len(b):
+        a, b = b, a
+    return trim([(x + y) % p for x, y in zip(a, b)] + a[len(b):])
+
+
+def sub(a: Polynomial, b: Polynomial, p: int) -> Polynomial:
+    return add(a, [-y % p for y in b], p)
+
+
+def scale(a: Polynomial, c: int, p: int) -> Polynomial:
+    return trim([(x * c) % p for x in a])
+
+
+def mul(a: Polynomial, b: Polynomial, p: int) -> Polynomial:
+    if not a or not b:
+        return []
+    width = (2 * p.bit_length() + min(len(a), len(b)).bit_length() + 7) // 8
+    packed_a = int.from_bytes(b"".join(x.to_bytes(width, "little") for x in a), "little")
+    packed_b = int.from_bytes(b"".join(x.to_bytes(width, "little") for x in b), "little")
+    length = len(a) + len(b) - 1
+    product = (packed_a * packed_b).to_bytes(length * width, "little")
+    return trim([int.from_bytes(product[i:i + width], "little") % p for i in range(0, length * width, width)])
+
+
+def divmod(a: Polynomial, b: Polynomial, p: int) -> tuple[Polynomial, Polynomial]:
+    if not b:
+        raise ZeroDivisionError
+    remainder = list(a)
+    quotient = [0] * max(0, len(a) - len(b) + 1)
+    leading_inverse = pow(b[-1], -1, p)
+    for shift in range(len(a) - len(b), -1, -1):
+        c = (remainder[shift + len(b) - 1] * leading_inverse) % p
+        quotient[shift] = c
+        if c:
+            for i, y in enumerate(b):
+                remainder[shift + i] = (remainder[shift + i] - c * y) % p
+    return trim(quotient), trim(remainder[:len(b) - 1])
+
+
+def monic(a: Polynomial, p: int) -> Polynomial:
+    return scale(a, pow(a[-1], -1, p), p)
+
+
+def gcd(a: Polynomial, b: Polynomial, p: int) -> Polynomial:
+    while b:
+        a, b = b, divmod(a, b, p)[1]
+    return monic(a, p) if a else a
+
+
+def evaluate(a: Polynomial, x: int, p: int) -> int:
+    value = 0
+    for coefficient in reversed(a):
+        value = (value * x + coefficient) % p
+    return value
+
+
+def pow_mod(a: Polynomial, exponent: int, modulus: Polynomial, p: int) -> Polynomial:
+    """:return: a^exponent modulo the polynomial `modulus`"""
+    result = [1]
+    a = divmod(a, modulus, p)[1]
+    for bit in bin(exponent)[2:]:
+        result = divmod(mul(result, result, p), modulus, p)[1]
+        if bit == "1":
+            result = divmod(mul(result, a, p), modulus, p)[1]
+    return result
+
+
+def roots(a: Polynomial, p: int) -> list[int]:
+    """
+    Find the distinct roots of a polynomial in F_p, for prime p, by Cantor-Zassenhaus equal-degree splitting: the
+    product of the linear factors is gcd(x^p - x, a), and for random d, gcd((x + d)^((p - 1) / 2) - 1, ...) is a
+    product of about half of them.
+    """
+    if p < 3:
+        return [x for x in range(p) if evaluate(a, x, p) == 0]
+    a = monic(trim([coefficient % p for coefficient in a]), p)
+    if len(a) <= 1:
+        raise ValueError("the zero polynomial has every root")
+
+    found = []
+    factors = [gcd(sub(pow_mod([0, 1], p, a, p), [0, 1], p), a, p)]
+    while factors:
+        factor = factors.pop()
+        if len(factor) <= 1:
+            continue
+        if len(factor) == 2:
+            found.append(-factor[0] % p)
+            continue
+        while True:
+            split = gcd(sub(pow_mod([randrange(p), 1], (p - 1) // 2, factor, p), [1], p), factor, p)
+            if 1 < len(split) < len(factor):
+                break
+        factors += [split, divmod(factor, split, p)[0]]
+    return sorted(found)
@@ -0,0 +1,260 @@
+"""
+Arithmetic on points of the curve y^2 = x^3 + ax + b over F_p, represented as bare tuples rather than as the point
+dataclasses of `curve`: a Jacobian point is (x, y, z), with z = 0 for the point at infinity, and an affine point is
+(x, y), or None for the point at infinity.
+
+These functions do no type checks and construct nothing but tuples, so that long chains of operations (scalar
+multiplications, walks, tables of multiples) avoid the cost of virtual `is_at_infinity()` calls, `isinstance` checks
+against abstract base classes and frozen dataclass construction at every step. `Curve` is a thin wrapper over them.
+
+Coordinates and parameters may be Python ints or gmpy2 `mpz`s. Passing the modulus as an `mpz` (see
+`field_element_type`) makes every reduced result an `mpz`, whose modular arithmetic is about twice as fast for
+cryptographically-sized moduli.
+"""
+
+from typing import Callable, Generator, Iterable
+
+from extras.math_extras.batch_inversion import batch_mod_inverse
+
+from .scalar_multiplication import default_window_width, sliding_window_digits, wnaf_digits
+
+try:
+    from gmpy2 import mpz
+except ImportError:
+    mpz = None
+
+_mpz_min_modulus_bit_length = 31
+
+type RawJacobianPoint = tuple[int, int, int]
+type RawAffinePoint = tuple[int, int] | None
+
+raw_infinity: RawJacobianPoint = (1, 1, 0)
+
+
+def field_element_type(p: int) -> Callable[[int], int]:
+    """
+    :return: the faster type for arithmetic modulo p: gmpy2's `mpz`, unless p fits in a single (30-bit) digit of a
+        Python int, for which the overhead of calling into GMP dominates
+    """
+    if mpz is None or p.bit_length() < _mpz_min_modulus_bit_length:
+        return int
+    return mpz
+
+
+def raw_to_jacobian(point: RawAffinePoint) -> RawJacobianPoint:
+    if point is None:
+        return raw_infinity
+    return point[0], point[1], 1
+
+
+def raw_to_affine(point: RawJacobianPoint, p: int) -> RawAffinePoint:
+    x, y, z = point
+    if z == 0:
+        return None
+    inv_z = pow(z, -1, p)
+    inv_zz = inv_z * inv_z % p
+    return x * inv_zz % p, y * inv_zz * inv_z % p
+
+
+def raw_to_affine_batch(points: Iterable[RawJacobianPoint], p: int) -> list[RawAffinePoint]:
+    """Convert many points to affine coordinates with a single modular inversion."""
+    points = list(points)
+    inv_zs = iter(batch_mod_inverse((z for _, _, z in points if z != 0), p))
+
+    affines = []
+    for x, y, z in points:
+        if z == 0:
+            affines.append(None)
+            continue
+        inv_z = next(inv_zs)
+        inv_zz = inv_z * inv_z % p
+        affines.append((x * inv_zz % p, y * inv_zz * inv_z % p))
+    return affines
+
+
+def raw_unit_z_batch(points: Iterable[RawJacobianPoint], p: int) -> list[RawJacobianPoint]:
+    """Scale many points to z = 1 with a single modular inversion."""
+    return [raw_to_jacobian(affine) for affine in raw_to_affine_batch(points, p)]
+
+
+def raw_negate(point: RawJacobianPoint, p: int) -> RawJacobianPoint:
+    x, y, z = point
+    return x, -y % p, z
+
+
+def raw_double(point: RawJacobianPoint, p: int, a: int) -> RawJacobianPoint:
+    x, y, z = point
+    if z == 0:
+        return point
+
+    # https://www.hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html#doubling-dbl-2007-bl
+    xx = x * x % p
+    yy = y * y % p
+    yyyy = yy * yy % p
+    zz = z * z % p
+    s = 2 * ((x + yy) * (x + yy) - xx - yyyy) % p
+    m = (3 * xx + a * zz * zz) % p
+    t = (m * m - 2 * s) % p
+    return t, (m * (s - t) - 8 * yyyy) % p, ((y + z) * (y + z) - yy - zz) % p
+
+
+def raw_add(p1: RawJacobianPoint, p2: RawJacobianPoint, p: int, a: int) -> RawJacobianPoint:
+    x1, y1, z1 = p1
+    x2, y2, z2 = p2
+    if z1 == 0:
+        return p2
+    if z2 == 0:
+        return p1
+    if z2 == 1:
+        return raw_add_unit_z(p1, p2, p, a)
+    if z1 == 1:
+        return raw_add_unit_z(p2, p1, p, a)
+
+    # https://www.hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html#addition-add-2007-bl
+    z1z1 = z1 * z1 % p
+    z2z2 = z2 * z2 % p
+    u1 = x1 * z2z2 % p
+    u2 = x2 * z1z1 % p
+    s1 = y1 * z2 * z2z2 % p
+    s2 = y2 * z1 * z1z1 % p
+    h = (u2 - u1) % p
+    if h == 0:
+        # the points share an x-coordinate, so are either equal or inverses
+        if s1 == s2:
+            return raw_double(p1, p, a)
+        return raw_infinity
+    i = 4 * h * h % p
+    j = h * i % p
+    r = 2 * (s2 - s1) % p
+    v = u1 * i % p
+    x3 = (r * r - j - 2 * v) % p
+    return x3, (r * (v - x3) - 2 * s1 * j) % p, ((z1 + z2) * (z1 + z2) - z1z1 - z2z2) * h % p
+
+
+def raw_add_unit_z(p1: RawJacobianPoint, p2: RawJacobianPoint, p: int, a: int) -> RawJacobianPoint:
+    """Add a finite point to one with z = 1."""
+    x1, y1, z1 = p1
+    x2, y2, _ = p2
+
+    # https://www.hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html#addition-madd-2007-bl
+    z1z1 = z1 * z1 % p
+    u2 = x2 * z1z1 % p
+    s2 = y2 * z1 * z1z1 % p
+    h = (u2 - x1) % p
+    if h == 0:
+        if s2 == y1 % p:
+            return raw_double(p1, p, a)
+        return raw_infinity
+    hh = h * h % p
+    i = 4 * hh % p
+    j = h * i % p
+    r = 2 * (s2 - y1) % p
+    v = x1 * i % p
+    x3 = (r * r - j - 2 * v) % p
+    return x3, (r * (v - x3) - 2 * y1 * j) % p, ((z1 + h) * (z1 + h) - z1z1 - hh) % p
+
+
+def raw_odd_multiples(point: RawJacobianPoint, count: int, p: int, a: int) -> list[RawJacobianPoint]:
+    """:return: the points P, 3P, 5P, ..., (2 count - 1)P, not scaled to z = 1"""
+    multiples = [point]
+    if count > 1:
+        doubled = raw_double(point, p, a)
+        for _ in range(count - 1):
+            multiples.append(raw_add(multiples[-1], doubled, p, a))
+    return multiples
+
+
+def raw_scalar_mul_wnaf(
+    k: int,
+    odd_multiples: list[RawJacobianPoint],
+    window_width: int,
+    p: int,
+    a: int,
+) -> RawJacobianPoint:
+    """Multiply by a scalar in width-w non-adjacent form, given the odd multiples P, 3P, ..., (2^(w-1) - 1)P."""
+    negated_multiples = [raw_negate(multiple, p) for multiple in odd_multiples]
+    accumulator = raw_infinity
+    for digit in reversed(wnaf_digits(k, window_width)):
+        accumulator = raw_double(accumulator, p, a)
+        if digit > 0:
+            accumulator = raw_add(accumulator, odd_multiples[digit >> 1], p, a)
+        elif digit < 0:
+            accumulator = raw_add(accumulator, negated_multiples[-digit >> 1], p, a)
+    return accumulator
+
+
+def raw_scalar_mul(k: int, point: RawJacobianPoint, p: int, a: int, window_width: int = None) -> RawJacobianPoint:
+    if k < 0:
+        raise ValueError
+    if k == 0 or point[2] == 0:
+        return raw_infinity
+    if window_width is None:
+        window_width = default_window_width(k)
+    odd_multiples = raw_unit_z_batch(raw_odd_multiples(point, 1 << (window_width - 2), p, a), p)
+    return raw_scalar_mul_wnaf(k, odd_multiples, window_width, p, a)
+
+
+def raw_scalar_mul_sliding_window(
+    k: int,
+    point: RawJacobianPoint,
+    p: int,
+    a: int,
+    window_width: int = None,
+) -> RawJacobianPoint:
+    if k < 0:
+        raise ValueError
+    if k == 0 or point[2] == 0:
+        return raw_infinity
+    if window_width is None:
+        window_width = default_window_width(k)
+    odd_multiples = raw_unit_z_batch(raw_odd_multiples(point, 1 << (window_width - 1), p, a), p)
+
+    accumulator = raw_infinity
+    for doubling_count, window_value in sliding_window_digits(k, window_width):
+        for _ in range(doubling_count):
+            accumulator = raw_double(accumulator, p, a)
+        if window_value:
+            accumulator = raw_add(accumulator, odd_multiples[window_value >> 1], p, a)
+    return accumulator
+
+
+def raw_affine_progression(
+    start: RawJacobianPoint,
+    step: RawJacobianPoint,
+    count: int,
+    p: int,
+    a: int,
+    chunk_length: int = 1024,
+) -> Generator[RawAffinePoint]:
+    """
+    Yield the points start, start + step, ..., start + (count - 1) step, converting each chunk of them to affine
+    coordinates with a single inversion.
+    """
+    cursor = start
+    for chunk_start in range(0, count, chunk_length):
+        chunk = []
+        for _ in range(min(chunk_length, count - chunk_start)):
+            chunk.append(cursor)
+            cursor = raw_add(cursor, step, p, a)
+        yield from raw_to_affine_batch(chunk, p)
+
+
+__all__ = (
+    "field_element_type",
+    "RawJacobianPoint",
+    "RawAffinePoint",
+    "raw_infinity",
+    "raw_to_jacobian",
+    "raw_to_affine",
+    "raw_to_affine_batch",
+    "raw_unit_z_batch",
+    "raw_negate",
+    "raw_double",
+    "raw_add",
+    "raw_add_unit_z",
+    "raw_odd_multiples",
+    "raw_scalar_mul_wnaf",
+    "raw_scalar_mul",
+    "raw_scalar_mul_sliding_window",
+    "raw_affine_progression",
+)
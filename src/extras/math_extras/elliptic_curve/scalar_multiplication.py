@@ -0,0 +1,68 @@
+from typing import Generator
+
+
+def default_window_width(k: int) -> int:
+    """
+    Choose a window width for a scalar, balancing the cost of precomputing 2^(w-2) (or 2^(w-1)) odd multiples
+    against the additions saved.
+    """
+    bit_length = k.bit_length()
+    if bit_length <= 8:
+        return 2
+    if bit_length <= 64:
+        return 3
+    if bit_length <= 256:
+        return 4
+    return 5
+
+
+def wnaf_digits(k: int, width: int) -> list[int]:
+    """
+    :return: the width-`width` non-adjacent form of `k`, least significant digit first. Each digit is zero or odd
+        and less than 2^(width-1) in magnitude, and of any `width` consecutive digits at most one is non-zero.
+    """
+    if k < 0:
+        raise ValueError
+    if width < 2:
+        raise ValueError
+    modulus = 1 << width
+    half_modulus = modulus >> 1
+    digits = []
+    while k > 0:
+        if k & 1:
+            digit = k & (modulus - 1)
+            if digit >= half_modulus:
+                digit -= modulus
+            k -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        k >>= 1
+    return digits
+
+
+def sliding_window_digits(k: int, width: int) -> Generator[tuple[int, int]]:
+    """
+    Split `k` into windows of up to `width` bits which start and end with a 1, separated by runs of zeroes.
+
+    :return: (shift, value) pairs, most significant first, such that folding `accumulator = (accumulator << shift)
+        + value` over them from zero yields `k`. Each value is zero or odd and less than 2^width.
+    """
+    if k < 0:
+        raise ValueError
+    if width < 1:
+        raise ValueError
+    i = k.bit_length() - 1
+    while i >= 0:
+        if not (k >> i) & 1:
+            yield 1, 0
+            i -= 1
+            continue
+        j = max(i - width + 1, 0)
+        while not (k >> j) & 1:
+            j += 1
+        yield i - j + 1, (k >> j) & ((1 << (i - j + 1)) - 1)
+        i = j - 1
+
+
+__all__ = ("default_window_width", "wnaf_digits", "sliding_window_digits",)
@@ -0,0 +1,284 @@
+"""
+https://en.wikipedia.org/wiki/Schoof%27s_algorithm
+"""
+from typing import Callable
+
+from . import polynomial as poly
+from .curve import Curve
+from .polynomial import Polynomial
+
+type RingPoint = tuple[Polynomial, Polynomial, Polynomial]
+"""a point in Jacobian coordinates whose coordinates are elements of a polynomial quotient ring"""
+
+
+class _NonTrivialFactorException(Exception):
+    def __init__(self, factor: Polynomial) -> None:
+        super().__init__()
+        self.factor = factor
+
+
+class _QuotientRing:
+    """The ring F_p[x] / (modulus), for a monic modulus."""
+
+    def __init__(self, p: int, modulus: Polynomial) -> None:
+        self.p = p
+        self.modulus = modulus
+        self.degree = len(modulus) - 1
+        # Newton iteration for the inverse of the reversed modulus as a power series, for division-free reduction
+        reversed_modulus = modulus[::-1]
+        inverse = [1]
+        precision = 1
+        while precision < self.degree:
+            precision = min(2 * precision, self.degree)
+            correction = poly.mul(reversed_modulus[:precision], inverse, p)[:precision]
+            correction = poly.sub([2], correction, p)
+            inverse = poly.mul(inverse, correction, p)[:precision]
+        self._reversed_modulus_inverse = inverse
+
+    def reduce(self, a: Polynomial) -> Polynomial:
+        excess = len(a) - self.degree
+        if excess <= 0:
+            return a
+        if excess > len(self._reversed_modulus_inverse):
+            return poly.divmod(a, self.modulus, self.p)[1]
+        reversed_quotient = poly.mul(a[:self.degree - 1:-1], self._reversed_modulus_inverse[:excess], self.p)[:excess]
+        quotient = reversed_quotient[::-1] if len(reversed_quotient) == excess else \
+            ([0] * (excess - len(reversed_quotient)) + reversed_quotient[::-1])
+        return poly.trim(poly.sub(a, poly.mul(quotient, self.modulus, self.p), self.p)[:self.degree])
+
+    def mul(self, a: Polynomial, b: Polynomial) -> Polynomial:
+        return self.reduce(poly.mul(a, b, self.p))
+
+    def add(self, a: Polynomial, b: Polynomial) -> Polynomial:
+        return poly.add(a, b, self.p)
+
+    def sub(self, a: Polynomial, b: Polynomial) -> Polynomial:
+        return poly.sub(a, b, self.p)
+
+    def scale(self, a: Polynomial, c: int) -> Polynomial:
+        return poly.scale(a, c, self.p)
+
+    def pow(self, a: Polynomial, exponent: int) -> Polynomial:
+        result = [1]
+        for bit in bin(exponent)[2:]:
+            result = self.mul(result, result)
+            if bit == "1":
+                result = self.mul(result, a)
+        return result
+
+    def check_invertible(self, a: Polynomial) -> None:
+        """Raise _NonTrivialFactorException if `a` shares a factor with the modulus."""
+        common_factor = poly.gcd(self.modulus, a, self.p)
+        if len(common_factor) > 1:
+            raise _NonTrivialFactorException(common_factor)
+
+    def double(self, point: RingPoint, a: Polynomial) -> RingPoint:
+        # https://www.hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html#doubling-dbl-2007-bl
+        x, y, z = point
+        xx = self.mul(x, x)
+        yy = self.mul(y, y)
+        yyyy = self.mul(yy, yy)
+        zz = self.mul(z, z)
+        x_plus_yy = self.add(x, yy)
+        s = self.scale(self.sub(self.sub(self.mul(x_plus_yy, x_plus_yy), xx), yyyy), 2)
+        m = self.add(self.scale(xx, 3), self.mul(a, self.mul(zz, zz)))
+        t = self.sub(self.mul(m, m), self.scale(s, 2))
+        y3 = self.sub(self.mul(m, self.sub(s, t)), self.scale(yyyy, 8))
+        y_plus_z = self.add(y, z)
+        z3 = self.sub(self.sub(self.mul(y_plus_z, y_plus_z), yy), zz)
+        return t, y3, z3
+
+    def add_points(self, first: RingPoint, second: RingPoint) -> RingPoint:
+        # https://www.hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html#addition-add-2007-bl
+        x1, y1, z1 = first
+        x2, y2, z2 = second
+        z1z1 = self.mul(z1, z1)
+        z2z2 = self.mul(z2, z2)
+        u1 = self.mul(x1, z2z2)
+        u2 = self.mul(x2, z1z1)
+        s1 = self.mul(y1, self.mul(z2, z2z2))
+        s2 = self.mul(y2, self.mul(z1, z1z1))
+        h = self.sub(u2, u1)
+        h_doubled = self.scale(h, 2)
+        i = self.mul(h_doubled, h_doubled)
+        j = self.mul(h, i)
+        r = self.scale(self.sub(s2, s1), 2)
+        v = self.mul(u1, i)
+        x3 = self.sub(self.sub(self.mul(r, r), j), self.scale(v, 2))
+        y3 = self.sub(self.mul(r, self.sub(v, x3)), self.scale(self.mul(s1, j), 2))
+        z1_plus_z2 = self.add(z1, z2)
+        z3 = self.mul(self.sub(self.sub(self.mul(z1_plus_z2, z1_plus_z2), z1z1), z2z2), h)
+        return x3, y3, z3
+
+    def scalar_mul(self, k: int, point: RingPoint, a: Polynomial) -> RingPoint:
+        accumulator = point
+        for bit in bin(k)[3:]:
+            accumulator = self.double(accumulator, a)
+            if bit == "1":
+                accumulator = self.add_points(accumulator, point)
+        return accumulator
+
+    def x_coordinates_equal(self, first: RingPoint, second: RingPoint) -> bool:
+        return self.mul(first[0], self.mul(second[2], second[2])) == self.mul(second[0], self.mul(first[2], first[2]))
+
+    def y_coordinates_equal(self, first: RingPoint, second: RingPoint) -> bool:
+        first_zzz = self.mul(first[2], self.mul(first[2], first[2]))
+        second_zzz = self.mul(second[2], self.mul(second[2], second[2]))
+        return self.mul(first[1], second_zzz) == self.mul(second[1], first_zzz)
+
+
+class DivisionPolynomials:
+    """
+    The division polynomials of a curve, whose roots are the x-coordinates of its points of order dividing n.
+
+    For odd n these are polynomials in x alone; for even n, the division polynomial is y times the polynomial given.
+    """
+
+    def __init__(self, curve: Curve) -> None:
+        p, a, b = curve.p, curve.a % curve.p, curve.b % curve.p
+        self.p = p
+        self.f = [b, a, 0, 1]
+        self.f_squared = poly.mul(self.f, self.f, p)
+        self._half = pow(2, -1, p)
+        self._cache: dict[int, Polynomial] = {
+            0: [],
+            1: [1],
+            2: [2 % p],
+            3: poly.trim([(-a * a) % p, (12 * b) % p, (6 * a) % p, 0, 3 % p]),
+            4: poly.scale(
+                [(-8 * b * b - a * a * a) % p, (-4 * a * b) % p, (-5 * a * a) % p, (20 * b) % p, (5 * a) % p, 0, 1],
+                4,
+                p,
+            ),
+        }
+
+    def __getitem__(self, n: int) -> Polynomial:
+        if n in self._cache:
+            return self._cache[n]
+        p = self.p
+        m = n // 2
+        if n % 2 == 1:
+            first = poly.mul(self[m + 2], poly.mul(self[m], poly.mul(self[m], self[m], p), p), p)
+            second = poly.mul(self[m - 1], poly.mul(self[m + 1], poly.mul(self[m + 1], self[m + 1], p), p), p)
+            if m % 2 == 0:
+                first = poly.mul(first, self.f_squared, p)
+            else:
+                second = poly.mul(second, self.f_squared, p)
+            result = poly.sub(first, second, p)
+        else:
+            first = poly.mul(self[m + 2], poly.mul(self[m - 1], self[m - 1], p), p)
+            second = poly.mul(self[m - 2], poly.mul(self[m + 1], self[m + 1], p), p)
+            result = poly.scale(poly.mul(self[m], poly.sub(first, second, p), p), self._half, p)
+        self._cache[n] = result
+        return result
+
+
+def _trace_of_frobenius_modulo_2(curve: Curve) -> int:
+    p = curve.p
+    f = poly.trim([curve.b % p, curve.a % p, 0, 1])
+    ring = _QuotientRing(p, f)
+    x_to_the_p = ring.pow([0, 1], p)
+    # the trace is even if and only if the curve has a point of order 2, i.e. f has a root in F_p
+    has_root = len(poly.gcd(f, poly.sub(x_to_the_p, [0, 1], p), p)) > 1
+    return 0 if has_root else 1
+
+
+def _trace_of_frobenius_modulo_odd_prime(curve: Curve, l: int, modulus: Polynomial) -> int:
+    p = curve.p
+    ring = _QuotientRing(p, modulus)
+    f = ring.reduce(poly.trim([curve.b % p, curve.a % p, 0, 1]))
+    ff = ring.mul(f, f)
+
+    # the generic point (x, y) of order l is (x, 1) on f Y^2 = X^3 + a X + b, which is isomorphic to
+    # Y^2 = X^3 + a f^2 X + b f^3 by (X, Y) -> (f X, f^2 Y). Working there, y never appears in coordinates
+    a = ring.scale(ff, curve.a % p)
+
+    def on_twist(x: Polynomial, y: Polynomial) -> RingPoint:
+        return ring.mul(f, x), ring.mul(ff, y), [1]
+
+    x_p = ring.pow([0, 1], p)
+    y_p = ring.pow(f, (p - 1) // 2)
+    x_pp = ring.pow(x_p, p)
+    y_pp = ring.mul(y_p, ring.pow(y_p, p))
+
+    generic_point = on_twist([0, 1], [1])
+    frobenius = on_twist(x_p, y_p)
+    frobenius_squared = on_twist(x_pp, y_pp)
+    q = p % l
+    q_multiple = ring.scalar_mul(q, generic_point, a)
+
+    # Frobenius satisfies phi^2 - t phi + q = 0 on the l-torsion
+    x_difference = ring.sub(
+        ring.mul(frobenius_squared[0], ring.mul(q_multiple[2], q_multiple[2])),
+        q_multiple[0],
+    )
+    if not x_difference:
+        if not ring.y_coordinates_equal(frobenius_squared, q_multiple):
+            return 0  # phi^2 P = -qP, so t phi P = 0
+        # phi^2 P = qP, so phi = (2q / t) and t^2 = 4q (mod l)
+        w = next(w for w in range(1, l) if (w * w) % l == q)
+        w_multiple = ring.scalar_mul(w, generic_point, a)
+        return (2 * w) % l if ring.y_coordinates_equal(frobenius, w_multiple) else (-2 * w) % l
+    ring.check_invertible(x_difference)
+
+    target = ring.add_points(frobenius_squared, q_multiple)
+    tau_multiple = frobenius
+    for tau in range(1, (l - 1) // 2 + 1):
+        if tau == 2:
+            tau_multiple = ring.double(frobenius, a)
+        elif tau > 2:
+            tau_multiple = ring.add_points(tau_multiple, frobenius)
+        if ring.x_coordinates_equal(target, tau_multiple):
+            return tau if ring.y_coordinates_equal(target, tau_multiple) else l - tau
+
+    raise Exception(f"No trace found modulo {l}. Curve: {curve}")
+
+
+def trace_of_frobenius_modulo(
+    curve: Curve,
+    l: int,
+    division_polynomials: DivisionPolynomials = None,
+) -> int:
+    """
+    :return: the trace of Frobenius t (such that the curve has p + 1 - t points), modulo the small prime `l`
+    """
+    if l == 2:
+        return _trace_of_frobenius_modulo_2(curve)
+    if l == curve.p:
+        raise ValueError
+    if division_polynomials is None:
+        division_polynomials = DivisionPolynomials(curve)
+
+    modulus = poly.monic(division_polynomials[l], curve.p)
+    while True:
+        try:
+            return _trace_of_frobenius_modulo_odd_prime(curve, l, modulus)
+        except _NonTrivialFactorException as exception:
+            # the relation holds on every l-torsion point, so it suffices to work with the points whose
+            # x-coordinates are roots of either factor; take the smaller
+            factor = exception.factor
+            cofactor, _ = poly.divmod(modulus, factor, curve.p)
+            modulus = factor if len(factor) <= len(cofactor) else poly.monic(cofactor, curve.p)
+
+
+def schoof_trace_of_frobenius(
+    curve: Curve,
+    primes: list[int],
+    progress: Callable[[int, int], None] = None,
+) -> tuple[int, int]:
+    """
+    :return: (t mod L, L), where L is the product of the given small primes
+    """
+    division_polynomials = DivisionPolynomials(curve)
+    residue, modulus = 0, 1
+    for l in primes:
+        trace = trace_of_frobenius_modulo(curve, l, division_polynomials)
+        # combine t = residue (mod modulus) with t = trace (mod l)
+        residue += modulus * (((trace - residue) * pow(modulus, -1, l)) % l)
+        modulus *= l
+        if progress is not None:
+            progress(l, trace)
+    return residue, modulus
+
+
+__all__ = ("DivisionPolynomials", "trace_of_frobenius_modulo", "schoof_trace_of_frobenius",)
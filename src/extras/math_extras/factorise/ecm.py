@@ -0,0 +1,217 @@
+"""
+https://en.wikipedia.org/wiki/Lenstra_elliptic-curve_factorization
+
+Curves are in Montgomery form B y^2 = x^3 + A x^2 + x, chosen by Suyama's parametrisation (so that each has a group
+order divisible by 12), and points are kept as x-only projective coordinates (X : Z), on which the Montgomery ladder
+needs no inversions. Stage 1 multiplies a random point by every prime power up to B1; stage 2 then looks for a single
+further prime q in (B1, B2] dividing the order of the point modulo p, by the standard baby-step giant-step
+continuation: with q = m D +/- j, q Q = 0 iff x(m D Q) = x(j Q), so the product of X_m Z_j - X_j Z_m over all such q is
+divisible by p.
+"""
+import time
+from math import floor, gcd, log, prod
+from operator import index
+from random import randrange
+from typing import NamedTuple, Self, SupportsIndex
+
+import numpy as np
+from gmpy2 import mpz
+
+from extras.math_extras.prime_sieve import iterate_primes, prime_segments
+
+type XOnlyPoint = tuple[int, int]
+
+# (B1, expected curve count) to find factors of about 15, 20, 25, 30, 35, 40, 45 and 50 digits, after GMP-ECM
+ecm_levels = (
+    (2_000, 25),
+    (11_000, 90),
+    (50_000, 300),
+    (250_000, 700),
+    (1_000_000, 1_800),
+    (3_000_000, 5_100),
+    (11_000_000, 10_600),
+    (43_000_000, 19_300),
+)
+_b2_multiplier = 50
+
+
+class ECMFailure(Exception):
+    pass
+
+
+class _FactorFound(Exception):
+    def __init__(self, factor: int) -> None:
+        super().__init__(factor)
+        self.factor = factor
+
+
+def _x_double(point: XOnlyPoint, n: int, a24: int) -> XOnlyPoint:
+    """a24 = (A + 2) / 4"""
+    x, z = point
+    s = (x + z) * (x + z) % n
+    d = (x - z) * (x - z) % n
+    t = s - d
+    return s * d % n, t * (d + a24 * t) % n
+
+
+def _x_add(p1: XOnlyPoint, p2: XOnlyPoint, difference: XOnlyPoint, n: int) -> XOnlyPoint:
+    """:return: P1 + P2, given P1 - P2"""
+    x1, z1 = p1
+    x2, z2 = p2
+    u = (x1 - z1) * (x2 + z2) % n
+    v = (x1 + z1) * (x2 - z2) % n
+    return difference[1] * (u + v) * (u + v) % n, difference[0] * (u - v) * (u - v) % n
+
+
+def _x_mul(k: int, point: XOnlyPoint, n: int, a24: int) -> XOnlyPoint:
+    """the Montgomery ladder, keeping (kP, (k + 1)P) for k running through the leading bits of `k`"""
+    if k == 0:
+        return 1, 0
+    low, high = point, _x_double(point, n, a24)
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            low, high = _x_add(high, low, point, n), _x_double(high, n, a24)
+        else:
+            low, high = _x_double(low, n, a24), _x_add(high, low, point, n)
+    return low
+
+
+def _check(value: int, n: int) -> None:
+    g = gcd(value, n)
+    if 1 < g < n:
+        raise _FactorFound(int(g))
+
+
+def _suyama_curve(sigma: int, n: int) -> tuple[XOnlyPoint, int]:
+    """:return: a point (u^3 : v^3), and (A + 2) / 4 = (v - u)^3 (3u + v) / 16 u^3 v, for u = s^2 - 5 and v = 4s"""
+    u = (sigma * sigma - 5) % n
+    v = (4 * sigma) % n
+    denominator = 16 * pow(u, 3, n) * v % n
+    _check(denominator, n)
+    a24 = pow(v - u, 3, n) * (3 * u + v) * pow(denominator, -1, n) % n
+    return (pow(u, 3, n), pow(v, 3, n)), a24
+
+
+def _stage_1_multiplier(b1: int) -> int:
+    return prod(pow(prime, floor(log(b1, prime))) for prime in iterate_primes(b1 + 1))
+
+
+class _Stage2Plan(NamedTuple):
+    """
+    The primes q in (B1, B2] as q = m D +/- j, which are the same for every curve with the same bounds, so are worked
+    out once per level (streaming the primes rather than holding them).
+    """
+    d: int
+    first_giant_index: int
+    giant_counts: np.ndarray
+    """the number of primes with each giant index m, from `first_giant_index`"""
+    baby_indices: np.ndarray
+    """j, for each prime in increasing order"""
+
+    @classmethod
+    def build(cls, b1: int, b2: int) -> Self:
+        d = 2310 if b2 >= 1_000_000 else 210
+        # q > D / 2, so that q = m D +/- j with m >= 1
+        start = max(b1, d // 2) + 1
+        first_giant_index = (start + d // 2) // d
+        giant_counts = np.zeros(max((b2 + d // 2) // d - first_giant_index + 1, 0), dtype=np.uint16)
+        baby_index_segments = []
+        for primes in prime_segments(b2 + 1, start):
+            if len(primes) == 0:
+                continue
+            giant_indices = (primes + d // 2) // d
+            offset = int(giant_indices[0]) - first_giant_index
+            counts = np.bincount(giant_indices - giant_indices[0])
+            giant_counts[offset:offset + len(counts)] += counts.astype(np.uint16)
+            baby_index_segments.append(np.abs(primes - giant_indices * d).astype(np.uint16))
+        baby_indices = np.concatenate([np.empty(0, dtype=np.uint16), *baby_index_segments])
+        return cls(d, first_giant_index, giant_counts, baby_indices)
+
+
+def _stage_2(point: XOnlyPoint, n: int, a24: int, plan: _Stage2Plan) -> None:
+    """Raise `_FactorFound` if the order of `point` modulo a prime factor of n is q for some prime q in (B1, B2]."""
+    if len(plan.baby_indices) == 0:
+        return
+    d = plan.d
+
+    # jQ for odd j < D / 2, via (j + 2)Q = jQ + 2Q with difference (j - 2)Q
+    doubled = _x_double(point, n, a24)
+    baby_steps = {1: point, 3: _x_add(doubled, point, point, n)}
+    for j in range(5, d // 2 + 1, 2):
+        baby_steps[j] = _x_add(baby_steps[j - 2], doubled, baby_steps[j - 4], n)
+
+    step = _x_mul(d, point, n, a24)
+    giant_index = plan.first_giant_index
+    giant_step = _x_mul(giant_index * d, point, n, a24)
+    # 0Q is the point at infinity, which cannot be the difference in a differential addition; 2DQ is a doubling instead
+    previous_giant_step = None if giant_index == 1 else _x_mul((giant_index - 1) * d, point, n, a24)
+    accumulator = mpz(1)
+    position = 0
+    for count in plan.giant_counts.tolist():
+        x_m, z_m = giant_step
+        for j in plan.baby_indices[position:position + count].tolist():
+            x_j, z_j = baby_steps[j]
+            accumulator = accumulator * (x_m * z_j - x_j * z_m) % n
+        position += count
+        if giant_index == 1:
+            next_giant_step = _x_double(giant_step, n, a24)
+        else:
+            next_giant_step = _x_add(giant_step, step, previous_giant_step, n)
+        giant_step, previous_giant_step = next_giant_step, giant_step
+        giant_index += 1
+    _check(accumulator, n)
+
+
+def _run_curve(n: int, stage_1_multiplier: int, stage_2_plan: _Stage2Plan, sigma: int) -> int:
+    try:
+        point, a24 = _suyama_curve(sigma, n)
+        point = _x_mul(stage_1_multiplier, point, n, a24)
+        _check(point[1], n)
+        if point[1] % n != 0:
+            _stage_2(point, n, a24, stage_2_plan)
+    except _FactorFound as factor_found:
+        return factor_found.factor
+    raise ECMFailure
+
+
+def ecm_factorise_with_curve(value: SupportsIndex, b1: int, b2: int = None, sigma: int = None) -> int:
+    """
+    Run both stages on one curve.
+
+    :return: a non-trivial factor of `value`
+    :raise ECMFailure: if the curve's group order modulo every prime factor is not (B1, B2)-smooth
+    """
+    n = mpz(index(value))
+    if b2 is None:
+        b2 = _b2_multiplier * b1
+    if sigma is None:
+        sigma = randrange(6, int(n) - 1)
+    return _run_curve(n, _stage_1_multiplier(b1), _Stage2Plan.build(b1, b2), sigma)
+
+
+def ecm_factorise(value: SupportsIndex, time_budget: float = None) -> int:
+    """
+    Run curves at increasing B1 (as in `ecm_levels`, each level's curve count being enough to find most factors of
+    its size), until a factor is found.
+
+    :raise ECMFailure: if `time_budget` seconds pass without one
+    """
+    n = mpz(index(value))
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    levels = list(ecm_levels)
+    while True:
+        for b1, curve_count in levels:
+            stage_1_multiplier = _stage_1_multiplier(b1)
+            stage_2_plan = _Stage2Plan.build(b1, _b2_multiplier * b1)
+            for _ in range(curve_count):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise ECMFailure
+                try:
+                    return _run_curve(n, stage_1_multiplier, stage_2_plan, randrange(6, int(n) - 1))
+                except ECMFailure:
+                    pass
+        b1, curve_count = levels[-1]
+        levels = [(4 * b1, 2 * curve_count)]
+
+
+__all__ = ("ECMFailure", "ecm_levels", "ecm_factorise", "ecm_factorise_with_curve",)
@@ -1,20 +1,130 @@
+import time
+from typing import Callable, NamedTuple
+
+from extras.math_extras.primality import miller_rabin_primality_test
 from utils.typedefs import PrimeFactorisation
 
-from .trial_division_prime import trial_division_prime_factorise
-from .pollards_rho_prime import pollards_rho_prime_factorise
+from .ecm import ECMFailure, ecm_factorise
+from .lib import combine_factors_left, perfect_power
+from .pollards_p_minus_1 import PollardPMinus1Failure, pollards_p_minus_1_factorise
+from .pollards_rho import default_pollard_rho_factoriser
+from .siqs import SIQSFailure, siqs_factorise
+from .trial_division_prime import remove_small_prime_factors, trial_division_prime_factorise
+from .williams_p_plus_1 import WilliamsPPlus1Failure, williams_p_plus_1_factorise
 
 
 ten_digit_number = 9_999_999_999
+small_prime_bound = 1 << 16
+smoothness_bounds = (10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+siqs_digit_counts = range(30, 91)
+_rho_max_bit_length = 64
+# the share of the quadratic sieve's expected time to spend on each earlier stage, for cofactors in its range
+_siqs_time_fraction = 0.1
+_primality_test_round_count = 20
+
+
+class StageTimeBudgets(NamedTuple):
+    """
+    the most seconds to spend on each composite cofactor in each stage, before escalating to the next (for cofactors in
+    the range of the quadratic sieve, no more than a fraction of the time it is expected to take)
+    """
+    p_minus_1: float = 5.0
+    p_plus_1: float = 5.0
+    ecm: float = 10.0
+    """for cofactors in the range of the quadratic sieve only; otherwise, ECM runs until it succeeds"""
+
+
+default_stage_time_budgets = StageTimeBudgets()
+
+
+def siqs_expected_seconds(digit_count: int) -> float:
+    """a rough estimate of the time SIQS takes on a balanced semiprime: 0.15s at 30 digits, doubling every 3.3 digits"""
+    return 0.15 * 2 ** ((digit_count - siqs_digit_counts.start) / 3.3)
+
 
+def _escalate(attempt: Callable[[int], int], failure: type[Exception], time_budget: float) -> int | None:
+    """
+    Attempt to find a factor with each smoothness bound in turn. Each attempt takes about ten times as long as the
+    last, so an attempt is only started if that estimate fits in the remaining time.
+    """
+    deadline = time.monotonic() + time_budget
+    for bound in smoothness_bounds:
+        started = time.monotonic()
+        try:
+            return attempt(bound)
+        except failure:
+            pass
+        finished = time.monotonic()
+        if finished + 10 * (finished - started) > deadline:
+            return None
+    return None
 
-def prime_factorise(n: int) -> PrimeFactorisation:
+
+def find_factor(n: int, time_budgets: StageTimeBudgets = default_stage_time_budgets) -> int:
+    """
+    Find a non-trivial factor of an odd composite `n`, which is not a perfect power and has no small factors, by
+    escalating through Pollard's p - 1, Williams' p + 1, ECM, and then the self-initialising quadratic sieve (SIQS):
+    the first three find factors quickly when they are weak (p - 1 or p + 1 smooth) or small, and the last finds a
+    factor in a time depending only on the size of `n`.
+    """
+    if n.bit_length() <= _rho_max_bit_length:
+        return default_pollard_rho_factoriser(n)
+
+    digit_count = len(str(n))
+    if digit_count in siqs_digit_counts:
+        # weak factors are only worth looking for while it is quicker than sieving
+        time_budget_cap = _siqs_time_fraction * siqs_expected_seconds(digit_count)
+        time_budgets = StageTimeBudgets(*(min(time_budget, time_budget_cap) for time_budget in time_budgets))
+
+    factor = _escalate(
+        lambda bound: pollards_p_minus_1_factorise(n, bound), PollardPMinus1Failure, time_budgets.p_minus_1
+    )
+    if factor is not None:
+        return factor
+    factor = _escalate(
+        lambda bound: williams_p_plus_1_factorise(n, bound), WilliamsPPlus1Failure, time_budgets.p_plus_1
+    )
+    if factor is not None:
+        return factor
+
+    if digit_count not in siqs_digit_counts:
+        return ecm_factorise(n)
+    try:
+        return ecm_factorise(n, time_budgets.ecm)
+    except ECMFailure:
+        pass
+    while True:
+        try:
+            return siqs_factorise(n)
+        except SIQSFailure:
+            # bad luck with the polynomials; there are plenty more
+            pass
+
+
+def prime_factorise(n: int, time_budgets: StageTimeBudgets = default_stage_time_budgets) -> PrimeFactorisation:
     if n <= 0:
         raise ValueError
 
     if n <= ten_digit_number:
         return trial_division_prime_factorise(n)
 
-    return pollards_rho_prime_factorise(n)
+    factorisation, cofactor = remove_small_prime_factors(n, small_prime_bound)
+    # composite cofactors yet to be split, and their multiplicities
+    pending = [(cofactor, 1)] if cofactor > 1 else []
+    while pending:
+        cofactor, multiplicity = pending.pop()
+        if miller_rabin_primality_test(cofactor, _primality_test_round_count):
+            combine_factors_left(factorisation, {cofactor: multiplicity})
+            continue
+        root, exponent = perfect_power(cofactor)
+        if exponent > 1:
+            pending.append((root, multiplicity * exponent))
+            continue
+        factor = find_factor(cofactor, time_budgets)
+        pending.append((factor, multiplicity))
+        pending.append((cofactor // factor, multiplicity))
+
+    return factorisation
 
 
-__all__ = ("prime_factorise",)
+__all__ = ("StageTimeBudgets", "find_factor", "prime_factorise", "siqs_expected_seconds")
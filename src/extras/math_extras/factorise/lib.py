@@ -1,3 +1,6 @@
+from gmpy2 import iroot
+
+from extras.math_extras.prime_sieve import primes_less_than
 from utils.typedefs.factorise import *
 
 
@@ -8,4 +11,13 @@ def combine_factors_left(sink: PrimeFactorisation, source: PrimeFactorisation) -
     return sink
 
 
-__all__ = ("combine_factors_left",)
+def perfect_power(n: int) -> tuple[int, int]:
+    """:return: (r, e) such that n = r^e, with e prime, or (n, 1) if n is not a perfect power"""
+    for exponent in map(int, primes_less_than(n.bit_length() + 1)):
+        root, is_exact = iroot(n, exponent)
+        if is_exact:
+            return int(root), exponent
+    return n, 1
+
+
+__all__ = ("combine_factors_left", "perfect_power",)
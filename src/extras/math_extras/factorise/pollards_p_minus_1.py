@@ -2,7 +2,11 @@ from typing import SupportsIndex
 from operator import index
 from math import floor, log, gcd
 
-from extras.math_extras.prime_sieve import sieve_primes_less_than
+from gmpy2 import mpz
+
+from extras.math_extras.prime_table import default_prime_table
+
+_gcd_interval = 64
 
 
 class PollardPMinus1Failure(Exception):
@@ -10,22 +14,43 @@ class PollardPMinus1Failure(Exception):
 
 
 def pollards_p_minus_1_factorise(value: SupportsIndex, smoothness_bound: int = None) -> int:
+    """
+    https://en.wikipedia.org/wiki/Pollard%27s_p_%E2%88%92_1_algorithm
+
+    The gcd is taken once per block of primes; if it is `value` itself (every factor was found within the block at
+    once), the block is retried a prime power at a time.
+    """
     value = index(value)
     if smoothness_bound is None:
         smoothness_bound = 10_000
 
     assert value % 2 == 1  # even numbers have a trivial factorisation and break fixing the seed a=2
-    x = 2
-    primes = sieve_primes_less_than(smoothness_bound + 1)
-    for prime in primes:
-        max_exponent_less_than_smoothness_bound = floor(log(smoothness_bound, prime))
-        prime_power = pow(prime, max_exponent_less_than_smoothness_bound)
-        x = pow(x, prime_power, mod=value)
+    modulus = mpz(value)
+    x = mpz(2)
+    primes = default_prime_table().primes_less_than(smoothness_bound + 1).tolist()
+    for block_start in range(0, len(primes), _gcd_interval):
+        block_x = x
+        block = primes[block_start:block_start + _gcd_interval]
+        for prime in block:
+            max_exponent_less_than_smoothness_bound = floor(log(smoothness_bound, prime))
+            prime_power = pow(prime, max_exponent_less_than_smoothness_bound)
+            x = pow(x, prime_power, modulus)
         g = gcd(x - 1, value)
-        if 1 < g < value:
-            return g
+        if g == 1:
+            continue
+        if g < value:
+            return int(g)
+
+        x = block_x
+        for prime in block:
+            for _ in range(floor(log(smoothness_bound, prime))):
+                x = pow(x, prime, modulus)
+                g = gcd(x - 1, value)
+                if 1 < g < value:
+                    return int(g)
+        break
 
     raise PollardPMinus1Failure
 
 
-__all__ = ("pollards_p_minus_1_factorise",)
+__all__ = ("PollardPMinus1Failure", "pollards_p_minus_1_factorise",)
@@ -1,11 +1,15 @@
 import functools
+from math import gcd
 from operator import index
 from random import randrange
 from typing import SupportsIndex
 
-from extras.math_extras.extended_euclidian_algorithm import extended_euclidian_algorithm
+from gmpy2 import mpz
+
 from utils.typedefs.factorise import *
 
+_batch_length = 128
+
 
 class PollardRhoFailure(Exception):
     pass
@@ -13,33 +17,49 @@ class PollardRhoFailure(Exception):
 
 @functools.cache
 def make_pollards_rho_factoriser(seed: int = 2, b: int = 1) -> Factoriser:
-    def polynomial(value: int, modulus: int):
-        return (pow(value, 2, mod=modulus) + b) % modulus
-
     def factoriser(value: SupportsIndex) -> int:
         """
-        https://en.wikipedia.org/wiki/Pollard%27s_rho_algorithm#Algorithm
+        https://en.wikipedia.org/wiki/Pollard%27s_rho_algorithm#Variants, with Brent's cycle detection: rather than
+        stepping a tortoise and a hare (three evaluations of x^2 + b per step), y runs ahead while x waits at the
+        positions 1, 2, 4, 8, ..., so each step costs one evaluation. The differences |x - y| are multiplied together
+        (modulo the value) in batches, and one gcd taken per batch; if a batch overshoots (the gcd is the value itself,
+        as all its factors were found at once), it is replayed a step at a time.
         """
         value = index(value)
         if value <= 1: raise ValueError
         if value % 2 == 0: return 2
 
-        x = seed
-        y = x
+        modulus = mpz(value)
+        y = mpz(seed) % modulus
         d = 1
-
+        product = mpz(1)
+        cycle_length = 1
         while d == 1:
-            x = polynomial(x, value)
-            y = polynomial(y, value)
-            y = polynomial(y, value)
-            extended_euclidian_result = extended_euclidian_algorithm(abs(x - y), value)
-            d = extended_euclidian_result.gcd
+            x = y
+            for _ in range(cycle_length):
+                y = (y * y + b) % modulus
+            steps = 0
+            while steps < cycle_length and d == 1:
+                batch_start = y
+                for _ in range(min(_batch_length, cycle_length - steps)):
+                    y = (y * y + b) % modulus
+                    product = product * (x - y) % modulus
+                d = gcd(product, modulus)
+                steps += _batch_length
+            cycle_length *= 2
+
+        if d == value:
+            y = batch_start
+            d = 1
+            while d == 1:
+                y = (y * y + b) % modulus
+                d = gcd(x - y, modulus)
 
         if d == value:
             other_factoriser = make_pollards_rho_factoriser(seed=randrange(2, value), b=randrange(2, value))
             return other_factoriser(value)
 
-        return d
+        return int(d)
 
     return factoriser
 
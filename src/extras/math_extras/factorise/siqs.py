@@ -0,0 +1,398 @@
+"""
+https://en.wikipedia.org/wiki/Quadratic_sieve, self-initialising as in Contini's thesis
+(https://www.cs.ox.ac.uk/people/scott.contini/papers/thesis.ps).
+
+With A = q_1 q_2 ... q_s a product of factor base primes and B^2 = kn (mod A), each polynomial
+g(x) = ((A x + B)^2 - kn) / A is sieved over -M <= x < M for values which factor over the factor base (bar one large
+prime), giving relations (A x + B)^2 = A g(x) (mod kn). Each A has 2^(s-1) choices of B = +/-B_1 +/- ... +/- B_s, which
+are visited in Gray code order, so that moving to the next polynomial updates each sieving root by a single addition.
+Once there are more relations than factor base primes, Gaussian elimination over GF(2) finds subsets of them whose
+product is a congruence of squares X^2 = Y^2 (mod n), and gcd(X - Y, n) is (often) a factor.
+
+Sieving and the linear algebra are vectorised with NumPy; the remaining per-polynomial cost is a slice assignment per
+small factor base prime, so this suits numbers up to about 70 digits in practice.
+"""
+import time
+from math import gcd, isqrt, log, log2, prod
+from operator import index
+from random import Random
+from typing import NamedTuple, SupportsIndex
+
+import numpy as np
+from gmpy2 import mpz
+
+from extras.math_extras.mod_sqrt import legendre_symbol, mod_sqrt
+from extras.math_extras.prime_sieve import primes_less_than
+
+# (digits, factor base size, half-width M of the sieve interval)
+_parameters = (
+    (24, 100, 16_384),
+    (30, 200, 32_768),
+    (36, 300, 32_768),
+    (40, 500, 65_536),
+    (44, 700, 65_536),
+    (48, 1_000, 65_536),
+    (52, 1_200, 65_536),
+    (56, 2_000, 98_304),
+    (60, 4_000, 98_304),
+    (66, 6_000, 196_608),
+    (74, 10_000, 196_608),
+    (80, 30_000, 196_608),
+    (88, 50_000, 196_608),
+    (95, 60_000, 196_608),
+)
+_multipliers = (1, 2, 3, 5, 6, 7, 10, 11, 13, 14, 15, 17, 19, 21, 22, 23, 26, 29, 30, 31, 33, 34, 35, 37, 38, 39, 41)
+_min_sieve_prime = 32
+_large_prime_multiplier = 64
+_extra_relation_count = 16
+_ideal_a_prime = 2_000
+
+
+class SIQSFailure(Exception):
+    pass
+
+
+class Relation(NamedTuple):
+    """u^2 = (-1)^e_0 p_1^e_1 ... p_F^e_F extra^2 (mod n), with the exponents given by index (0 for -1)"""
+    u: int
+    exponents: dict[int, int]
+    extra: int
+
+
+class FactorBase(NamedTuple):
+    multiplier: int
+    primes: np.ndarray
+    square_roots: np.ndarray
+    logs: np.ndarray
+
+    @property
+    def largest_prime(self) -> int:
+        return int(self.primes[-1])
+
+
+def _parameters_for(n: int) -> tuple[int, int]:
+    digit_count = len(str(n))
+    for max_digit_count, factor_base_size, half_width in _parameters:
+        if digit_count <= max_digit_count:
+            return factor_base_size, half_width
+    return _parameters[-1][1:]
+
+
+def _knuth_schroeppel_multiplier(n: int) -> int:
+    """:return: the small multiplier k for which the factor base of kn is expected to be richest in small primes"""
+    primes = [int(prime) for prime in primes_less_than(2_000)[1:]]
+
+    def score(k: int) -> float:
+        kn = k * n
+        total = -0.5 * log(k)
+        residue = kn % 8
+        if residue == 1:
+            total += 2 * log(2)
+        elif residue == 5:
+            total += log(2)
+        elif residue in (3, 7):
+            total += 0.5 * log(2)
+        for prime in primes:
+            if kn % prime == 0:
+                total += log(prime) / prime
+            elif legendre_symbol(kn % prime, prime):
+                total += 2 * log(prime) / (prime - 1)
+        return total
+
+    return max(_multipliers, key=score)
+
+
+def _factor_base(n: int, size: int) -> FactorBase | int:
+    """:return: the factor base: 2, then the odd primes p modulo which kn is a square; or a factor of n"""
+    multiplier = _knuth_schroeppel_multiplier(n)
+    kn = multiplier * n
+    primes, square_roots = [2], [kn % 2]
+    bound = 1_000
+    while len(primes) < size:
+        for prime in map(int, primes_less_than(bound)[1:]):
+            if prime <= primes[-1]:
+                continue
+            if n % prime == 0:
+                return prime
+            residue = kn % prime
+            if residue == 0 or not legendre_symbol(residue, prime):
+                continue
+            primes.append(prime)
+            square_roots.append(mod_sqrt(residue, prime))
+            if len(primes) == size:
+                break
+        bound *= 2
+    primes = np.array(primes, dtype=np.int64)
+    return FactorBase(
+        multiplier,
+        primes,
+        np.array(square_roots, dtype=np.int64),
+        np.round(np.log2(primes)).astype(np.int16),
+    )
+
+
+class _PolynomialFamily(NamedTuple):
+    """the 2^(s-1) polynomials for one A"""
+    a: int
+    a_factor_indices: tuple[int, ...]
+    b_terms: tuple[int, ...]
+    a_inverses: np.ndarray  # A^(-1) mod p, or 0 for the primes dividing A
+    b_root_steps: np.ndarray  # 2 B_l A^(-1) mod p, for each l
+
+
+def _choose_a(
+    kn: int,
+    half_width: int,
+    factor_base: FactorBase,
+    used: set[tuple[int, ...]],
+    rng: Random,
+) -> tuple[int, ...]:
+    """:return: the factor base indices of primes whose product is close to sqrt(2 kn) / M, and not yet used"""
+    target = isqrt(2 * kn) // half_width
+    prime_count = max(1, round(log(target) / log(_ideal_a_prime)))
+    ideal_prime = round(target ** (1 / prime_count))
+    primes = factor_base.primes
+    # a window of candidate primes around the ideal size, avoiding the smallest (whose roots sieve least well)
+    low = max(int(np.searchsorted(primes, ideal_prime // 2)), 2)
+    high = max(int(np.searchsorted(primes, ideal_prime * 2)), low + prime_count + 2)
+    high = min(high, len(primes))
+    if high - low < prime_count:
+        raise SIQSFailure("The factor base is too small")
+
+    for _ in range(1_000):
+        indices = rng.sample(range(low, high), prime_count - 1) if prime_count > 1 else []
+        partial_product = prod(int(primes[i]) for i in indices)
+        # the last prime brings the product closest to the target
+        ideal_last = target // partial_product
+        candidates = [i for i in range(2, len(primes)) if i not in indices]
+        last = min(candidates, key=lambda i: abs(int(primes[i]) - ideal_last))
+        indices = tuple(sorted(indices + [last]))
+        if indices not in used:
+            used.add(indices)
+            return indices
+    raise SIQSFailure("Ran out of polynomials")
+
+
+def _polynomial_family(kn: int, factor_base: FactorBase, a_factor_indices: tuple[int, ...]) -> _PolynomialFamily:
+    primes = factor_base.primes
+    a_factors = [int(primes[i]) for i in a_factor_indices]
+    a = prod(a_factors)
+    b_terms = []
+    for a_factor, i in zip(a_factors, a_factor_indices):
+        cofactor = a // a_factor
+        gamma = int(factor_base.square_roots[i]) * pow(cofactor, -1, a_factor) % a_factor
+        if gamma > a_factor // 2:
+            gamma = a_factor - gamma
+        b_terms.append(cofactor * gamma)
+
+    prime_list = primes.tolist()
+    a_inverses = np.array([pow(a % p, -1, p) if a % p else 0 for p in prime_list], dtype=np.int64)
+    a_inverse_list = a_inverses.tolist()
+    b_root_steps = np.array(
+        [
+            [(2 * (b_term % p) * a_inverse) % p for p, a_inverse in zip(prime_list, a_inverse_list)]
+            for b_term in b_terms
+        ],
+        dtype=np.int64,
+    )
+    return _PolynomialFamily(a, a_factor_indices, tuple(b_terms), a_inverses, b_root_steps)
+
+
+def _sieve(
+    roots: tuple[np.ndarray, np.ndarray],
+    primes: np.ndarray,
+    logs: np.ndarray,
+    length: int,
+    first_index: int,
+) -> np.ndarray:
+    """Add log p at each position i (of `length`) congruent to either root modulo p, for each sieved prime p."""
+    sieve = np.zeros(length, dtype=np.int16)
+    # the larger primes have few multiples in the interval, so they are sieved together, hit by hit
+    dense_end = max(first_index, int(np.searchsorted(primes, length // 16)))
+    for i in range(first_index, dense_end):
+        prime, prime_log = int(primes[i]), logs[i]
+        for root in roots:
+            sieve[int(root[i])::prime] += prime_log
+    if dense_end < len(primes):
+        sparse_primes = primes[dense_end:]
+        max_hits = -(-length // int(sparse_primes[0]))
+        hit_offsets = sparse_primes[:, None] * np.arange(max_hits)
+        for root in roots:
+            positions = root[dense_end:, None] + hit_offsets
+            in_range = positions < length
+            np.add.at(sieve, positions[in_range], np.broadcast_to(logs[dense_end:, None], positions.shape)[in_range])
+    return sieve
+
+
+def _relation_for(
+    x: int,
+    family: _PolynomialFamily,
+    b: int,
+    kn: int,
+    factor_base: FactorBase,
+    roots: tuple[np.ndarray, np.ndarray],
+    position: int,
+) -> tuple[int, dict[int, int], int]:
+    """:return: u = A x + B, the exponents of A g(x) over the factor base, and the remaining cofactor"""
+    u = family.a * x + b
+    value = (u * u - kn) // family.a
+    exponents = {index + 1: 1 for index in family.a_factor_indices}
+    if value < 0:
+        exponents[0] = 1
+        value = -value
+    value = mpz(value)
+
+    primes = factor_base.primes
+    divides = ((position - roots[0]) % primes == 0) | ((position - roots[1]) % primes == 0)
+    divides[list(family.a_factor_indices)] = True
+    divides[0] = True
+    for i in np.flatnonzero(divides):
+        prime = int(primes[i])
+        exponent = 0
+        while value % prime == 0:
+            value //= prime
+            exponent += 1
+        if exponent:
+            exponents[int(i) + 1] = exponents.get(int(i) + 1, 0) + exponent
+    return u, exponents, int(value)
+
+
+def _find_dependencies(relations: list[Relation], column_count: int) -> list[np.ndarray]:
+    """
+    Gaussian elimination over GF(2), with the rows (relations) packed 64 exponent parities to a word, and each row
+    operation applied to every row below the pivot at once.
+
+    :return: sets of relation indices whose exponent vectors sum to zero modulo 2
+    """
+    row_count = len(relations)
+    column_words = (column_count + 63) // 64
+    history_words = (row_count + 63) // 64
+    matrix = np.zeros((row_count, column_words), dtype=np.uint64)
+    history = np.zeros((row_count, history_words), dtype=np.uint64)
+    for row, relation in enumerate(relations):
+        for column, exponent in relation.exponents.items():
+            if exponent % 2:
+                matrix[row, column // 64] ^= np.uint64(1 << (column % 64))
+        history[row, row // 64] = np.uint64(1 << (row % 64))
+
+    pivot_row = 0
+    for column in range(column_count):
+        word, bit = column // 64, np.uint64(1 << (column % 64))
+        candidates = np.flatnonzero(matrix[pivot_row:, word] & bit) + pivot_row
+        if len(candidates) == 0:
+            continue
+        pivot = candidates[0]
+        if pivot != pivot_row:
+            matrix[[pivot, pivot_row]] = matrix[[pivot_row, pivot]]
+            history[[pivot, pivot_row]] = history[[pivot_row, pivot]]
+        below = np.flatnonzero(matrix[pivot_row + 1:, word] & bit) + pivot_row + 1
+        matrix[below] ^= matrix[pivot_row]
+        history[below] ^= history[pivot_row]
+        pivot_row += 1
+        if pivot_row == row_count:
+            break
+
+    dependencies = []
+    for row in range(pivot_row, row_count):
+        bits = np.unpackbits(history[row].view(np.uint8), bitorder="little")
+        dependencies.append(np.flatnonzero(bits[:row_count]))
+    return dependencies
+
+
+def _factor_from_dependency(n: int, relations: list[Relation], dependency: np.ndarray, factor_base: FactorBase) -> int:
+    x = mpz(1)
+    extra = mpz(1)
+    exponents: dict[int, int] = {}
+    for i in dependency:
+        relation = relations[i]
+        x = x * relation.u % n
+        extra = extra * relation.extra % n
+        for column, exponent in relation.exponents.items():
+            exponents[column] = exponents.get(column, 0) + exponent
+    y = extra
+    for column, exponent in exponents.items():
+        assert exponent % 2 == 0
+        if column > 0:
+            y = y * pow(mpz(int(factor_base.primes[column - 1])), exponent // 2, n) % n
+    return int(gcd(x - y, n))
+
+
+def siqs_factorise(value: SupportsIndex, time_budget: float = None, seed: int = None) -> int:
+    """
+    :return: a non-trivial factor of `value`, which should be odd, composite and not a perfect power
+    :raise SIQSFailure: if `time_budget` seconds pass without one
+    """
+    n = index(value)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    rng = Random(seed)
+    factor_base_size, half_width = _parameters_for(n)
+    factor_base = _factor_base(n, factor_base_size)
+    if isinstance(factor_base, int):
+        return factor_base
+    kn = factor_base.multiplier * n
+    primes = factor_base.primes
+    large_prime_bound = factor_base.largest_prime * _large_prime_multiplier
+    first_sieved_index = int(np.searchsorted(primes, _min_sieve_prime))
+    # the contribution expected from the unsieved small primes, which each divide about 2 / (p - 1) of values
+    small_prime_allowance = sum(2 * log2(int(p)) / (int(p) - 1) for p in primes[1:first_sieved_index])
+    threshold = int(log2(half_width) + log2(kn) / 2 - 0.5 - log2(large_prime_bound) - small_prime_allowance)
+    length = 2 * half_width
+
+    column_count = len(primes) + 1
+    relations: list[Relation] = []
+    partial_relations: dict[int, tuple[int, dict[int, int]]] = {}
+    used_a: set[tuple[int, ...]] = set()
+    target_relation_count = column_count + _extra_relation_count
+
+    while True:
+        while len(relations) < target_relation_count:
+            family = _polynomial_family(kn, factor_base, _choose_a(kn, half_width, factor_base, used_a, rng))
+            signs = [1] * len(family.b_terms)
+            b = sum(family.b_terms)
+            b_residues = np.array([b % prime for prime in primes.tolist()], dtype=np.int64)
+            square_roots = factor_base.square_roots
+            roots = (
+                (family.a_inverses * (square_roots - b_residues) + half_width) % primes,
+                (family.a_inverses * (-square_roots - b_residues) + half_width) % primes,
+            )
+            # the roots are meaningless modulo the primes dividing A, so those are not sieved
+            logs = factor_base.logs.copy()
+            logs[list(family.a_factor_indices)] = 0
+            for polynomial_index in range(1 << (len(family.b_terms) - 1)):
+                if deadline is not None and time.monotonic() > deadline:
+                    raise SIQSFailure
+                if polynomial_index > 0:
+                    # flip the sign of B_l, for l the lowest set bit of the index (the Gray code's changed bit)
+                    l = (polynomial_index & -polynomial_index).bit_length() - 1
+                    step = signs[l] * family.b_root_steps[l]
+                    b -= 2 * signs[l] * family.b_terms[l]
+                    signs[l] = -signs[l]
+                    roots = ((roots[0] + step) % primes, (roots[1] + step) % primes)
+
+                sieve = _sieve(roots, primes, logs, length, first_sieved_index)
+                for position in np.flatnonzero(sieve >= threshold):
+                    position = int(position)
+                    u, exponents, cofactor = _relation_for(
+                        position - half_width, family, b, kn, factor_base, roots, position
+                    )
+                    if cofactor == 1:
+                        relations.append(Relation(u % n, exponents, 1))
+                    elif cofactor < large_prime_bound:
+                        if cofactor in partial_relations:
+                            other_u, other_exponents = partial_relations[cofactor]
+                            combined = dict(other_exponents)
+                            for column, exponent in exponents.items():
+                                combined[column] = combined.get(column, 0) + exponent
+                            relations.append(Relation(u * other_u % n, combined, cofactor))
+                        else:
+                            partial_relations[cofactor] = (u, exponents)
+
+        for dependency in _find_dependencies(relations, column_count):
+            factor = _factor_from_dependency(n, relations, dependency, factor_base)
+            if 1 < factor < n:
+                return factor
+        # every dependency gave a trivial congruence, so gather a few more relations and try again
+        target_relation_count = len(relations) + _extra_relation_count
+
+
+__all__ = ("SIQSFailure", "siqs_factorise",)
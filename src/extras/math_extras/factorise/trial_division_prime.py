@@ -1,30 +1,90 @@
+from typing import Generator
+
+import numpy as np
+
 from extras.math_extras.isqrt import isqrt_floor
+from extras.math_extras.prime_sieve import primes_less_than
 from utils.typedefs.factorise import *
 
+# trial divisors below this are taken from the (cached) prime table; above it, from the 2*3*5*7 wheel
+_prime_table_bound = 1 << 17
+_wheel_modulus = 2 * 3 * 5 * 7
+_wheel_residues = np.array(
+    [residue for residue in range(1, _wheel_modulus) if all(residue % prime for prime in (2, 3, 5, 7))], dtype=np.int64
+)
+_block_length = 1024
+_wheel_turns_per_block = _block_length // len(_wheel_residues)
+# the largest value whose remainders can be taken in int64
+_max_vectorised_value = (1 << 63) - 1
+
 
-def _trial_division_prime_factorise(n: int, from_trial: int = 2) -> PrimeFactorisation:
+def _trial_divisor_blocks(bound: int) -> Generator[np.ndarray]:
     """
-    Factorise an integer into its prime factors using the trial division algorithm.
+    :return: blocks of increasing trial divisors less than `bound`, between them including every prime less than
+        `bound`: the primes from the table, then the integers coprime to 2*3*5*7
     """
-    if n <= 0:
-        raise ValueError
-    if n == 1:
-        return {}
-    if n <= 3:
-        return {n: 1}
-    for trial in range(from_trial, isqrt_floor(n) + 1):
-        new_n, remainder = divmod(n, trial)
-        if remainder != 0:
+    table = primes_less_than(min(bound, _prime_table_bound))
+    for start in range(0, len(table), _block_length):
+        yield table[start:start + _block_length]
+
+    offsets = (np.arange(_wheel_turns_per_block)[:, None] * _wheel_modulus + _wheel_residues).ravel()
+    block_span = _wheel_turns_per_block * _wheel_modulus
+    for base in range(_prime_table_bound - _prime_table_bound % _wheel_modulus, bound, block_span):
+        block = base + offsets
+        yield block[(block >= _prime_table_bound) & (block < bound)]
+
+
+def _divide_out(n: int, prime: int, factorisation: PrimeFactorisation) -> int:
+    exponent = 0
+    while n % prime == 0:
+        n //= prime
+        exponent += 1
+    if exponent:
+        factorisation[prime] = exponent
+    return n
+
+
+def remove_small_prime_factors(n: int, bound: int, vectorised: bool = True) -> tuple[PrimeFactorisation, int]:
+    """
+    Divide out the prime factors of `n` less than `bound`, iteratively: the search stops as soon as the next trial
+    divisor exceeds the square root of what remains of `n`, so it shrinks as factors are removed.
+
+    :param vectorised: whether to find which of a block of trial divisors divide `n` with one NumPy operation, while
+        `n` fits in int64 (after which they are tried one at a time)
+    :return: their factorisation, and the remaining cofactor (which is 1 or prime if less than bound^2)
+    """
+    factorisation = {}
+    limit = min(bound, isqrt_floor(n) + 1)
+    for block in _trial_divisor_blocks(bound):
+        if len(block) == 0:
+            continue
+        if block[0] >= limit:
+            break
+        if vectorised and n <= _max_vectorised_value:
+            for prime in map(int, block[np.int64(n) % block == 0]):
+                n = _divide_out(n, prime, factorisation)
+            limit = min(bound, isqrt_floor(n) + 1)
             continue
-        factorisation = _trial_division_prime_factorise(new_n, trial)
-        trial_exponent = factorisation.get(trial, 0)
-        factorisation[trial] = trial_exponent + 1
-        return factorisation
-    return {n: 1}
+        for prime in map(int, block):
+            if prime >= limit:
+                break
+            if n % prime == 0:
+                n = _divide_out(n, prime, factorisation)
+                limit = min(bound, isqrt_floor(n) + 1)
+    if 1 < n < bound * bound:
+        factorisation[n] = factorisation.get(n, 0) + 1
+        n = 1
+    return factorisation, n
 
 
-def trial_division_prime_factorise(n: int) -> PrimeFactorisation:
-    return _trial_division_prime_factorise(n)
+def trial_division_prime_factorise(n: int, vectorised: bool = True) -> PrimeFactorisation:
+    """
+    Factorise an integer into its prime factors using the trial division algorithm.
+    """
+    if n <= 0:
+        raise ValueError
+    factorisation, _ = remove_small_prime_factors(n, isqrt_floor(n) + 1, vectorised)
+    return factorisation
 
 
-__all__ = ("trial_division_prime_factorise",)
+__all__ = ("remove_small_prime_factors", "trial_division_prime_factorise",)
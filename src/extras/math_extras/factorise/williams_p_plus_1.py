@@ -0,0 +1,77 @@
+from math import floor, gcd, log
+from operator import index
+from typing import SupportsIndex
+
+from gmpy2 import mpz
+
+from extras.math_extras.prime_table import default_prime_table
+
+# 2/7 and 6/5 are the seeds recommended by GMP-ECM; each works for about half of all primes (those p for which
+# seed^2 - 4 is a non-residue, so that the Lucas sequence lives in the subgroup of order p + 1)
+default_seeds = ((2, 7), (6, 5), (3, 1))
+_gcd_interval = 64
+
+
+class WilliamsPPlus1Failure(Exception):
+    pass
+
+
+def lucas_v(k: int, v: int, modulus: int) -> int:
+    """
+    :return: V_k(v) mod `modulus`, where V_0 = 2, V_1 = v and V_(n+1) = v V_n - V_(n-1), by a ladder on the pair
+        (V_n, V_(n+1)), using V_2n = V_n^2 - 2 and V_(2n+1) = V_n V_(n+1) - v
+    """
+    x, y = v, (v * v - 2) % modulus
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            x, y = (x * y - v) % modulus, (y * y - 2) % modulus
+        else:
+            x, y = (x * x - 2) % modulus, (x * y - v) % modulus
+    return x
+
+
+def williams_p_plus_1_factorise(
+    value: SupportsIndex,
+    smoothness_bound: int = None,
+    seeds: tuple[tuple[int, int], ...] = default_seeds,
+) -> int:
+    """
+    https://en.wikipedia.org/wiki/Williams%27s_p_%2B_1_algorithm
+
+    Find a factor p of `value` for which p + 1 (or p - 1, depending on the seed) is `smoothness_bound`-powersmooth.
+    Each seed is a fraction (numerator, denominator), reduced modulo `value`.
+    """
+    value = index(value)
+    if smoothness_bound is None:
+        smoothness_bound = 10_000
+    modulus = mpz(value)
+    primes = default_prime_table().primes_less_than(smoothness_bound + 1).tolist()
+
+    for numerator, denominator in seeds:
+        g = gcd(denominator, value)
+        if 1 < g < value:
+            return g
+        v = (numerator * pow(mpz(denominator), -1, modulus)) % modulus
+        for block_start in range(0, len(primes), _gcd_interval):
+            block_v = v
+            for prime in primes[block_start:block_start + _gcd_interval]:
+                v = lucas_v(pow(prime, floor(log(smoothness_bound, prime))), v, modulus)
+            g = gcd(v - 2, value)
+            if g == 1:
+                continue
+            if g < value:
+                return int(g)
+            # every factor was found within the block at once, so retry it a prime at a time
+            v = block_v
+            for prime in primes[block_start:block_start + _gcd_interval]:
+                for _ in range(floor(log(smoothness_bound, prime))):
+                    v = lucas_v(prime, v, modulus)
+                    g = gcd(v - 2, value)
+                    if 1 < g < value:
+                        return int(g)
+            break
+
+    raise WilliamsPPlus1Failure
+
+
+__all__ = ("WilliamsPPlus1Failure", "lucas_v", "williams_p_plus_1_factorise",)
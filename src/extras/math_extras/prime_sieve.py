@@ -1,24 +1,96 @@
-from extras.binary_extras.bit_set import BitSet
+"""
+https://en.wikipedia.org/wiki/Sieve_of_Eratosthenes#Segmented_sieve
 
+The range is sieved in windows small enough to stay in L2 cache, each storing only the odd numbers, and crossed off
+with one vectorised slice assignment per sieving prime; so memory is bounded by the window and the sieving primes
+(those up to the square root of the bound), and primes can be streamed as far as is wanted.
+"""
+import functools
+from math import isqrt
+from typing import Generator
 
-def sieve_primes_less_than(bound: int) -> list[int]:
-    primes = []
-    sieve = BitSet(bound)
-    sieve[0] = True
-    prime = 1
-
-    while True:
-        prime = sieve.next_clear_bit_index(prime - 1) + 1
-        if prime >= bound:
-            break
-        primes.append(prime)
-
-        cursor = prime - 1
-        while cursor < bound:
-            sieve[cursor] = True
-            cursor += prime
+import numpy as np
+
+# odd numbers per window: one byte each, so 256 KiB
+sieve_window_length = 1 << 18
+# about a million primes (8 MiB)
+max_cached_sieve_bound = 1 << 24
+
+
+def _small_primes_less_than(bound: int) -> np.ndarray:
+    """the sieving primes, by an unsegmented odd-only sieve (of at most the square root of the range)"""
+    if bound <= 2:
+        return np.empty(0, dtype=np.int64)
+    # is_composite[i] represents 2i + 1
+    is_composite = np.zeros((bound + 1) // 2, dtype=bool)
+    is_composite[0] = True
+    for i in range(1, (isqrt(bound) + 1) // 2 + 1):
+        if not is_composite[i]:
+            prime = 2 * i + 1
+            is_composite[prime * prime // 2::prime] = True
+    primes = np.concatenate(([2], 2 * np.flatnonzero(~is_composite) + 1)).astype(np.int64)
+    return primes[primes < bound]
+
+
+def prime_segments(stop: int, start: int = 2) -> Generator[np.ndarray]:
+    """
+    :return: the primes in [`start`, `stop`), as consecutive int64 NumPy arrays of at most `sieve_window_length`
+    """
+    if start <= 2 < stop:
+        yield np.array([2], dtype=np.int64)
+    # the odd numbers from `low` are sieved, window by window
+    low = max(start, 3) | 1
+    if low >= stop:
+        return
+    sieving_primes = _small_primes_less_than(isqrt(stop - 1) + 1)[1:]
+    for window_low in range(low, stop, 2 * sieve_window_length):
+        window_high = min(window_low + 2 * sieve_window_length, stop)
+        # is_composite[i] represents window_low + 2i
+        is_composite = np.zeros((window_high - window_low + 1) // 2, dtype=bool)
+        primes = sieving_primes[sieving_primes * sieving_primes < window_high]
+        # the first odd multiple of each prime in the window, not less than its square
+        first_multiples = np.maximum(primes * primes, -(-window_low // primes) * primes)
+        first_multiples += primes * (first_multiples % 2 == 0)
+        for prime, index in zip(primes.tolist(), ((first_multiples - window_low) // 2).tolist()):
+            is_composite[index::prime] = True
+        yield window_low + 2 * np.flatnonzero(~is_composite)
+
+
+def iterate_primes(stop: int, start: int = 2) -> Generator[int]:
+    """:return: the primes in [`start`, `stop`), lazily, as Python ints"""
+    for segment in prime_segments(stop, start):
+        yield from segment.tolist()
 
+
+def _primes_less_than(bound: int) -> np.ndarray:
+    primes = np.concatenate([np.empty(0, dtype=np.int64), *prime_segments(bound)])
+    primes.flags.writeable = False
     return primes
 
 
-__all__ = ("sieve_primes_less_than",)
+_cached_primes_less_than = functools.cache(_primes_less_than)
+
+
+def primes_less_than(bound: int) -> np.ndarray:
+    """
+    :return: the primes less than `bound`, as a read-only NumPy array of int64 (cached up to `max_cached_sieve_bound`,
+        since the factorisation algorithms ask for the same few bounds repeatedly; larger bounds are sieved afresh,
+        and are better streamed by `prime_segments`)
+    """
+    if bound <= max_cached_sieve_bound:
+        return _cached_primes_less_than(bound)
+    return _primes_less_than(bound)
+
+
+def sieve_primes_less_than(bound: int) -> list[int]:
+    return primes_less_than(bound).tolist()
+
+
+__all__ = (
+    "iterate_primes",
+    "max_cached_sieve_bound",
+    "prime_segments",
+    "primes_less_than",
+    "sieve_primes_less_than",
+    "sieve_window_length",
+)
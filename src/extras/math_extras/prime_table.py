@@ -0,0 +1,78 @@
+import functools
+import os
+from pathlib import Path
+from typing import Self
+
+import numpy as np
+
+from definitions import project_cache_dirname
+
+from .prime_sieve import prime_segments, primes_less_than
+
+prime_tables_dirname = Path(project_cache_dirname, "prime-tables")
+# about a million primes (8 MiB)
+default_prime_table_bound = 1 << 24
+
+
+class PrimeTable:
+    """
+    The primes less than `bound`, as an int64 .npy file under the project cache, which is sieved once and then opened
+    as a read-only `numpy.memmap` (so opening is instant, and worker processes share its pages).
+    Queries are answered by binary search.
+    """
+
+    def __init__(self, primes: np.ndarray, bound: int) -> None:
+        self.primes = primes
+        self.bound = bound
+
+    @staticmethod
+    def path_of(bound: int, dirname: Path = None) -> Path:
+        if dirname is None:
+            dirname = prime_tables_dirname
+        return Path(dirname, f"primes-less-than-{bound}.npy")
+
+    @classmethod
+    def open(cls, bound: int = default_prime_table_bound, dirname: Path = None) -> Self:
+        path = cls.path_of(bound, dirname)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # written under a unique name and renamed into place, so that concurrent processes never see a partial file
+            partial_path = path.with_name(f"{path.name}.{os.getpid()}.partial")
+            with open(partial_path, "wb") as handle:
+                np.save(handle, np.concatenate([np.empty(0, dtype=np.int64), *prime_segments(bound)]))
+            os.replace(partial_path, path)
+        return cls(np.load(path, mmap_mode="r"), bound)
+
+    def __len__(self) -> int:
+        return len(self.primes)
+
+    def __getitem__(self, index: int) -> int:
+        """:return: the prime at `index` (so table[0] == 2)"""
+        return int(self.primes[index])
+
+    def count_less_than(self, value: int) -> int:
+        """:return: the number of primes less than `value`"""
+        if value > self.bound:
+            raise ValueError(f"{value} is beyond the table's bound {self.bound}")
+        return int(np.searchsorted(self.primes, value))
+
+    def next_prime_after(self, value: int) -> int:
+        """:return: the least prime greater than `value`"""
+        index = int(np.searchsorted(self.primes, value, side="right"))
+        if index == len(self.primes):
+            raise ValueError(f"the next prime after {value} is beyond the table's bound {self.bound}")
+        return int(self.primes[index])
+
+    def primes_less_than(self, bound: int) -> np.ndarray:
+        """:return: the primes less than `bound`, as a view of the table if it reaches that far, else sieved afresh"""
+        if bound > self.bound:
+            return primes_less_than(bound)
+        return self.primes[:self.count_less_than(bound)]
+
+
+@functools.cache
+def default_prime_table() -> PrimeTable:
+    return PrimeTable.open()
+
+
+__all__ = ("PrimeTable", "default_prime_table",)
@@ -0,0 +1,3 @@
+from .lib import *
+from .transport import *
+from .oracle import *
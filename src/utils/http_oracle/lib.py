@@ -0,0 +1,88 @@
+import json
+from typing import Any, Callable, Collection, Mapping, NamedTuple
+
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+
+class HttpOracleRequest(NamedTuple):
+    method: str
+    url: URL | str
+    headers: Mapping[str, str] = {}
+    body: bytes = b""
+
+
+class HttpOracleResponse(NamedTuple):
+    status: int
+    headers: CIMultiDictProxy[str]
+    body: bytes
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding, errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+def make_headers(headers: Mapping[str, str] = None) -> CIMultiDictProxy[str]:
+    return CIMultiDictProxy(CIMultiDict(headers or {}))
+
+
+type RequestFactory[**P] = Callable[P, HttpOracleRequest]
+"""a request factory builds the request which puts a query (e.g. an (IV, ciphertext) pair) to the target"""
+
+type ResponseClassifier = Callable[[HttpOracleResponse], bool]
+"""
+a response classifier answers a query from the target's response. It may raise `TransientResponseException` if the
+response doesn't answer the query (e.g. because the target is overloaded), so that the query is retried
+"""
+
+
+class TransientResponseException(Exception):
+    """The target's response doesn't answer the query, but retrying it might."""
+
+    def __init__(self, response: HttpOracleResponse, retry_after: float = None) -> None:
+        super().__init__(f"Transient response from target (status {response.status})")
+        self.response = response
+        self.retry_after = retry_after
+        """how long (in seconds) the target asked to be left alone for, if it did"""
+
+
+def status_classifier(valid_statuses: Collection[int]) -> ResponseClassifier:
+    """Classify responses as valid when their status is one of `valid_statuses`."""
+    def classify(response: HttpOracleResponse) -> bool:
+        return response.status in valid_statuses
+
+    return classify
+
+
+def body_classifier(marker: bytes | str, *, valid_when_present: bool = True) -> ResponseClassifier:
+    """Classify responses as valid when their body contains `marker` (or, alternatively, when it doesn't)."""
+    if isinstance(marker, str):
+        marker = marker.encode("utf-8")
+
+    def classify(response: HttpOracleResponse) -> bool:
+        return (marker in response.body) == valid_when_present
+
+    return classify
+
+
+def json_classifier(predicate: Callable[[Any], bool]) -> ResponseClassifier:
+    """Classify responses by their decoded JSON body."""
+    def classify(response: HttpOracleResponse) -> bool:
+        return predicate(response.json())
+
+    return classify
+
+
+__all__ = (
+    "HttpOracleRequest",
+    "HttpOracleResponse",
+    "make_headers",
+    "RequestFactory",
+    "ResponseClassifier",
+    "TransientResponseException",
+    "status_classifier",
+    "body_classifier",
+    "json_classifier",
+)
@@ -0,0 +1,143 @@
+import asyncio
+from typing import Collection, Self
+
+import aiohttp
+
+from extras.asyncio_extras import raise_if_race_aborted
+from extras.random_extras.sysrandom import uniform
+
+from .lib import HttpOracleRequest, HttpOracleResponse, RequestFactory, ResponseClassifier, TransientResponseException
+from .transport import HttpTransportABC, AiohttpTransport, PipelinedTransport
+
+
+class HttpOracle[**P]:
+    """
+    An oracle which answers each query with an HTTP request to the target.
+
+    `request_factory` builds the request for a query (e.g. an (IV, ciphertext) pair, so that the oracle is a
+    `PaddingOracle`), and `classify` answers the query from the target's response.
+
+    Requests are sent over a pool of persistent connections (see `HttpTransportABC`). Transient failures (connection
+    errors, timeouts, and responses with a status in `transient_statuses` or which `classify` rejects by raising
+    `TransientResponseException`) are retried up to `max_attempts` times in total, after an exponential, jittered
+    back-off delay, or as long as the target asks via `Retry-After` if that is longer.
+
+    A query which is cancelled (e.g. because another guess won the race) after its request was sent lets the response
+    arrive regardless, since aborting a request midway would cost its connection.
+    """
+
+    transient_exceptions: tuple[type[BaseException], ...] = (
+        aiohttp.ClientConnectionError,
+        aiohttp.ClientPayloadError,
+        ConnectionError,
+        TimeoutError,
+        TransientResponseException,
+    )
+
+    def __init__(
+        self,
+        request_factory: RequestFactory[P],
+        classify: ResponseClassifier,
+        *,
+        transport: HttpTransportABC = None,
+        timeout: float = 10.0,
+        transient_statuses: Collection[int] = (429, 502, 503, 504),
+        max_attempts: int = 5,
+        backoff_base_delay: float = 0.05,
+        backoff_max_delay: float = 5.0,
+    ) -> None:
+        assert max_attempts >= 1
+        if transport is None:
+            transport = AiohttpTransport()
+        self.request_factory = request_factory
+        self.classify = classify
+        self.transport = transport
+        self.timeout = timeout
+        self.transient_statuses = transient_statuses
+        self.max_attempts = max_attempts
+        self.backoff_base_delay = backoff_base_delay
+        self.backoff_max_delay = backoff_max_delay
+
+        self.request_count = 0
+        self.retry_count = 0
+        self._sends: set[asyncio.Future[HttpOracleResponse]] = set()
+
+    @classmethod
+    def pipelined(
+        cls,
+        request_factory: RequestFactory[P],
+        classify: ResponseClassifier,
+        *,
+        max_connections: int = 8,
+        pipeline_depth: int = 8,
+        **kwargs,
+    ) -> Self:
+        """Construct an oracle which pipelines requests over a few connections (see `PipelinedTransport`)."""
+        transport = PipelinedTransport(max_connections, pipeline_depth=pipeline_depth)
+        return cls(request_factory, classify, transport=transport, **kwargs)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        ceiling = min(self.backoff_max_delay, self.backoff_base_delay * pow(2, attempt))
+        return uniform(0, ceiling)  # 'full jitter'
+
+    @staticmethod
+    def _retry_after(response: HttpOracleResponse) -> float | None:
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return None  # absent, or an HTTP date, which isn't worth the trouble
+
+    def _classify(self, response: HttpOracleResponse) -> bool:
+        if response.status in self.transient_statuses:
+            raise TransientResponseException(response, self._retry_after(response))
+        return self.classify(response)
+
+    def _on_send_done(self, send: asyncio.Future[HttpOracleResponse]) -> None:
+        self._sends.discard(send)
+        if not send.cancelled():
+            send.exception()  # the response to an abandoned query is of no interest
+
+    async def _send(self, request: HttpOracleRequest) -> HttpOracleResponse:
+        send = asyncio.ensure_future(self.transport.send(request))
+        self._sends.add(send)
+        send.add_done_callback(self._on_send_done)
+        try:
+            async with asyncio.timeout(self.timeout):
+                return await asyncio.shield(send)
+        except TimeoutError:
+            send.cancel()
+            raise
+
+    async def __call__(self, *args: P.args, **kwargs: P.kwargs) -> bool:
+        request = self.request_factory(*args, **kwargs)
+        attempt = 0
+        while True:
+            # don't send a request whose answer is no longer needed
+            raise_if_race_aborted()
+            self.request_count += 1
+            try:
+                return self._classify(await self._send(request))
+            except self.transient_exceptions as exception:
+                attempt += 1
+                if attempt >= self.max_attempts:
+                    raise
+                delay = self._backoff_delay(attempt)
+                if isinstance(exception, TransientResponseException) and exception.retry_after is not None:
+                    delay = max(delay, exception.retry_after)
+            self.retry_count += 1
+            await asyncio.sleep(delay)
+
+    async def close(self) -> None:
+        for send in self._sends:
+            send.cancel()
+        await asyncio.gather(*self._sends, return_exceptions=True)
+        await self.transport.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.close()
+
+
+__all__ = ("HttpOracle",)
@@ -0,0 +1,285 @@
+import asyncio
+import ssl
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+from .lib import HttpOracleRequest, HttpOracleResponse
+
+
+class HttpTransportABC(ABC):
+    """Sends requests over a pool of persistent connections."""
+
+    @abstractmethod
+    async def send(self, request: HttpOracleRequest) -> HttpOracleResponse:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+
+class AiohttpTransport(HttpTransportABC):
+    """
+    Send requests with an `aiohttp.ClientSession`, whose connector keeps up to `max_connections` connections alive
+    (rather than aiohttp's default of 100 per session, which can overwhelm small CTF services).
+    """
+
+    def __init__(self, max_connections: int = 32, *, keepalive_timeout: float = 30.0) -> None:
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=None,  # the target's address won't change mid-attack
+            )
+            # timeouts are the oracle's responsibility
+            self._session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None))
+        return self._session
+
+    async def send(self, request: HttpOracleRequest) -> HttpOracleResponse:
+        async with self._get_session().request(
+            request.method,
+            request.url,
+            headers=request.headers,
+            data=request.body or None,
+        ) as response:
+            body = await response.read()
+            return HttpOracleResponse(response.status, response.headers, body)
+
+    async def close(self) -> None:
+        if self._session is None:
+            return
+        await self._session.close()
+        self._session = None
+
+
+class _PipelinedConnection:
+    """
+    An HTTP/1.1 connection which may have several requests outstanding at once; responses arrive in request order.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._pending: deque[asyncio.Future[HttpOracleResponse]] = deque()
+        self.is_closed = False
+        self.supports_pipelining: bool | None = None
+        """unknown until the first response arrives, since HTTP/1.0 servers and some proxies don't"""
+        self.last_used_at = time.monotonic()
+        self._read_task = asyncio.create_task(self._read_responses())
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def capacity(self, pipeline_depth: int) -> int:
+        if self.is_closed:
+            return 0
+        if not self.supports_pipelining:
+            pipeline_depth = 1
+        return pipeline_depth - self.in_flight
+
+    async def send(self, serialized_request: bytes) -> HttpOracleResponse:
+        future = asyncio.get_running_loop().create_future()
+        # responses are matched to requests by order, so a future stays queued even if its request is cancelled
+        self._pending.append(future)
+        self.last_used_at = time.monotonic()
+        try:
+            self._writer.write(serialized_request)
+            await self._writer.drain()
+        except BaseException:
+            future.cancel()
+            raise
+        # if the caller is cancelled, so is the future; the connection should then be closed
+        return await future
+
+    async def _read_response(self) -> HttpOracleResponse:
+        status_line = await self._reader.readuntil(b"\r\n")
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        headers = CIMultiDict[str]()
+        while (header_line := await self._reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = header_line.decode("latin-1").partition(":")
+            headers.add(name.strip(), value.strip())
+
+        status = int(status)
+        if "chunked" in headers.get("Transfer-Encoding", "").lower():
+            body = bytearray()
+            while chunk_size := int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                body += await self._reader.readexactly(chunk_size + 2)
+                del body[-2:]
+            while await self._reader.readuntil(b"\r\n") != b"\r\n":
+                pass  # trailers
+            body = bytes(body)
+        elif "Content-Length" in headers:
+            body = await self._reader.readexactly(int(headers["Content-Length"]))
+        elif 100 <= status < 200 or status in (204, 304):
+            body = b""
+        else:
+            body = await self._reader.read()
+            self.is_closed = True
+
+        keep_alive = version == "HTTP/1.1" and headers.get("Connection", "").lower() != "close"
+        if not keep_alive:
+            self.is_closed = True
+        if self.supports_pipelining is None:
+            self.supports_pipelining = keep_alive
+        return HttpOracleResponse(status, CIMultiDictProxy(headers), body)
+
+    async def _read_responses(self) -> None:
+        reason = "Connection to target was closed"
+        try:
+            while not self.is_closed:
+                response = await self._read_response()
+                if not self._pending:
+                    raise ConnectionError("Unsolicited response from target")
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(response)
+                self.last_used_at = time.monotonic()
+            raise ConnectionResetError("Target closed the connection")
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as exception:
+            reason = f"Connection to target was lost: {exception}"
+        finally:
+            self.is_closed = True
+            self._writer.close()
+            while self._pending:
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_exception(ConnectionResetError(reason))
+
+    def close(self) -> None:
+        self.is_closed = True
+        self._read_task.cancel()
+
+    async def wait_closed(self) -> None:
+        await asyncio.gather(self._read_task, return_exceptions=True)
+
+
+class PipelinedTransport(HttpTransportABC):
+    """
+    Send requests over up to `max_connections` persistent connections to a single origin, with up to
+    `pipeline_depth` requests outstanding on each (HTTP/1.1 pipelining), once the target has shown that it keeps
+    connections alive. This hides round-trip latency behind the service's processing time, which matters when the
+    target is far away but caps its connections.
+
+    Connections which have been idle for `keepalive_timeout` are closed rather than reused, as the target has probably
+    dropped them.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 8,
+        *,
+        pipeline_depth: int = 8,
+        keepalive_timeout: float = 15.0,
+        ssl_context: ssl.SSLContext = None,
+    ) -> None:
+        assert max_connections >= 1 and pipeline_depth >= 1
+        self.max_connections = max_connections
+        self.pipeline_depth = pipeline_depth
+        self.keepalive_timeout = keepalive_timeout
+        self.ssl_context = ssl_context
+        self.max_in_flight = 0
+        """the most requests outstanding on one connection at once; 1 if the target turned out not to pipeline"""
+
+        self._connections: list[_PipelinedConnection] = []
+        self._connecting = 0
+        self._origin: URL | None = None
+        self._capacity_changed = asyncio.Condition()
+
+    def _serialize(self, request: HttpOracleRequest, url: URL) -> bytes:
+        headers = CIMultiDict[str](request.headers)
+        headers.setdefault("Host", url.raw_authority)
+        headers.setdefault("Connection", "keep-alive")
+        if request.body or request.method.upper() not in ("GET", "HEAD", "DELETE", "OPTIONS"):
+            headers["Content-Length"] = str(len(request.body))
+        head = f"{request.method} {url.raw_path_qs} HTTP/1.1\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        return (head + "\r\n").encode("latin-1") + request.body
+
+    def _prune(self) -> None:
+        now = time.monotonic()
+        for connection in list(self._connections):
+            is_stale = connection.in_flight == 0 and now - connection.last_used_at > self.keepalive_timeout
+            if connection.is_closed or is_stale:
+                self._connections.remove(connection)
+                connection.close()
+
+    async def _open_connection(self) -> _PipelinedConnection:
+        ssl_context = self.ssl_context
+        if ssl_context is None and self._origin.scheme == "https":
+            ssl_context = ssl.create_default_context()
+        reader, writer = await asyncio.open_connection(self._origin.host, self._origin.port, ssl=ssl_context)
+        return _PipelinedConnection(reader, writer)
+
+    async def _acquire(self) -> _PipelinedConnection:
+        async with self._capacity_changed:
+            while True:
+                self._prune()
+                available = [
+                    connection for connection in self._connections if connection.capacity(self.pipeline_depth) > 0
+                ]
+                if available:
+                    # spread requests across connections, rather than queueing behind a slow response
+                    return min(available, key=lambda connection: connection.in_flight)
+                if len(self._connections) + self._connecting < self.max_connections:
+                    break
+                await self._capacity_changed.wait()
+
+            self._connecting += 1
+        try:
+            connection = await self._open_connection()
+        finally:
+            async with self._capacity_changed:
+                self._connecting -= 1
+                self._capacity_changed.notify_all()
+        self._connections.append(connection)
+        return connection
+
+    def _retire(self, connection: _PipelinedConnection) -> None:
+        if connection in self._connections:
+            self._connections.remove(connection)
+        connection.close()
+
+    async def _notify_capacity_changed(self) -> None:
+        async with self._capacity_changed:
+            self._capacity_changed.notify_all()
+
+    async def send(self, request: HttpOracleRequest) -> HttpOracleResponse:
+        url = URL(request.url)
+        if self._origin is None:
+            self._origin = url.origin()
+        elif url.origin() != self._origin:
+            raise ValueError(f"{type(self).__name__} only sends requests to {self._origin}")
+
+        connection = await self._acquire()
+        # the request is queued on the connection as soon as it is sent
+        self.max_in_flight = max(self.max_in_flight, connection.in_flight + 1)
+        try:
+            return await connection.send(self._serialize(request, url))
+        except BaseException:
+            # after a timeout or a failed read, the connection may still owe a response (or hold part of a request),
+            # which would be taken as the answer to the next request sent on it
+            self._retire(connection)
+            raise
+        finally:
+            await self._notify_capacity_changed()
+
+    async def close(self) -> None:
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        await asyncio.gather(*(connection.wait_closed() for connection in connections))
+
+
+__all__ = ("HttpTransportABC", "AiohttpTransport", "PipelinedTransport",)
@@ -0,0 +1,12 @@
+from .lib import *
+from .padding import *
+from .batch import *
+from .block import *
+from .checkpoint import *
+from .detection import *
+from .guess_ordering import *
+from .metrics import *
+from .timing import *
+from .scheduler import *
+from .cracker import *
+from .forger import *
@@ -0,0 +1,102 @@
+import asyncio
+from typing import Awaitable, Callable, Sequence
+
+from extras.asyncio_extras import AbortToken, current_abort_token
+
+type PaddingOracleQuery = tuple[bytes, bytes]
+"""an (IV, ciphertext) pair"""
+
+type BatchPaddingOracle = Callable[[Sequence[PaddingOracleQuery]], Awaitable[Sequence[bool] | int]]
+"""
+a batch padding oracle checks the padding of many (IV, ciphertext) pairs at once. Its results are a bitmap, either as
+a sequence of booleans (e.g. a `list[bool]` or a `bitarray`) or as an integer whose `i`th bit answers the `i`th query
+"""
+
+
+def _bitmap_entry(bitmap: Sequence[bool] | int, index: int) -> bool:
+    if isinstance(bitmap, int):
+        return bool((bitmap >> index) & 1)
+    return bool(bitmap[index])
+
+
+class BatchingPaddingOracle:
+    """
+    Adapt a batch padding oracle into an ordinary padding oracle.
+
+    Queries issued during the same iteration of the event loop (e.g. a wave of guesses raced by `step_crack`) are
+    coalesced into a single call to the batch oracle, up to `max_batch_size` queries per call.
+    Queries which are cancelled, or whose race (see `asyncio_extras.race_predicate`) has been decided, before their
+    batch is sent are left out of it.
+    """
+
+    def __init__(self, batch_oracle: BatchPaddingOracle, max_batch_size: int = 64) -> None:
+        assert max_batch_size >= 1
+        self.batch_oracle = batch_oracle
+        self.max_batch_size = max_batch_size
+
+        self._pending: list[tuple[PaddingOracleQuery, asyncio.Future[bool], AbortToken | None]] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self._dispatch_tasks: set[asyncio.Task] = set()
+
+    async def __call__(self, iv: bytes, ciphertext: bytes) -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((bytes(iv), bytes(ciphertext)), future, current_abort_token()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending = []
+        for query, future, abort_token in self._pending:
+            if future.done():
+                continue
+            if abort_token is not None and abort_token.aborted:
+                future.cancel()
+                continue
+            pending.append((query, future))
+        self._pending.clear()
+        if not pending:
+            return
+
+        # retain a reference to the task so that it isn't garbage-collected mid-flight
+        task = asyncio.create_task(self._dispatch(pending))
+        self._dispatch_tasks.add(task)
+        task.add_done_callback(self._dispatch_tasks.discard)
+
+    async def _dispatch(self, pending: list[tuple[PaddingOracleQuery, asyncio.Future[bool]]]) -> None:
+        try:
+            bitmap = await self.batch_oracle([query for query, _ in pending])
+        except BaseException as exception:
+            for _, future in pending:
+                if future.done():
+                    continue
+                if isinstance(exception, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exception)
+            if not isinstance(exception, Exception):
+                raise
+            return
+
+        if not isinstance(bitmap, int) and len(bitmap) != len(pending):
+            exception = ValueError(f"batch oracle answered {len(bitmap)} queries, but was asked {len(pending)}")
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+
+        for index, (_, future) in enumerate(pending):
+            if not future.done():
+                future.set_result(_bitmap_entry(bitmap, index))
+
+
+__all__ = ("PaddingOracleQuery", "BatchPaddingOracle", "BatchingPaddingOracle",)
@@ -0,0 +1,174 @@
+from typing import TYPE_CHECKING
+
+from extras import asyncio_extras
+from utils.code_highlight import code_highlight
+
+from .lib import PaddingOracle, InsignificantResultException, ExhaustedGuessesException, is_significant
+from .padding import PaddingSchemeABC, PKCS7Padding
+
+if TYPE_CHECKING:
+    from .guess_ordering import GuessOrderingABC
+
+
+class PartiallyCrackedBlock:
+    def __init__(self,
+        block_length: int,
+        preceding_ciphertext_block: bytes,
+        ciphertext_block: bytes,
+        *,
+        is_final_block: bool = False,
+        padding_scheme: PaddingSchemeABC = None,
+    ) -> None:
+        assert len(preceding_ciphertext_block) == block_length
+        assert len(ciphertext_block) == block_length
+
+        self.block_length = block_length
+        self.preceding_ciphertext = preceding_ciphertext_block
+        self.ciphertext = ciphertext_block
+        self.is_final_block = is_final_block
+        """Whether the block is the last of its message, and hence ends with padding"""
+        if padding_scheme is None:
+            padding_scheme = PKCS7Padding()
+        self.padding_scheme = padding_scheme
+        """The padding scheme the oracle checks, which is spoofed to recover each byte"""
+        self._known_decryption = bytearray(block_length)
+        self._known_plaintext = bytearray(block_length)
+        self.num_bytes_known = 0
+
+    @property
+    def num_bytes_unknown(self):
+        return self.block_length - self.num_bytes_known
+
+    @property
+    def known_decryption(self) -> bytes:
+        return bytes(self._known_decryption)
+
+    @property
+    def known_plaintext(self) -> bytes:
+        return bytes(self._known_plaintext)
+
+    def is_complete(self) -> bool:
+        return self.num_bytes_known == self.block_length
+
+    def known_padding_length(self) -> int | None:
+        """
+        :return: the length of the padding of a final block, once every padding byte is known
+        """
+        if not self.is_final_block:
+            return None
+        known_plaintext = self.known_plaintext
+        for padding_length in range(1, self.num_bytes_known + 1):
+            if known_plaintext.endswith(self.padding_scheme.tail(padding_length)):
+                return padding_length
+        return None
+
+    def update(self, new_known_byte_decryption: int) -> None:
+        assert 0 <= new_known_byte_decryption < 256
+
+        first_known_byte_index = self.num_bytes_unknown
+        last_unknown_byte_index = first_known_byte_index - 1
+        self._known_decryption[last_unknown_byte_index] = new_known_byte_decryption
+        mask_byte = self.preceding_ciphertext[last_unknown_byte_index]
+        self._known_plaintext[last_unknown_byte_index] = new_known_byte_decryption ^ mask_byte
+        self.num_bytes_known += 1
+
+    async def step_crack(
+        self,
+        oracle: PaddingOracle,
+        guess_ordering: "GuessOrderingABC" = None,
+        wave_size: int = 256,
+    ) -> None:
+        """
+        Recover the last unknown byte of the block.
+
+        Guesses are taken in the order given by `guess_ordering` and raced against each other in waves of `wave_size`;
+        a wave is only started once every guess in the previous wave has been ruled out.
+        """
+        assert not self.is_complete()
+
+        first_known_byte_index = self.num_bytes_unknown
+        last_unknown_byte_index = first_known_byte_index - 1
+
+        preceding_block = bytearray(self.preceding_ciphertext)
+        ciphertext_block = self.ciphertext
+
+        # spoof padding for known bytes
+        target_padding = self.padding_scheme.tail(self.num_bytes_known + 1)
+        for byte_index, padding_byte in enumerate(target_padding[1:], start=first_known_byte_index):
+            preceding_block[byte_index] = self.known_decryption[byte_index] ^ padding_byte
+
+        # find a mutation which turns the last unknown byte into valid padding
+        async def try_byte_value(value: int) -> int:
+            c1_prime = bytearray(preceding_block)
+            c1_prime[last_unknown_byte_index] = value
+            if not await oracle(c1_prime, ciphertext_block):
+                raise InsignificantResultException
+            if last_unknown_byte_index == 0:
+                return value
+
+            asyncio_extras.raise_if_race_aborted()
+            c1_prime[last_unknown_byte_index - 1] ^= 1
+            if not await oracle(c1_prime, ciphertext_block):
+                raise InsignificantResultException
+            return value
+
+        if guess_ordering is None:
+            candidate_values = range(256)
+        else:
+            # a plaintext byte guess `p` corresponds to the decryption byte `p ^ c`, where `c` is the preceding
+            # ciphertext byte; that decryption byte is turned into the target padding byte by the value below
+            mask = self.preceding_ciphertext[last_unknown_byte_index] ^ target_padding[0]
+            candidate_values = [guess ^ mask for guess in guess_ordering.rank_plaintext_bytes(self)]
+
+        try:
+            successful_byte_value = await asyncio_extras.race_predicate(
+                is_significant,
+                (try_byte_value(value) for value in candidate_values),
+                wave_size=wave_size,
+            )
+        except BaseExceptionGroup as exception_group:
+            _, unexpected_exceptions = exception_group.split(InsignificantResultException)
+            if unexpected_exceptions is not None:
+                raise unexpected_exceptions
+            raise ExhaustedGuessesException from None
+
+        self.update(successful_byte_value ^ target_padding[0])
+
+    def _render_byte_hex(self, byte_index: int) -> str:
+        if byte_index < self.num_bytes_unknown:
+            return "??"
+        return self._known_plaintext[byte_index].to_bytes(length=1).hex()
+
+    def _render_decryption_byte_hex(self, byte_index: int) -> str:
+        if byte_index < self.num_bytes_unknown:
+            return "??"
+        return self._known_decryption[byte_index].to_bytes(length=1).hex()
+
+    def _render_byte_ascii(self, byte_index: int) -> str:
+        if byte_index < self.num_bytes_unknown:
+            return "?"
+        byte_value = self._known_plaintext[byte_index]
+        if byte_value < 32 or 128 <= byte_value:
+            return u"\u21af"
+        byte_char = chr(byte_value)
+        if byte_char == "\n":
+            return u"\u240A"
+        if byte_char == "\r":
+            return u"\u240D"
+        if byte_char == "\t":
+            return u"\u21e5"
+        return byte_char
+
+    def render_progress(self) -> str:
+        hex_progress = " ".join(self._render_byte_hex(byte_index) for byte_index in range(self.block_length))
+        ascii_progress = "".join(self._render_byte_ascii(byte_index) for byte_index in range(self.block_length))
+
+        return code_highlight(f"bytes.fromhex({hex_progress!r}) ({ascii_progress!r})")
+
+    def render_decryption_progress(self) -> str:
+        hex_progress = " ".join(self._render_decryption_byte_hex(byte_index) for byte_index in range(self.block_length))
+
+        return code_highlight(f"bytes.fromhex({hex_progress!r})")
+
+
+__all__ = ("PartiallyCrackedBlock",)
@@ -0,0 +1,125 @@
+import hashlib
+import struct
+from io import BufferedRandom
+from pathlib import Path
+from typing import ClassVar, Self
+
+from definitions import project_cache_dirname
+
+padding_oracle_checkpoints_dirname = Path(project_cache_dirname, "padding-oracle-checkpoints")
+
+
+class PaddingOracleCheckpoint:
+    """
+    Append-only journal of the decryption bytes recovered by a padding oracle attack, so that an interrupted attack
+    can be resumed without repeating any completed byte's oracle queries.
+    (Queries for bytes which were still being searched when the attack was interrupted are repeated.)
+
+    The journal consists of a header:
+        magic (4 bytes) | block length (1 byte) | SHA-256 digest of IV + ciphertext (32 bytes)
+    followed by one fixed-size record per recovered byte:
+        block index (4 bytes, big-endian) | decryption byte (1 byte)
+
+    Bytes of each block are recovered last-to-first, so a record's position within its block is implied by the number
+    of preceding records for the same block. A partially-written trailing record (e.g. from a crash) is discarded.
+    """
+
+    magic: ClassVar[bytes] = b"POC\x01"
+    header_struct: ClassVar[struct.Struct] = struct.Struct(">4sB32s")
+    record_struct: ClassVar[struct.Struct] = struct.Struct(">IB")
+
+    def __init__(self, path: Path, iv: bytes, ciphertext: bytes, block_length: int = 16) -> None:
+        self.path = path
+        self.block_length = block_length
+        self._digest = self.digest_of(iv, ciphertext)
+        self._file_handle: BufferedRandom | None = None
+
+    @staticmethod
+    def digest_of(iv: bytes, ciphertext: bytes) -> bytes:
+        return hashlib.sha256(bytes(iv) + bytes(ciphertext)).digest()
+
+    @classmethod
+    def for_ciphertext(cls, iv: bytes, ciphertext: bytes, block_length: int = 16, dirname: Path = None) -> Self:
+        """Return the checkpoint for an (IV, ciphertext) pair, in the project cache unless otherwise specified."""
+        if dirname is None:
+            dirname = padding_oracle_checkpoints_dirname
+        digest = cls.digest_of(iv, ciphertext)
+        return cls(Path(dirname, f"{digest.hex()[:32]}.journal"), iv, ciphertext, block_length)
+
+    @property
+    def _header(self) -> bytes:
+        return self.header_struct.pack(self.magic, self.block_length, self._digest)
+
+    def _check_header(self, header: bytes) -> None:
+        if len(header) < self.header_struct.size:
+            raise ValueError(f"Checkpoint {self.path} is truncated")
+        magic, block_length, digest = self.header_struct.unpack(header)
+        if magic != self.magic:
+            raise ValueError(f"{self.path} is not a padding oracle checkpoint")
+        if block_length != self.block_length or digest != self._digest:
+            raise ValueError(f"Checkpoint {self.path} belongs to a different attack")
+
+    def _whole_records_length(self, length: int) -> int:
+        record_count = (length - self.header_struct.size) // self.record_struct.size
+        return self.header_struct.size + record_count * self.record_struct.size
+
+    def load(self) -> dict[int, bytes]:
+        """
+        Return the journaled decryption bytes of each block, in the order they were recovered (last-to-first).
+        """
+        if not self.path.exists():
+            return {}
+
+        with open(self.path, "rb") as file_handle:
+            contents = file_handle.read()
+        self._check_header(contents[:self.header_struct.size])
+
+        known_decryptions = dict[int, bytearray]()
+        records_end = self._whole_records_length(len(contents))
+        for block_index, decryption_byte in self.record_struct.iter_unpack(
+            contents[self.header_struct.size:records_end]
+        ):
+            known_decryption = known_decryptions.setdefault(block_index, bytearray())
+            assert len(known_decryption) < self.block_length
+            known_decryption.append(decryption_byte)
+
+        return {block_index: bytes(known_decryption) for block_index, known_decryption in known_decryptions.items()}
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            with open(self.path, "wb") as file_handle:
+                file_handle.write(self._header)
+
+        self._file_handle = open(self.path, "r+b")
+        self._check_header(self._file_handle.read(self.header_struct.size))
+        # drop any partially-written trailing record, so new records stay aligned
+        self._file_handle.truncate(self._whole_records_length(self.path.stat().st_size))
+        self._file_handle.seek(0, 2)
+
+    def close(self) -> None:
+        if self._file_handle is None:
+            return
+        self._file_handle.close()
+        self._file_handle = None
+
+    def record(self, block_index: int, decryption_byte: int) -> None:
+        if self._file_handle is None:
+            raise Exception("Checkpoint has not been opened")
+        self._file_handle.write(self.record_struct.pack(block_index, decryption_byte))
+        self._file_handle.flush()
+
+    def discard(self) -> None:
+        """Delete the journal, e.g. once its attack has completed."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> Self:
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+__all__ = ("PaddingOracleCheckpoint",)
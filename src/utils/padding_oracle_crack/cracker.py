@@ -0,0 +1,304 @@
+import asyncio
+from contextlib import AsyncExitStack
+from typing import Generator, Iterable, Self, Sequence
+
+from utils.reprint import PrinterABC, Printer, NoOpPrinter
+
+from .batch import BatchPaddingOracle, BatchingPaddingOracle
+from .block import PartiallyCrackedBlock
+from .checkpoint import PaddingOracleCheckpoint
+from .detection import PaddingHypothesis, detect_block_length, detect_padding
+from .guess_ordering import GuessOrderingABC, PlaintextPriorGuessOrdering
+from .lib import PaddingOracle, ExhaustedGuessesException
+from .metrics import OracleMetrics
+from .padding import PaddingSchemeABC, PKCS7Padding, padding_schemes as default_padding_schemes
+from .scheduler import OracleSchedulerABC, UnboundedOracleScheduler
+
+
+class PaddingOracleCracker:
+    """
+    assume 128-bit blocks (in general, the block length is that of the IV).
+
+    -- modify penultimate block s.t. decryption of final byte is a padding byte --
+    for 'mod' values 0 through 256,
+    set the last byte of C_0 = IV to 'mod' to construct C_0'
+    try to decrypt C' = (C_0', C_1)
+    If the padding is correct, the last byte of D(C_1) ^ C_0' is a padding byte (0x01...0x10)
+
+    -- determine which padding byte is exhibited --
+    tamper with the penultimate unknown byte of C' to construct C_0''
+    try to decrypt C'' = (C_0'', C_1)
+    If the padding is no longer correct, continue through the 'mod' for-loop
+    Otherwise, the padding remains correct despite tampering.
+    This means the penultimate unknown byte of D(C_1) ^ C_0' is the final non-padding byte
+    In any other case, tampering would have invalidated the padding
+    therefore, the final unknown byte is 0x01
+
+    Padding schemes other than PKCS#7 are spoofed in the same way, one byte at a time.
+    `detect_padding` (or `from_token`) works out the block length and padding scheme with a handful of queries, and
+    as a bonus reveals the padding bytes of the final block, which then need not be cracked.
+    """
+
+    def __init__(
+        self,
+        iv: bytes,
+        ciphertext: bytes,
+        oracle: PaddingOracle,
+        *,
+        render_progress: bool = True,
+        scheduler: OracleSchedulerABC = None,
+        guess_ordering: GuessOrderingABC = None,
+        wave_size: int = 16,
+        checkpoint: PaddingOracleCheckpoint = None,
+        padding_scheme: PaddingSchemeABC = None,
+        metrics: OracleMetrics = None,
+    ) -> None:
+        self.block_length = len(iv)
+        """Block length (in bytes) of the cipher being attacked"""
+        number_of_ciphertext_blocks, ciphertext_overflow_length = divmod(len(ciphertext), self.block_length)
+        assert ciphertext_overflow_length == 0
+
+        self.iv = iv
+        self.ciphertext = ciphertext
+        self._number_of_ciphertext_blocks = number_of_ciphertext_blocks
+
+        self.oracle = oracle
+        if metrics is None:
+            metrics = OracleMetrics()
+        self.metrics = metrics
+        self._instrumented_oracle = self.metrics.instrument(oracle)
+        if scheduler is None:
+            scheduler = UnboundedOracleScheduler()
+        self.scheduler = scheduler
+        if guess_ordering is None:
+            guess_ordering = PlaintextPriorGuessOrdering()
+        self.guess_ordering = guess_ordering
+        self.wave_size = wave_size
+        self.checkpoint = checkpoint
+        if padding_scheme is None:
+            padding_scheme = PKCS7Padding()
+        self.padding_scheme = padding_scheme
+        self.padding_hypotheses: list[PaddingHypothesis] = []
+        """Detected paddings of the final block; when there are several, the first to crack successfully is adopted"""
+
+        self.render_progress = render_progress
+        self.printer_factory = Printer if render_progress else NoOpPrinter
+
+    @classmethod
+    def resumable(cls, iv: bytes, ciphertext: bytes, oracle: PaddingOracle, **kwargs) -> Self:
+        """
+        Construct a cracker which journals its progress to the project cache, resuming from any previous progress
+        against the same (IV, ciphertext) pair.
+        """
+        checkpoint = PaddingOracleCheckpoint.for_ciphertext(iv, ciphertext, len(iv))
+        return cls(iv, ciphertext, oracle, checkpoint=checkpoint, **kwargs)
+
+    @classmethod
+    def from_batch_oracle(
+        cls,
+        iv: bytes,
+        ciphertext: bytes,
+        batch_oracle: BatchPaddingOracle,
+        *,
+        max_batch_size: int = 64,
+        **kwargs,
+    ) -> Self:
+        """
+        Construct a cracker which packs the guesses of each wave into as few batch oracle calls as possible.
+        Unless specified otherwise, waves are as large as batches, so each byte usually costs a single round trip.
+        """
+        kwargs.setdefault("wave_size", max_batch_size)
+        oracle = BatchingPaddingOracle(batch_oracle, max_batch_size)
+        return cls(iv, ciphertext, oracle, **kwargs)
+
+    @classmethod
+    async def from_token(
+        cls,
+        token: bytes,
+        oracle: PaddingOracle,
+        *,
+        candidate_block_lengths: Iterable[int] = (16, 8),
+        padding_schemes: Sequence[PaddingSchemeABC] = default_padding_schemes,
+        **kwargs,
+    ) -> Self:
+        """
+        Construct a cracker for a token (the IV followed by the ciphertext) whose block length and padding scheme are
+        unknown, by probing the oracle for them.
+        """
+        metrics = kwargs.setdefault("metrics", OracleMetrics())
+        block_length = await detect_block_length(metrics.instrument(oracle), token, candidate_block_lengths)
+        cracker = cls(token[:block_length], token[block_length:], oracle, **kwargs)
+        await cracker.detect_padding(padding_schemes)
+        return cracker
+
+    async def detect_padding(self, padding_schemes: Sequence[PaddingSchemeABC] = default_padding_schemes) -> None:
+        """
+        Probe the oracle for the padding scheme, and the padding length of the final block.
+        """
+        oracle = self.scheduler.bind("padding detection", self._instrumented_oracle)
+        final_block_index = self._number_of_ciphertext_blocks - 1
+        self.padding_hypotheses = await detect_padding(
+            oracle,
+            self._block_at(final_block_index),
+            self._ciphertext_block_at(final_block_index),
+            padding_schemes,
+        )
+        self.padding_scheme = self.padding_hypotheses[0].padding_scheme
+
+    def _block_at(self, index: int) -> bytes:
+        if index == 0:
+            return self.iv
+        return self._ciphertext_block_at(index - 1)
+
+    def _ciphertext_block_at(self, index: int) -> bytes:
+        from_index = index * self.block_length
+        to_index = from_index + self.block_length
+        return self.ciphertext[from_index:to_index]
+
+    def _ciphertext_blocks(self) -> Generator[bytes]:
+        for index in range(self._number_of_ciphertext_blocks):
+            yield self._ciphertext_block_at(index)
+
+    async def crack_plaintext(self) -> bytearray:
+        plaintext = bytearray()
+
+        known_decryptions = {}
+        futures: list[asyncio.Future[bytes]] = []
+        async with AsyncExitStack() as stack:
+            if self.checkpoint is not None:
+                known_decryptions = self.checkpoint.load()
+                stack.enter_context(self.checkpoint)
+            # one line per block, then one line of metrics
+            printer = self.printer_factory(line_count=self._number_of_ciphertext_blocks + 1)
+            stack.enter_context(printer)
+
+            if self.padding_hypotheses:
+                final_block_index = self._number_of_ciphertext_blocks - 1
+                known_decryptions[final_block_index] = await self.crack_final_block_padding(
+                    printer,
+                    known_decryptions.get(final_block_index, b""),
+                )
+
+            task_group = asyncio.TaskGroup()
+            await stack.enter_async_context(task_group)
+
+            for index in range(self._number_of_ciphertext_blocks):
+                known_decryption = known_decryptions.get(index, b"")
+                future = task_group.create_task(self.crack_plaintext_block(index, printer, known_decryption))
+                futures.append(future)
+
+        for future in futures:
+            block = future.result()
+            plaintext.extend(block)
+
+        padding_length = self.padding_scheme.padding_length(plaintext, self.block_length)
+        return plaintext[:-padding_length]
+
+    def _partially_cracked_block(
+        self,
+        plaintext_block_index: int,
+        known_decryption: bytes,
+        padding_scheme: PaddingSchemeABC,
+    ) -> PartiallyCrackedBlock:
+        partial_decryption = PartiallyCrackedBlock(
+            self.block_length,
+            self._block_at(plaintext_block_index),
+            self._ciphertext_block_at(plaintext_block_index),
+            is_final_block=plaintext_block_index == self._number_of_ciphertext_blocks - 1,
+            padding_scheme=padding_scheme,
+        )
+        for known_byte_decryption in known_decryption:
+            partial_decryption.update(known_byte_decryption)
+        return partial_decryption
+
+    def _render_block_progress(
+        self,
+        printer: PrinterABC,
+        plaintext_block_index: int,
+        partial_decryption: PartiallyCrackedBlock,
+    ) -> None:
+        # progress (in particular the metrics summary) is only built if it will be shown
+        if not self.render_progress:
+            return
+        printer(
+            f"block {plaintext_block_index}: {partial_decryption.render_progress()}",
+            line_index=plaintext_block_index,
+        )
+        printer(self.metrics.render(), line_index=self._number_of_ciphertext_blocks)
+
+    async def crack_final_block_padding(self, printer: PrinterABC, known_decryption: bytes = b"") -> bytes:
+        """
+        Fill in the padding bytes of the final block according to the detected padding hypotheses.
+
+        When several hypotheses remain, the final block is cracked under each in turn, for a couple of bytes beyond
+        its padding: a wrong hypothesis spoofs padding which the oracle never accepts, so its guesses are exhausted.
+        The first hypothesis to survive is adopted as the padding scheme of every block.
+
+        :param known_decryption: previously recovered decryption bytes of the final block, in the order they were
+            recovered
+        :return: the known decryption bytes of the final block, in the order they were recovered
+        """
+        final_block_index = self._number_of_ciphertext_blocks - 1
+        block_oracle = self.scheduler.bind(final_block_index, self._instrumented_oracle)
+
+        for hypothesis_index, (padding_scheme, padding_length) in enumerate(self.padding_hypotheses):
+            partial_decryption = self._partially_cracked_block(final_block_index, known_decryption, padding_scheme)
+            tail = padding_scheme.tail(padding_length)
+            # previously recovered bytes may already rule the hypothesis out
+            overlap_length = min(partial_decryption.num_bytes_known, padding_length)
+            if overlap_length and partial_decryption.known_plaintext[-overlap_length:] != tail[-overlap_length:]:
+                continue
+            while partial_decryption.num_bytes_known < padding_length:
+                byte_index = partial_decryption.num_bytes_unknown - 1
+                padding_byte = tail[byte_index - self.block_length]
+                partial_decryption.update(padding_byte ^ partial_decryption.preceding_ciphertext[byte_index])
+            self._render_block_progress(printer, final_block_index, partial_decryption)
+
+            if hypothesis_index == len(self.padding_hypotheses) - 1:
+                break  # there is nothing left to rule out
+            confirmed_length = min(padding_length + 2, self.block_length)
+            try:
+                while partial_decryption.num_bytes_known < confirmed_length:
+                    await partial_decryption.step_crack(block_oracle, self.guess_ordering, self.wave_size)
+                    self._render_block_progress(printer, final_block_index, partial_decryption)
+            except ExhaustedGuessesException:
+                continue
+            break
+        else:
+            raise ExhaustedGuessesException("No detected padding is consistent with the final block")
+
+        self.padding_scheme = padding_scheme
+        recovered_decryption = partial_decryption.known_decryption[partial_decryption.num_bytes_unknown:][::-1]
+        for known_byte_decryption in recovered_decryption[len(known_decryption):]:
+            self.metrics.record_recovered_byte()
+            if self.checkpoint is not None:
+                self.checkpoint.record(final_block_index, known_byte_decryption)
+        return recovered_decryption
+
+    async def crack_plaintext_block(
+        self,
+        plaintext_block_index: int,
+        printer: PrinterABC,
+        known_decryption: bytes = b"",
+    ) -> bytes:
+        """
+        :param known_decryption: previously recovered decryption bytes of the block, in the order they were recovered
+        """
+        partial_decryption = self._partially_cracked_block(plaintext_block_index, known_decryption, self.padding_scheme)
+        block_oracle = self.scheduler.bind(plaintext_block_index, self._instrumented_oracle)
+
+        self._render_block_progress(printer, plaintext_block_index, partial_decryption)
+        while not partial_decryption.is_complete():
+            await partial_decryption.step_crack(block_oracle, self.guess_ordering, self.wave_size)
+            self.metrics.record_recovered_byte()
+            if self.checkpoint is not None:
+                self.checkpoint.record(
+                    plaintext_block_index,
+                    partial_decryption.known_decryption[partial_decryption.num_bytes_unknown],
+                )
+            self._render_block_progress(printer, plaintext_block_index, partial_decryption)
+
+        return partial_decryption.known_plaintext
+
+
+__all__ = ("PaddingOracleCracker",)
@@ -0,0 +1,131 @@
+from typing import Iterable, NamedTuple, Sequence
+
+from .lib import PaddingOracle
+from .padding import PaddingSchemeABC, padding_schemes as default_padding_schemes
+
+
+class PaddingHypothesis(NamedTuple):
+    """A guess at how the final block of a message is padded."""
+
+    padding_scheme: PaddingSchemeABC
+    padding_length: int
+
+
+async def detect_block_length(
+    oracle: PaddingOracle,
+    token: bytes,
+    candidate_block_lengths: Iterable[int] = (16, 8),
+) -> int:
+    """
+    Work out the block length of the cipher which produced `token` (the IV followed by the ciphertext).
+
+    Under any of the supported padding schemes, flipping every bit of the last byte of the penultimate block
+    invalidates the padding, whereas flipping the same byte when it lies further from the end of the token leaves the
+    final block alone. So, trying candidates from longest to shortest, the first whose flip is rejected is the block
+    length. Candidates which don't fit the token are skipped, and the last candidate standing is returned without
+    asking the oracle, so this costs at most one query per candidate ruled out.
+
+    The oracle is called with the token split after each candidate block length; it should not rely on that split
+    (e.g. it may send the IV and ciphertext to the target concatenated).
+    """
+    block_lengths = [
+        block_length for block_length in sorted(set(candidate_block_lengths), reverse=True)
+        if len(token) % block_length == 0 and len(token) >= 2 * block_length
+    ]
+    if not block_lengths:
+        raise ValueError(f"None of the candidate block lengths fit a token of {len(token)} bytes")
+
+    for block_length in block_lengths[:-1]:
+        probe = bytearray(token)
+        probe[-block_length - 1] ^= 0xff
+        if not await oracle(probe[:block_length], probe[block_length:]):
+            return block_length
+    return block_lengths[-1]
+
+
+def _predict(hypothesis: PaddingHypothesis, block_length: int, mask: bytes) -> bool | None:
+    """
+    Predict the oracle's verdict on the final block masked by `mask` (a suffix of the block), were `hypothesis` true.
+    Only the padding bytes of the final block are known, so the prediction is `None` if it depends on any other bytes.
+    """
+    padding_scheme, padding_length = hypothesis
+    tail = padding_scheme.tail(padding_length)
+    if len(mask) > padding_length:
+        # the bytes preceding the padding are unknown, so the verdict is only predictable if the padding is untouched
+        if any(mask[-padding_length:]):
+            return None
+        return padding_scheme.suffix_verdict(tail, block_length)
+    masked_tail = tail[:-len(mask)] + bytes(a ^ b for a, b in zip(tail[-len(mask):], mask))
+    return padding_scheme.suffix_verdict(masked_tail, block_length)
+
+
+def _candidate_masks(hypotheses: Sequence[PaddingHypothesis], block_length: int) -> Iterable[bytes]:
+    # flipping a single byte reveals whether it is part of the padding
+    for index in range(block_length):
+        yield b"\xff" + bytes(index)
+    # rewriting one hypothesis' padding as shorter padding of any scheme distinguishes between schemes
+    for padding_scheme, padding_length in hypotheses:
+        tail = padding_scheme.tail(padding_length)
+        for other_padding_scheme in dict.fromkeys(other_padding_scheme for other_padding_scheme, _ in hypotheses):
+            for shorter_padding_length in range(1, padding_length):
+                shorter_tail = other_padding_scheme.tail(shorter_padding_length)
+                yield bytes(a ^ b for a, b in zip(tail[-shorter_padding_length:], shorter_tail))
+
+
+async def detect_padding(
+    oracle: PaddingOracle,
+    preceding_ciphertext_block: bytes,
+    final_ciphertext_block: bytes,
+    padding_schemes: Sequence[PaddingSchemeABC] = default_padding_schemes,
+) -> list[PaddingHypothesis]:
+    """
+    Work out the padding scheme of a message, and how much padding its final block has.
+
+    Every (scheme, padding length) pair is a hypothesis. Each probe masks the end of the final block so that
+    hypotheses predict different verdicts, chosen so that the hypotheses left standing are as few as possible whatever
+    the oracle's verdict. Probing stops once no probe can tell the remaining hypotheses apart; this takes around
+    log2(block length) + 2 queries.
+
+    Some hypotheses can't be told apart from one message: single bytes of padding under any scheme can only be
+    replaced by padding which ignores the rest of the block, and the same goes for two bytes of PKCS#7 or ANSI X.923.
+
+    :return: the hypotheses consistent with the oracle's verdicts, in the order of `padding_schemes`
+    """
+    block_length = len(final_ciphertext_block)
+    assert len(preceding_ciphertext_block) == block_length
+    hypotheses = [
+        PaddingHypothesis(padding_scheme, padding_length)
+        for padding_scheme in padding_schemes
+        for padding_length in range(1, block_length + 1)
+    ]
+
+    while len(hypotheses) > 1:
+        best_mask = None
+        best_remaining_count = len(hypotheses)
+        for mask in _candidate_masks(hypotheses, block_length):
+            predictions = [_predict(hypothesis, block_length, mask) for hypothesis in hypotheses]
+            if True not in predictions or False not in predictions:
+                continue
+            undecided_count = predictions.count(None)
+            remaining_count = max(predictions.count(True), predictions.count(False)) + undecided_count
+            if remaining_count < best_remaining_count:
+                best_mask = mask
+                best_remaining_count = remaining_count
+        if best_mask is None:
+            break
+
+        probe = bytearray(preceding_ciphertext_block)
+        for index, mask_byte in enumerate(best_mask, start=block_length - len(best_mask)):
+            probe[index] ^= mask_byte
+        verdict = await oracle(probe, final_ciphertext_block)
+        hypotheses = [
+            hypothesis for hypothesis in hypotheses
+            if _predict(hypothesis, block_length, best_mask) in (verdict, None)
+        ]
+
+    if not hypotheses:
+        raise ValueError("The oracle's verdicts are inconsistent with every supported padding scheme")
+    return hypotheses
+
+
+__all__ = ("PaddingHypothesis", "detect_block_length", "detect_padding",)
@@ -0,0 +1,143 @@
+import asyncio
+from contextlib import AsyncExitStack
+from secrets import token_bytes as random_bytes
+
+from utils.reprint import PrinterABC, Printer, NoOpPrinter
+
+from .block import PartiallyCrackedBlock
+from .guess_ordering import GuessOrderingABC, FlatGuessOrdering
+from .lib import PaddingOracle
+from .metrics import OracleMetrics
+from .padding import PaddingSchemeABC, PKCS7Padding
+from .scheduler import OracleSchedulerABC, UnboundedOracleScheduler
+
+
+class PaddingOracleForger:
+    """
+    Encrypt arbitrary plaintext using a padding oracle ('CBC-R').
+
+    CBC decryption computes P_i = D(C_i) ^ C_{i-1}. A padding oracle attack recovers the 'intermediate' value D(C_i)
+    of any ciphertext block C_i, so choosing C_{i-1} = D(C_i) ^ P_i forces the i-th plaintext block to be P_i.
+
+    Starting from a chosen final block C_n, the intermediate value of each block determines its predecessor, all the
+    way back to the IV (C_0). Each block is a pipeline stage which begins probing the moment its predecessor
+    stage publishes the block's ciphertext; since stages share the oracle scheduler, several forgeries may be
+    pipelined against one service at once.
+    """
+
+    def __init__(
+        self,
+        plaintext: bytes,
+        oracle: PaddingOracle,
+        *,
+        final_ciphertext_block: bytes = None,
+        render_progress: bool = True,
+        scheduler: OracleSchedulerABC = None,
+        guess_ordering: GuessOrderingABC = None,
+        wave_size: int = 16,
+        block_length: int = 16,
+        padding_scheme: PaddingSchemeABC = None,
+    ) -> None:
+        self.block_length = block_length
+        """Block length (in bytes) of the cipher being attacked"""
+        if padding_scheme is None:
+            padding_scheme = PKCS7Padding()
+        self.padding_scheme = padding_scheme
+
+        if final_ciphertext_block is None:
+            final_ciphertext_block = random_bytes(self.block_length)
+        assert len(final_ciphertext_block) == self.block_length
+
+        self.plaintext = plaintext
+        self.padded_plaintext = padding_scheme.pad(plaintext, block_length)
+        self._number_of_blocks = len(self.padded_plaintext) // self.block_length
+        self.final_ciphertext_block = final_ciphertext_block
+
+        self.oracle = oracle
+        self.metrics = OracleMetrics()
+        self._instrumented_oracle = self.metrics.instrument(oracle)
+        if scheduler is None:
+            scheduler = UnboundedOracleScheduler()
+        self.scheduler = scheduler
+        if guess_ordering is None:
+            # the 'plaintext' of a probe is the intermediate value masked by a random block; it has no structure
+            guess_ordering = FlatGuessOrdering()
+        self.guess_ordering = guess_ordering
+        self.wave_size = wave_size
+
+        self.render_progress = render_progress
+        self.printer_factory = Printer if render_progress else NoOpPrinter
+
+    def _plaintext_block_at(self, index: int) -> bytes:
+        from_index = index * self.block_length
+        to_index = from_index + self.block_length
+        return self.padded_plaintext[from_index:to_index]
+
+    async def forge(self) -> tuple[bytes, bytes]:
+        """
+        :return: an (IV, ciphertext) pair which decrypts to the plaintext
+        """
+        loop = asyncio.get_running_loop()
+        # futures[0] resolves to the IV, futures[i] to the i-th ciphertext block
+        futures: list[asyncio.Future[bytes]] = [loop.create_future() for _ in range(self._number_of_blocks + 1)]
+        futures[-1].set_result(self.final_ciphertext_block)
+
+        async with AsyncExitStack() as stack:
+            # one line per block, then one line of metrics
+            printer = self.printer_factory(line_count=self._number_of_blocks + 1)
+            stack.enter_context(printer)
+            task_group = asyncio.TaskGroup()
+            await stack.enter_async_context(task_group)
+
+            for plaintext_block_index in reversed(range(self._number_of_blocks)):
+                task_group.create_task(self.forge_preceding_block(
+                    plaintext_block_index,
+                    futures[plaintext_block_index + 1],
+                    futures[plaintext_block_index],
+                    printer,
+                ))
+
+        iv = futures[0].result()
+        ciphertext = b"".join(future.result() for future in futures[1:])
+        return iv, ciphertext
+
+    async def forge_preceding_block(
+        self,
+        plaintext_block_index: int,
+        ciphertext_block_future: asyncio.Future[bytes],
+        preceding_block_future: asyncio.Future[bytes],
+        printer: PrinterABC,
+    ) -> None:
+        """
+        Once a ciphertext block is known, recover its intermediate value and hence forge the block preceding it.
+        """
+        def render_progress(progress: str) -> None:
+            # progress (in particular the metrics summary) is only built if it will be shown
+            if not self.render_progress:
+                return
+            printer(f"block {plaintext_block_index}: {progress}", line_index=plaintext_block_index)
+            printer(self.metrics.render(), line_index=self._number_of_blocks)
+
+        render_progress("waiting for successor")
+        ciphertext_block = await ciphertext_block_future
+
+        partial_decryption = PartiallyCrackedBlock(
+            self.block_length,
+            random_bytes(self.block_length),
+            ciphertext_block,
+            padding_scheme=self.padding_scheme,
+        )
+        block_oracle = self.scheduler.bind(plaintext_block_index, self._instrumented_oracle)
+
+        render_progress(partial_decryption.render_decryption_progress())
+        while not partial_decryption.is_complete():
+            await partial_decryption.step_crack(block_oracle, self.guess_ordering, self.wave_size)
+            self.metrics.record_recovered_byte()
+            render_progress(partial_decryption.render_decryption_progress())
+
+        intermediate = partial_decryption.known_decryption
+        plaintext_block = self._plaintext_block_at(plaintext_block_index)
+        preceding_block_future.set_result(bytes(a ^ b for a, b in zip(intermediate, plaintext_block)))
+
+
+__all__ = ("PaddingOracleForger",)
@@ -0,0 +1,148 @@
+import string
+from abc import ABC, abstractmethod
+from typing import Mapping, Self, Sequence
+
+from utils.data.bigrams import load_space_and_lowercase_bigrams_dataset
+from utils.data.monograms import english_text_letter_frequencies
+
+from .block import PartiallyCrackedBlock
+
+
+class GuessOrderingABC(ABC):
+    @abstractmethod
+    def rank_plaintext_bytes(self, block: PartiallyCrackedBlock) -> Sequence[int]:
+        """
+        Rank every possible value (0 through 255) of the block's last unknown plaintext byte, most likely first.
+        """
+        pass
+
+
+class FlatGuessOrdering(GuessOrderingABC):
+    """Try plaintext byte values in ascending order."""
+
+    def rank_plaintext_bytes(self, block: PartiallyCrackedBlock) -> Sequence[int]:
+        return range(256)
+
+
+class PlaintextPriorGuessOrdering(GuessOrderingABC):
+    """
+    Try likely plaintext byte values first.
+
+    - in the final block, padding is guessed before anything else, since its structure is known:
+      e.g. under PKCS#7 the last byte is a padding length, and it fixes the value of that many trailing bytes
+    - otherwise, printable ASCII is guessed before anything else, weighted by English letter frequencies
+    - when a bigram dataset is supplied, the known byte *following* the unknown byte conditions the guess
+      (bytes are recovered back-to-front, so the following byte is always known once a block is under way)
+    """
+
+    uppercase_weight: float = 0.25
+    space_weight: float = 0.15
+    digit_weight: float = 0.01
+    punctuation_weight: float = 0.005
+    whitespace_weight: float = 0.002
+    unprintable_weight: float = 1e-6
+
+    def __init__(
+        self,
+        letter_frequencies: Mapping[str, float] = None,
+        bigram_frequencies: Mapping[str, int] = None,
+        *,
+        bigram_weight: float = 0.75,
+    ) -> None:
+        if letter_frequencies is None:
+            letter_frequencies = english_text_letter_frequencies
+
+        self.bigram_weight = bigram_weight
+        self._scores = self._compute_scores(letter_frequencies)
+        self._default_ranking = self._rank(self._scores)
+        self._bigram_rankings = {}
+        if bigram_frequencies is not None:
+            self._bigram_rankings = self._compute_bigram_rankings(bigram_frequencies)
+
+    @classmethod
+    async def with_bigrams(cls, **kwargs) -> Self:
+        """Construct an ordering which uses the (lowercase and space) English bigram dataset from `utils.data`."""
+        bigram_frequencies = await load_space_and_lowercase_bigrams_dataset()
+        return cls(bigram_frequencies=bigram_frequencies, **kwargs)
+
+    def _compute_scores(self, letter_frequencies: Mapping[str, float]) -> list[float]:
+        scores = [self.unprintable_weight] * 256
+        for value in range(128):
+            character = chr(value)
+            if character in string.ascii_lowercase:
+                scores[value] = letter_frequencies.get(character, 0)
+            elif character in string.ascii_uppercase:
+                scores[value] = letter_frequencies.get(character.lower(), 0) * self.uppercase_weight
+            elif character == " ":
+                scores[value] = self.space_weight
+            elif character in string.digits:
+                scores[value] = self.digit_weight
+            elif character in string.punctuation:
+                scores[value] = self.punctuation_weight
+            elif character in string.whitespace:
+                scores[value] = self.whitespace_weight
+
+        total = sum(scores)
+        return [score / total for score in scores]
+
+    def _compute_bigram_rankings(self, bigram_frequencies: Mapping[str, int]) -> dict[int, Sequence[int]]:
+        rankings = {}
+        for following_character in string.ascii_lowercase + " ":
+            column = {bigram[0]: frequency for bigram, frequency in bigram_frequencies.items() if bigram[1] == following_character}
+            column_total = sum(column.values())
+            if column_total == 0:
+                continue
+
+            scores = list(self._scores)
+            for value in range(128):
+                character = chr(value)
+                conditional_probability = column.get(character.lower(), 0) / column_total
+                if character in string.ascii_uppercase:
+                    conditional_probability *= self.uppercase_weight
+                scores[value] = (1 - self.bigram_weight) * scores[value] + self.bigram_weight * conditional_probability
+
+            ranking = self._rank(scores)
+            rankings[ord(following_character)] = ranking
+            if following_character in string.ascii_lowercase:
+                rankings[ord(following_character.upper())] = ranking
+        return rankings
+
+    @staticmethod
+    def _rank(scores: Sequence[float]) -> Sequence[int]:
+        return tuple(sorted(range(256), key=lambda value: scores[value], reverse=True))
+
+    @staticmethod
+    def _promote(ranking: Sequence[int], promoted: Sequence[int]) -> Sequence[int]:
+        promoted_set = set(promoted)
+        return (*promoted, *(value for value in ranking if value not in promoted_set))
+
+    def _padding_guesses(self, block: PartiallyCrackedBlock) -> Sequence[int]:
+        if not block.is_final_block or block.known_padding_length() is not None:
+            return ()
+        # the unknown byte is padding; guess the corresponding byte of each padding consistent with the known bytes
+        known_plaintext = block.known_plaintext[block.num_bytes_unknown:]
+        guesses = dict[int, None]()
+        for padding_length in range(block.num_bytes_known + 1, block.block_length + 1):
+            tail = block.padding_scheme.tail(padding_length)
+            if tail.endswith(known_plaintext):
+                guesses[tail[-block.num_bytes_known - 1]] = None
+        return tuple(guesses)
+
+    def _following_byte(self, block: PartiallyCrackedBlock) -> int | None:
+        if block.num_bytes_known == 0:
+            return None
+        if block.is_final_block:
+            padding_length = block.known_padding_length()
+            if padding_length is None or block.num_bytes_known <= padding_length:
+                return None  # the following byte is padding
+        return block.known_plaintext[block.num_bytes_unknown]
+
+    def rank_plaintext_bytes(self, block: PartiallyCrackedBlock) -> Sequence[int]:
+        ranking = self._bigram_rankings.get(self._following_byte(block), self._default_ranking)
+        padding_guesses = self._padding_guesses(block)
+        if padding_guesses:
+            ranking = self._promote(ranking, padding_guesses)
+        return ranking
+
+
+__all__ = ("GuessOrderingABC", "FlatGuessOrdering", "PlaintextPriorGuessOrdering",)
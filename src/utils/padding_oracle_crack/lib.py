@@ -0,0 +1,22 @@
+import asyncio
+from typing import Awaitable, Callable
+
+type PaddingOracle = Callable[[bytes, bytes], Awaitable[bool]]
+"""a padding oracle accepts an (IV, ciphertext) pair and reports whether its decryption is correctly padded"""
+
+
+class InsignificantResultException(Exception):
+    pass
+
+
+class ExhaustedGuessesException(Exception):
+    """No guessed byte value produced valid padding."""
+
+
+def is_significant(future: asyncio.Future) -> bool:
+    if future.cancelled(): return False
+    if isinstance(future.exception(), InsignificantResultException): return False
+    return True
+
+
+__all__ = ("PaddingOracle", "InsignificantResultException", "ExhaustedGuessesException", "is_significant",)
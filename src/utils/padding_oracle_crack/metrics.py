@@ -0,0 +1,167 @@
+import asyncio
+import random
+import time
+from statistics import quantiles
+from typing import Callable, NamedTuple
+
+from .lib import PaddingOracle
+
+
+class LatencyBucket(NamedTuple):
+    lower_bound: float
+    upper_bound: float
+    count: int
+
+
+class OracleMetrics:
+    """
+    Instrumentation of the queries made to a padding oracle.
+
+    Only queries which actually reach the oracle are counted; those dropped by a scheduler before being issued are not.
+    A query 'completes' when the oracle answers, is 'cancelled' when it is abandoned mid-flight (e.g. because another
+    guess won the race), and 'fails' when the oracle raises.
+
+    Memory and the cost of each report are bounded regardless of the number of queries: the in-flight count is
+    integrated as it changes, and latency statistics are taken over a uniform sample of completed queries.
+    """
+
+    sparkline_characters = u"▁▂▃▄▅▆▇█"
+    latency_sample_size = 4096
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock
+        self.started_at = clock()
+
+        self.completed_queries = 0
+        self.cancelled_queries = 0
+        self.failed_queries = 0
+        self.recovered_bytes = 0
+
+        self.latencies: list[float] = []
+        """
+        latency (in seconds) of completed queries: all of them up to `latency_sample_size`, and after that a uniform
+        sample of that size (by reservoir sampling)
+        """
+
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._in_flight_area = 0.0
+        """the integral over time of the number of queries in flight, up to `_in_flight_changed_at`"""
+        self._in_flight_changed_at = 0.0
+
+    @property
+    def total_queries(self) -> int:
+        return self.completed_queries + self.cancelled_queries + self.failed_queries + self.in_flight
+
+    @property
+    def queries_per_recovered_byte(self) -> float:
+        if self.recovered_bytes == 0:
+            return float("nan")
+        return self.total_queries / self.recovered_bytes
+
+    @property
+    def elapsed(self) -> float:
+        return self.clock() - self.started_at
+
+    def _set_in_flight(self, in_flight: int) -> None:
+        elapsed = self.elapsed
+        self._in_flight_area += self.in_flight * (elapsed - self._in_flight_changed_at)
+        self._in_flight_changed_at = elapsed
+        self.in_flight = in_flight
+        self.max_in_flight = max(self.max_in_flight, in_flight)
+
+    def _record_latency(self, latency: float) -> None:
+        """https://en.wikipedia.org/wiki/Reservoir_sampling#Simple:_Algorithm_R"""
+        if len(self.latencies) < self.latency_sample_size:
+            self.latencies.append(latency)
+            return
+        index = random.randrange(self.completed_queries)
+        if index < self.latency_sample_size:
+            self.latencies[index] = latency
+
+    def instrument(self, oracle: PaddingOracle) -> PaddingOracle:
+        """Return a padding oracle which records its queries to these metrics before forwarding them to `oracle`."""
+        async def instrumented_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            self._set_in_flight(self.in_flight + 1)
+            started_at = self.clock()
+            try:
+                result = await oracle(iv, ciphertext)
+            except asyncio.CancelledError:
+                self.cancelled_queries += 1
+                raise
+            except Exception:
+                self.failed_queries += 1
+                raise
+            else:
+                self.completed_queries += 1
+                self._record_latency(self.clock() - started_at)
+                return result
+            finally:
+                self._set_in_flight(self.in_flight - 1)
+
+        return instrumented_oracle
+
+    def record_recovered_byte(self) -> None:
+        self.recovered_bytes += 1
+
+    def latency_percentiles(self, *percentiles: int) -> dict[int, float]:
+        """
+        :return: a mapping of each requested percentile (default 50, 95, 99) to the corresponding query latency
+        :raise ValueError: if a percentile is outside 1-99
+        """
+        if not percentiles:
+            percentiles = (50, 95, 99)
+        if not all(1 <= percentile <= 99 for percentile in percentiles):
+            raise ValueError("percentiles must be between 1 and 99")
+        if len(self.latencies) == 0:
+            return {percentile: float("nan") for percentile in percentiles}
+        if len(self.latencies) == 1:
+            return {percentile: self.latencies[0] for percentile in percentiles}
+        cut_points = quantiles(self.latencies, n=100, method="inclusive")
+        return {percentile: cut_points[percentile - 1] for percentile in percentiles}
+
+    def mean_in_flight(self) -> float:
+        """The time-weighted average number of queries in flight."""
+        elapsed = self.elapsed
+        if elapsed <= 0:
+            return 0.0
+        return (self._in_flight_area + self.in_flight * (elapsed - self._in_flight_changed_at)) / elapsed
+
+    def latency_histogram(self, bucket_count: int = 10) -> list[LatencyBucket]:
+        """the (sampled) latencies, in `bucket_count` equal-width buckets from the least to the greatest"""
+        if len(self.latencies) == 0:
+            return []
+        lower_bound = min(self.latencies)
+        upper_bound = max(self.latencies)
+        bucket_width = (upper_bound - lower_bound) / bucket_count or 1.0
+        counts = [0] * bucket_count
+        for latency in self.latencies:
+            bucket_index = min(int((latency - lower_bound) / bucket_width), bucket_count - 1)
+            counts[bucket_index] += 1
+        return [
+            LatencyBucket(lower_bound + index * bucket_width, lower_bound + (index + 1) * bucket_width, count)
+            for index, count in enumerate(counts)
+        ]
+
+    def _render_histogram(self) -> str:
+        histogram = self.latency_histogram()
+        if not histogram:
+            return ""
+        tallest = max(bucket.count for bucket in histogram)
+        levels = len(self.sparkline_characters) - 1
+        return "".join(
+            self.sparkline_characters[round(levels * bucket.count / tallest)] if bucket.count else " "
+            for bucket in histogram
+        )
+
+    def render(self) -> str:
+        p50, p95, p99 = self.latency_percentiles(50, 95, 99).values()
+        return (
+            f"queries: {self.total_queries} ({self.queries_per_recovered_byte:.1f}/byte), "
+            f"completed: {self.completed_queries}, cancelled: {self.cancelled_queries}, failed: {self.failed_queries}; "
+            f"in flight: {self.in_flight} (mean {self.mean_in_flight():.1f}, max {self.max_in_flight}); "
+            f"latency p50/p95/p99: {p50 * 1000:.1f}/{p95 * 1000:.1f}/{p99 * 1000:.1f}ms [{self._render_histogram()}]"
+        )
+
+
+__all__ = ("LatencyBucket", "OracleMetrics",)
@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from typing import ClassVar
+
+
+class PaddingSchemeABC(ABC):
+    """
+    A block cipher padding scheme.
+
+    A message is padded with between 1 and `block_length` bytes, so that it becomes a whole number of blocks;
+    the padding of each length is fixed, so the padding oracle attack can 'spoof' it one byte at a time.
+    """
+
+    name: ClassVar[str]
+
+    @abstractmethod
+    def tail(self, padding_length: int) -> bytes:
+        """The padding appended to a message which is `padding_length` bytes short of a whole number of blocks."""
+        pass
+
+    @abstractmethod
+    def suffix_verdict(self, suffix: bytes, block_length: int) -> bool | None:
+        """
+        Decide whether a block ending with `suffix` is correctly padded, without knowing the bytes preceding `suffix`.
+
+        :return: whether the block is correctly padded, or `None` if that depends on the bytes preceding `suffix`
+        """
+        pass
+
+    def pad(self, plaintext: bytes, block_length: int) -> bytes:
+        padding_length = block_length - (len(plaintext) % block_length)
+        return plaintext + self.tail(padding_length)
+
+    def padding_length(self, padded_plaintext: bytes, block_length: int) -> int:
+        """
+        :raises ValueError: if `padded_plaintext` is not correctly padded
+        """
+        if len(padded_plaintext) == 0 or len(padded_plaintext) % block_length != 0:
+            raise ValueError("Padded plaintext should be a non-empty, whole number of blocks")
+        final_block = padded_plaintext[-block_length:]
+        for padding_length in range(1, block_length + 1):
+            if final_block.endswith(self.tail(padding_length)):
+                return padding_length
+        raise ValueError(f"Invalid {self.name} padding")
+
+    def unpad(self, padded_plaintext: bytes, block_length: int) -> bytes:
+        """
+        :raises ValueError: if `padded_plaintext` is not correctly padded
+        """
+        return padded_plaintext[:-self.padding_length(padded_plaintext, block_length)]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+
+class PKCS7Padding(PaddingSchemeABC):
+    """Each padding byte is the padding length, e.g. `... 03 03 03`."""
+
+    name = "PKCS#7"
+
+    def tail(self, padding_length: int) -> bytes:
+        return bytes((padding_length,)) * padding_length
+
+    def suffix_verdict(self, suffix: bytes, block_length: int) -> bool | None:
+        padding_length = suffix[-1]
+        if not 1 <= padding_length <= block_length:
+            return False
+        if any(byte != padding_length for byte in suffix[-padding_length:]):
+            return False
+        if padding_length > len(suffix):
+            return None
+        return True
+
+
+class ANSIX923Padding(PaddingSchemeABC):
+    """The last padding byte is the padding length, and the rest are zero, e.g. `... 00 00 03`."""
+
+    name = "ANSI X.923"
+
+    def tail(self, padding_length: int) -> bytes:
+        return bytes(padding_length - 1) + bytes((padding_length,))
+
+    def suffix_verdict(self, suffix: bytes, block_length: int) -> bool | None:
+        padding_length = suffix[-1]
+        if not 1 <= padding_length <= block_length:
+            return False
+        if any(suffix[-padding_length:-1]):
+            return False
+        if padding_length > len(suffix):
+            return None
+        return True
+
+
+class ISO7816Padding(PaddingSchemeABC):
+    """The first padding byte is `0x80`, and the rest are zero, e.g. `... 80 00 00`."""
+
+    name = "ISO/IEC 7816-4"
+
+    def tail(self, padding_length: int) -> bytes:
+        return b"\x80" + bytes(padding_length - 1)
+
+    def suffix_verdict(self, suffix: bytes, block_length: int) -> bool | None:
+        stripped_suffix = suffix.rstrip(b"\x00")
+        if len(stripped_suffix) == 0:
+            return False if len(suffix) >= block_length else None
+        return stripped_suffix[-1] == 0x80
+
+
+padding_schemes: tuple[PaddingSchemeABC, ...] = (PKCS7Padding(), ISO7816Padding(), ANSIX923Padding())
+"""The supported padding schemes, most commonly used first."""
+
+
+__all__ = ("PaddingSchemeABC", "PKCS7Padding", "ANSIX923Padding", "ISO7816Padding", "padding_schemes",)
@@ -0,0 +1,175 @@
+import asyncio
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Hashable
+
+from extras.asyncio_extras import raise_if_race_aborted
+from extras.random_extras.sysrandom import uniform
+
+from .lib import PaddingOracle
+
+
+class OracleSchedulerABC(ABC):
+    """
+    Decides when each padding oracle query is issued.
+
+    Queries are submitted on behalf of a 'lane' (for `PaddingOracleCracker`, the index of the block being cracked),
+    so that a scheduler may share capacity fairly between concurrent consumers.
+    """
+
+    @abstractmethod
+    async def submit(self, lane: Hashable, oracle: PaddingOracle, iv: bytes, ciphertext: bytes) -> bool:
+        pass
+
+    def bind(self, lane: Hashable, oracle: PaddingOracle) -> PaddingOracle:
+        """Return a padding oracle which submits each of its queries to this scheduler via `lane`."""
+        async def scheduled_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            return await self.submit(lane, oracle, iv, ciphertext)
+
+        return scheduled_oracle
+
+
+class UnboundedOracleScheduler(OracleSchedulerABC):
+    """Issue every query immediately."""
+
+    async def submit(self, lane: Hashable, oracle: PaddingOracle, iv: bytes, ciphertext: bytes) -> bool:
+        return await oracle(iv, ciphertext)
+
+
+class BoundedOracleScheduler(OracleSchedulerABC):
+    """
+    Limit the number of queries in flight at once, sharing the limit round-robin between lanes.
+
+    The limit adapts to the service's capacity using additive-increase/multiplicative-decrease
+    (https://en.wikipedia.org/wiki/Additive_increase/multiplicative_decrease):
+    each successful query raises the limit by roughly one per round-trip's worth of queries,
+    whereas each transient failure (e.g. a refused connection or a timeout) scales it down and is retried after an
+    exponential, jittered back-off delay.
+
+    Queries cancelled while waiting for capacity, or whose race (see `asyncio_extras.race_predicate`) has been
+    decided by the time capacity is available, are never issued.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 16,
+        *,
+        min_in_flight: int = 1,
+        decrease_factor: float = 0.5,
+        # includes TimeoutError and ConnectionError
+        transient_exceptions: tuple[type[BaseException], ...] = (OSError,),
+        max_attempts: int = 5,
+        backoff_base_delay: float = 0.1,
+        backoff_max_delay: float = 10.0,
+    ) -> None:
+        assert 1 <= min_in_flight <= max_in_flight
+        assert 0 < decrease_factor < 1
+        assert max_attempts >= 1
+
+        self.max_in_flight = max_in_flight
+        self.min_in_flight = min_in_flight
+        self.decrease_factor = decrease_factor
+        self.transient_exceptions = transient_exceptions
+        self.max_attempts = max_attempts
+        self.backoff_base_delay = backoff_base_delay
+        self.backoff_max_delay = backoff_max_delay
+
+        self._limit: float = max_in_flight
+        self._in_flight = 0
+        self._waiters: dict[Hashable, deque[asyncio.Future[None]]] = {}
+        self._lane_rotation: deque[Hashable] = deque()
+
+    @property
+    def limit(self) -> int:
+        """The number of queries which may currently be in flight at once."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _has_capacity(self) -> bool:
+        return self._in_flight < self.limit
+
+    def _next_waiter(self) -> asyncio.Future[None] | None:
+        while self._lane_rotation:
+            lane = self._lane_rotation.popleft()
+            lane_waiters = self._waiters[lane]
+            while lane_waiters:
+                waiter = lane_waiters.popleft()
+                if waiter.done():
+                    continue
+                if lane_waiters:
+                    self._lane_rotation.append(lane)
+                else:
+                    del self._waiters[lane]
+                return waiter
+            del self._waiters[lane]
+        return None
+
+    def _wake_waiters(self) -> None:
+        while self._has_capacity():
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    async def _acquire(self, lane: Hashable) -> None:
+        if self._has_capacity() and not self._lane_rotation:
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane_waiters = self._waiters.get(lane)
+        if lane_waiters is None:
+            lane_waiters = self._waiters[lane] = deque()
+            self._lane_rotation.append(lane)
+        lane_waiters.append(waiter)
+        self._wake_waiters()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # capacity was granted just before cancellation; hand it to someone else
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._wake_waiters()
+
+    def _on_success(self) -> None:
+        self._limit = min(self.max_in_flight, self._limit + 1 / self._limit)
+
+    def _on_congestion(self) -> None:
+        self._limit = max(self.min_in_flight, self._limit * self.decrease_factor)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        ceiling = min(self.backoff_max_delay, self.backoff_base_delay * pow(2, attempt))
+        return uniform(0, ceiling)  # 'full jitter'
+
+    async def submit(self, lane: Hashable, oracle: PaddingOracle, iv: bytes, ciphertext: bytes) -> bool:
+        attempt = 0
+        while True:
+            await self._acquire(lane)
+            try:
+                # the query may have been waiting for capacity for a while; don't send it if it's no longer needed
+                raise_if_race_aborted()
+                result = await oracle(iv, ciphertext)
+            except self.transient_exceptions:
+                self._on_congestion()
+                attempt += 1
+                if attempt >= self.max_attempts:
+                    raise
+            else:
+                self._on_success()
+                return result
+            finally:
+                self._release()
+
+            await asyncio.sleep(self._backoff_delay(attempt))
+
+
+__all__ = ("OracleSchedulerABC", "UnboundedOracleScheduler", "BoundedOracleScheduler",)
@@ -0,0 +1,163 @@
+import asyncio
+import math
+import time
+from statistics import fmean, stdev
+from typing import Awaitable, Callable, NamedTuple, Self
+
+from extras.asyncio_extras import raise_if_race_aborted
+
+type TimedPaddingRequest = Callable[[bytes, bytes], Awaitable[float]]
+"""a timed request sends an (IV, ciphertext) pair to the target, and reports how long (in seconds) it took to respond"""
+
+
+def timed(
+    request: Callable[[bytes, bytes], Awaitable[object]],
+    clock: Callable[[], float] = time.perf_counter,
+) -> TimedPaddingRequest:
+    """Turn a request whose response is indistinguishable either way into a timed request."""
+    async def timed_request(iv: bytes, ciphertext: bytes) -> float:
+        started_at = clock()
+        await request(iv, ciphertext)
+        return clock() - started_at
+
+    return timed_request
+
+
+class TimingCalibration(NamedTuple):
+    valid_mean: float
+    """mean response time (in seconds) to a correctly padded query"""
+    invalid_mean: float
+    """mean response time (in seconds) to an incorrectly padded query"""
+    standard_deviation: float
+    """pooled standard deviation of response times (in seconds)"""
+
+    @property
+    def separation(self) -> float:
+        """The difference in mean response times, in standard deviations; the larger, the fewer samples needed."""
+        return abs(self.valid_mean - self.invalid_mean) / self.standard_deviation
+
+
+class TimingPaddingOracle:
+    """
+    Adapt a timing side channel into an ordinary padding oracle.
+
+    The response times of correctly and incorrectly padded queries are first calibrated against a known-valid query
+    and a known-invalid one. Each query is then decided by Wald's sequential probability ratio test: the query is
+    repeated, accumulating the log-likelihood ratio of its response times under the 'valid' and 'invalid' (normal)
+    distributions, until the ratio crosses the threshold for either verdict. Clear-cut queries are decided after a
+    handful of samples, while ambiguous ones take as many as they need, up to `max_samples`.
+
+    Concurrent queries (e.g. the guesses raced by `step_crack`) are sampled concurrently, and a query stops sampling
+    as soon as its race has been decided.
+
+    :param false_valid_rate: the tolerated probability of deciding that an incorrectly padded query is valid
+    :param false_invalid_rate: the tolerated probability of deciding that a correctly padded query is invalid
+    :param samples_per_round: how many samples of a query to take concurrently between tests
+    :param outlier_deviations: samples are clamped to within this many standard deviations of the calibrated means,
+        so that a single network hiccup cannot decide a query
+    """
+
+    def __init__(
+        self,
+        timed_request: TimedPaddingRequest,
+        *,
+        false_valid_rate: float = 1e-4,
+        false_invalid_rate: float = 1e-3,
+        max_samples: int = 256,
+        samples_per_round: int = 1,
+        outlier_deviations: float = 3.0,
+    ) -> None:
+        assert 0 < false_valid_rate < 1 and 0 < false_invalid_rate < 1
+        assert max_samples >= 1 and samples_per_round >= 1
+        self.timed_request = timed_request
+        self.max_samples = max_samples
+        self.samples_per_round = samples_per_round
+        self.outlier_deviations = outlier_deviations
+
+        self._valid_threshold = math.log((1 - false_invalid_rate) / false_valid_rate)
+        self._invalid_threshold = math.log(false_invalid_rate / (1 - false_valid_rate))
+
+        self.calibration: TimingCalibration | None = None
+        self.decision_count = 0
+        self.sample_count = 0
+        """samples taken by queries (excluding calibration), including those abandoned before a decision"""
+
+    @classmethod
+    async def calibrated(
+        cls,
+        timed_request: TimedPaddingRequest,
+        iv: bytes,
+        ciphertext: bytes,
+        *,
+        calibration_samples: int = 32,
+        **kwargs,
+    ) -> Self:
+        oracle = cls(timed_request, **kwargs)
+        await oracle.calibrate(iv, ciphertext, calibration_samples)
+        return oracle
+
+    @property
+    def mean_samples_per_decision(self) -> float:
+        if self.decision_count == 0:
+            return float("nan")
+        return self.sample_count / self.decision_count
+
+    async def calibrate(self, iv: bytes, ciphertext: bytes, calibration_samples: int = 32) -> TimingCalibration:
+        """
+        Measure response times to the final block of a genuine (IV, ciphertext) pair, which is correctly padded,
+        and to the same block with its padding corrupted.
+        """
+        assert calibration_samples >= 2
+        block_length = len(iv)
+        token = bytes(iv) + bytes(ciphertext)
+        valid_query = token[-2 * block_length:-block_length], token[-block_length:]
+        corrupted_block = bytearray(valid_query[0])
+        # flipping every bit of the last byte of the preceding block invalidates padding under any supported scheme
+        corrupted_block[-1] ^= 0xff
+        invalid_query = bytes(corrupted_block), valid_query[1]
+
+        valid_samples = []
+        invalid_samples = []
+        # interleave the measurements, so that drift affects both equally
+        for _ in range(calibration_samples):
+            valid_samples.append(await self.timed_request(*valid_query))
+            invalid_samples.append(await self.timed_request(*invalid_query))
+
+        valid_mean = fmean(valid_samples)
+        invalid_mean = fmean(invalid_samples)
+        standard_deviation = math.sqrt((stdev(valid_samples) ** 2 + stdev(invalid_samples) ** 2) / 2)
+        if standard_deviation == 0 or valid_mean == invalid_mean:
+            raise ValueError("Response times do not distinguish correctly padded queries")
+
+        self.calibration = TimingCalibration(valid_mean, invalid_mean, standard_deviation)
+        return self.calibration
+
+    def _log_likelihood_ratio(self, sample: float) -> float:
+        valid_mean, invalid_mean, standard_deviation = self.calibration
+        lowest = min(valid_mean, invalid_mean) - self.outlier_deviations * standard_deviation
+        highest = max(valid_mean, invalid_mean) + self.outlier_deviations * standard_deviation
+        sample = min(max(sample, lowest), highest)
+        midpoint = (valid_mean + invalid_mean) / 2
+        return (valid_mean - invalid_mean) * (sample - midpoint) / standard_deviation ** 2
+
+    async def __call__(self, iv: bytes, ciphertext: bytes) -> bool:
+        if self.calibration is None:
+            raise Exception("Timing oracle has not been calibrated")
+
+        log_likelihood_ratio = 0.0
+        for sample_index in range(0, self.max_samples, self.samples_per_round):
+            # the race may have been decided while the previous round was in flight
+            raise_if_race_aborted()
+            round_size = min(self.samples_per_round, self.max_samples - sample_index)
+            samples = await asyncio.gather(*(self.timed_request(iv, ciphertext) for _ in range(round_size)))
+            self.sample_count += round_size
+            log_likelihood_ratio += sum(self._log_likelihood_ratio(sample) for sample in samples)
+            if log_likelihood_ratio >= self._valid_threshold or log_likelihood_ratio <= self._invalid_threshold:
+                break
+
+        self.decision_count += 1
+        # when out of samples, go with the likelier verdict
+        return log_likelihood_ratio > 0
+
+
+__all__ = ("TimedPaddingRequest", "timed", "TimingCalibration", "TimingPaddingOracle",)
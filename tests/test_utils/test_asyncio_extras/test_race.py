@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+from itertools import count
+
+from extras.asyncio_extras import current_abort_token, race, race_success, raise_if_race_aborted
+
+
+class RaceTests(unittest.IsolatedAsyncioTestCase):
+    async def test_waves_start_in_order(self):
+        started = []
+
+        async def contestant(index: int) -> int:
+            started.append(index)
+            await asyncio.sleep(0)
+            if index < 5:
+                raise ValueError(index)
+            return index
+
+        result = await race_success((contestant(index) for index in range(12)), wave_size=2)
+        self.assertEqual(result, 5)
+        # the third wave (4, 5) decides the race, so the fourth is never started
+        self.assertEqual(started, [0, 1, 2, 3, 4, 5])
+
+    async def test_abort_token(self):
+        tokens = []
+        aborted_before_cancellation = []
+
+        async def winner() -> str:
+            tokens.append(current_abort_token())
+            return "winner"
+
+        async def loser() -> str:
+            token = current_abort_token()
+            tokens.append(token)
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                aborted_before_cancellation.append(token.aborted)
+                raise
+            return "loser"
+
+        self.assertEqual(await race([loser(), winner()]), "winner")
+        self.assertIsNone(current_abort_token())
+        # both contestants share their race's token, which is set once the race is decided
+        self.assertEqual(len(tokens), 2)
+        self.assertIs(tokens[0], tokens[1])
+        self.assertTrue(tokens[0].aborted)
+        self.assertEqual(aborted_before_cancellation, [True])
+
+        with self.assertRaises(Exception):
+            tokens[0].raise_if_aborted()
+        # outside a race, there is nothing to abort
+        raise_if_race_aborted()
+
+    async def test_losers_are_cancelled(self):
+        losers = [asyncio.ensure_future(asyncio.Event().wait()) for _ in range(3)]
+
+        async def winner() -> int:
+            await asyncio.sleep(0)
+            return 1
+
+        self.assertEqual(await race([*losers, winner()]), 1)
+        self.assertTrue(all(loser.cancelled() for loser in losers))
+
+    async def test_empty(self):
+        with self.assertRaises(ValueError):
+            await race([])
+
+    async def test_endless_source(self):
+        made = 0
+
+        async def contestant(index: int) -> int:
+            await asyncio.sleep(0)
+            if index < 10:
+                raise ValueError(index)
+            return index
+
+        def contestants():
+            nonlocal made
+            for index in count():
+                made += 1
+                yield contestant(index)
+
+        result = await asyncio.wait_for(race_success(contestants(), wave_size=4), timeout=5)
+        self.assertEqual(result, 10)
+        # the winning wave is 8-11; nothing beyond it is made
+        self.assertEqual(made, 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import asyncio
+from secrets import token_urlsafe
+import unittest
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from utils.http_oracle import (
+    AiohttpTransport,
+    HttpOracle,
+    HttpOracleRequest,
+    PipelinedTransport,
+    json_classifier,
+    status_classifier,
+)
+from utils.padding_oracle_crack import PaddingOracleCracker
+from utils.simple_crypto import SimpleCrypto
+
+
+class HttpOracleTests(unittest.IsolatedAsyncioTestCase):
+    crypto: SimpleCrypto
+    server: TestServer
+
+    async def check_token(self, request: web.Request) -> web.Response:
+        self.connections.add(id(request.transport))
+        self.request_count += 1
+        if self.flaky and self.request_count % 3 == 0:
+            return web.json_response({"error": "try again later"}, status=503, headers={"Retry-After": "0"})
+
+        token = bytes.fromhex(request.match_info["token"])
+        try:
+            self.crypto.decrypt(token[:16], token[16:])
+        except (ValueError, AssertionError):
+            return web.json_response({"error": "invalid token"}, status=400)
+        return web.json_response({"error": "missing code"}, status=422)
+
+    async def echo(self, request: web.Request) -> web.Response:
+        self.connections.add(id(request.transport))
+        if request.match_info["text"] == "never":
+            await asyncio.Event().wait()
+        return web.Response(body=request.match_info["text"].encode("utf-8"))
+
+    async def asyncSetUp(self):
+        self.crypto = SimpleCrypto()
+        self.connections = set()
+        self.request_count = 0
+        self.flaky = False
+
+        app = web.Application()
+        app.router.add_post("/api/submit/{token}", self.check_token)
+        app.router.add_get("/api/echo/{text}", self.echo)
+        self.server = TestServer(app)
+        await self.server.start_server()
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.crypto = None
+
+    def request_factory(self, iv: bytes, ciphertext: bytes) -> HttpOracleRequest:
+        return HttpOracleRequest("POST", self.server.make_url(f"/api/submit/{(iv + ciphertext).hex()}"))
+
+    async def crack(self, oracle: HttpOracle) -> None:
+        message = token_urlsafe(24)
+        iv, ciphertext = self.crypto.encrypt(message.encode("utf-8"))
+        async with oracle:
+            cracker = PaddingOracleCracker(iv, ciphertext, oracle, render_progress=False)
+            round_trip_plaintext = await cracker.crack_plaintext()
+        self.assertEqual(message, round_trip_plaintext.decode("utf-8"))
+
+    async def test_crack_over_connection_pool(self):
+        oracle = HttpOracle(
+            self.request_factory,
+            status_classifier({422}),
+            transport=AiohttpTransport(max_connections=4),
+        )
+        await self.crack(oracle)
+        self.assertLessEqual(len(self.connections), 4)
+
+    async def test_crack_over_pipelined_connections(self):
+        oracle = HttpOracle.pipelined(
+            self.request_factory,
+            json_classifier(lambda body: body["error"] == "missing code"),
+            max_connections=2,
+            pipeline_depth=8,
+        )
+        await self.crack(oracle)
+        self.assertLessEqual(len(self.connections), 2)
+
+    async def test_requests_are_pipelined(self):
+        transport = PipelinedTransport(2, pipeline_depth=8)
+        oracle = HttpOracle(
+            self.request_factory,
+            json_classifier(lambda body: body["error"] == "missing code"),
+            transport=transport,
+        )
+        await self.crack(oracle)
+        self.assertLessEqual(len(self.connections), 2)
+        # several requests went out on one connection before the first of their responses came back
+        self.assertGreater(transport.max_in_flight, 1)
+        self.assertLessEqual(transport.max_in_flight, 8)
+
+    async def test_timed_out_connection_is_retired(self):
+        transport = PipelinedTransport(1, pipeline_depth=8)
+        try:
+            # the first request is never answered, so anything pipelined behind it on the same connection would stall
+            with self.assertRaises(TimeoutError):
+                async with asyncio.timeout(0.1):
+                    await transport.send(HttpOracleRequest("GET", self.server.make_url("/api/echo/never")))
+            async with asyncio.timeout(5):
+                response = await transport.send(HttpOracleRequest("GET", self.server.make_url("/api/echo/hello")))
+        finally:
+            await transport.close()
+        self.assertEqual(response.body, b"hello")
+        self.assertEqual(len(self.connections), 2)
+
+    async def test_retry_transient_responses(self):
+        self.flaky = True
+        oracle = HttpOracle(self.request_factory, status_classifier({422}), backoff_base_delay=0.001)
+        iv, ciphertext = self.crypto.encrypt(b"attack at dawn")
+        async with oracle:
+            for _ in range(3):
+                self.assertTrue(await oracle(iv, ciphertext))
+                # flipping the last bit of the IV turns the 0x02 0x02 padding of the single block into 0x02 0x03
+                self.assertFalse(await oracle(iv[:-1] + bytes((iv[-1] ^ 1,)), ciphertext))
+        self.assertGreater(oracle.retry_count, 0)
+        self.assertEqual(oracle.request_count, self.request_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
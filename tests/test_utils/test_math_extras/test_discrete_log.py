@@ -0,0 +1,127 @@
+import unittest
+from pathlib import Path
+from random import randrange
+from tempfile import TemporaryDirectory
+
+from extras.math_extras.discrete_log.lib import Group
+from extras.math_extras.discrete_log.parallel_pollards_rho import parallel_pollard_rho_discrete_log
+from extras.math_extras.discrete_log.pohlig_hellman import factorise_group_order, pohlig_hellman_discrete_log
+from extras.math_extras.discrete_log.shanks import shanks_discrete_log
+from extras.math_extras.discrete_log.solver import DiscreteLogSolver
+from toy_cryptography.dsa.params import DSAParams
+
+# g = 2^30 generates the subgroup of prime order q = 2147483659 of (Z/pZ)*, for p = 30 q + 1
+prime_order_group = Group(modulus=64424509771, generator=1073741824, order=2147483659)
+
+
+class ParallelPollardRhoTests(unittest.TestCase):
+    def test_in_process(self) -> None:
+        for k in [0, 1, prime_order_group.order - 1, randrange(prime_order_group.order)]:
+            group_element = pow(prime_order_group.generator, k, mod=prime_order_group.modulus)
+            self.assertEqual(parallel_pollard_rho_discrete_log(prime_order_group, group_element, max_workers=1), k)
+
+    def test_process_pool(self) -> None:
+        k = randrange(prime_order_group.order)
+        group_element = pow(prime_order_group.generator, k, mod=prime_order_group.modulus)
+        self.assertEqual(parallel_pollard_rho_discrete_log(prime_order_group, group_element, max_workers=2), k)
+
+    def test_no_solution(self) -> None:
+        # 2 is not a 30th power modulo p, so is not in the subgroup generated by g
+        self.assertNotEqual(pow(2, prime_order_group.order, mod=prime_order_group.modulus), 1)
+        for max_workers in (1, 2):
+            with self.subTest(max_workers=max_workers), self.assertRaises(Exception):
+                parallel_pollard_rho_discrete_log(prime_order_group, 2, max_workers=max_workers)
+
+
+class PohligHellmanTests(unittest.TestCase):
+    # p - 1 = 2 q1 q2 for 41-bit primes q1, q2, and 5 is a primitive root
+    two_large_factors_group = Group(modulus=2417851640636633232984383, generator=5, order=2417851640636633232984382)
+    two_large_factors = {2: 1, 1099511627791: 1, 1099511628401: 1}
+
+    def test_subgroup_order(self) -> None:
+        for k in [0, 1, prime_order_group.order - 1, randrange(prime_order_group.order)]:
+            group_element = pow(prime_order_group.generator, k, mod=prime_order_group.modulus)
+            self.assertEqual(pohlig_hellman_discrete_log(prime_order_group, group_element), k)
+
+    def test_dsa_subgroup(self) -> None:
+        params = DSAParams(p=prime_order_group.modulus, q=prime_order_group.order, g=prime_order_group.generator)
+        group = Group.from_dsaparams(params)
+        k = randrange(params.q)
+        self.assertEqual(pohlig_hellman_discrete_log(group, pow(params.g, k, mod=params.p)), k)
+
+    def test_factorisation_cache(self) -> None:
+        order = prime_order_group.modulus - 1
+        self.assertIs(factorise_group_order(order), factorise_group_order(order))
+        self.assertEqual(factorise_group_order(order), ((2, 1), (3, 1), (5, 1), (2147483659, 1)))
+
+    def test_process_pool(self) -> None:
+        group = self.two_large_factors_group
+        k = randrange(group.order)
+        group_element = pow(group.generator, k, mod=group.modulus)
+        for max_workers in [1, 2]:
+            self.assertEqual(
+                pohlig_hellman_discrete_log(group, group_element, self.two_large_factors, max_workers=max_workers), k
+            )
+
+
+class ShanksTests(unittest.TestCase):
+    def test_shanks(self) -> None:
+        for k in [0, 1, prime_order_group.order - 1, randrange(prime_order_group.order)]:
+            group_element = pow(prime_order_group.generator, k, mod=prime_order_group.modulus)
+            self.assertEqual(shanks_discrete_log(prime_order_group, group_element), k)
+
+    def test_memory_budget(self) -> None:
+        k = randrange(prime_order_group.order)
+        group_element = pow(prime_order_group.generator, k, mod=prime_order_group.modulus)
+        self.assertEqual(shanks_discrete_log(prime_order_group, group_element, memory_budget=1 << 18), k)
+
+    def test_large_modulus(self) -> None:
+        # keys are truncated to 64 bits, and the steps computed with Python ints
+        modulus = 2**127 - 1
+        order = 77158673929  # a prime factor of 2^127 - 2
+        group = Group(modulus, pow(3, (modulus - 1) // order, mod=modulus), order)
+        k = randrange(order)
+        self.assertEqual(shanks_discrete_log(group, pow(group.generator, k, mod=modulus)), k)
+
+
+class DiscreteLogSolverTests(unittest.TestCase):
+    def test_shanks(self) -> None:
+        solver = DiscreteLogSolver(prime_order_group, query_count=16)
+        for k in [0, 1, prime_order_group.order - 1] + [randrange(prime_order_group.order) for _ in range(13)]:
+            group_element = pow(prime_order_group.generator, k, mod=prime_order_group.modulus)
+            self.assertEqual(solver.shanks_log(group_element), k)
+
+    def test_rho(self) -> None:
+        solver = DiscreteLogSolver(prime_order_group)
+        solver.precompute_distinguished_points(1 << 14)
+        for _ in range(8):
+            k = randrange(prime_order_group.order)
+            distinguished_point_count = solver.distinguished_point_count
+            self.assertEqual(solver.rho_log(pow(prime_order_group.generator, k, mod=prime_order_group.modulus)), k)
+            self.assertGreaterEqual(solver.distinguished_point_count, distinguished_point_count)
+
+    def test_rho_no_solution(self) -> None:
+        # 2 is not in the subgroup generated by g
+        with self.assertRaises(Exception):
+            DiscreteLogSolver(prime_order_group).rho_log(2)
+
+    def test_save_and_load(self) -> None:
+        solver = DiscreteLogSolver(prime_order_group, query_count=4)
+        solver.rho_log(pow(prime_order_group.generator, 12345, mod=prime_order_group.modulus))
+        solver.baby_steps
+        with TemporaryDirectory() as dirname:
+            path = Path(dirname, "solver.npz")
+            solver.save(path)
+            loaded = DiscreteLogSolver.load(path)
+        self.assertEqual(loaded.group, prime_order_group)
+        self.assertEqual(loaded.distinguished_point_count, solver.distinguished_point_count)
+        self.assertEqual(loaded.baby_steps.length, solver.baby_steps.length)
+        for _ in range(4):
+            k = randrange(prime_order_group.order)
+            group_element = pow(prime_order_group.generator, k, mod=prime_order_group.modulus)
+            self.assertEqual(loaded.shanks_log(group_element), k)
+            self.assertEqual(loaded.rho_log(group_element), k)
+
+
+if __name__ == "__main__":
+    unittest.main()
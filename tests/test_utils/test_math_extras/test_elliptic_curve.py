@@ -0,0 +1,247 @@
+import unittest
+from random import randrange
+
+from gmpy2 import mpz
+
+from extras.math_extras.elliptic_curve import *
+
+p256 = Curve(
+    p=0xffffffff00000001000000000000000000000000ffffffffffffffffffffffff,
+    a=-3,
+    b=0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b,
+)
+p256_g = AffinePoint(
+    0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+    0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5,
+)
+p256_n = 0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551
+
+q13_curve = Curve(p=16001, a=1, b=5)
+q13_g = AffinePoint(1300, 16000)
+q13_n = 16190  # 2 * 5 * 1619
+
+prime_order_curve = Curve(p=170285879, a=71492564, b=61407891)
+prime_order_g = AffinePoint(8211437, 85284954)
+prime_order_n = 170275741
+
+curve25519_p = 2**255 - 19
+ed25519 = TwistedEdwardsCurve(
+    p=curve25519_p,
+    a=curve25519_p - 1,
+    d=(-121665 * pow(121666, -1, curve25519_p)) % curve25519_p,
+)
+ed25519_g = AffinePoint(
+    15112221349535400772501151409588531511454012693041857206046113283949847762202,
+    46316835694926478169428394003475163141307993866256225615783033603165251855960,
+)
+ed25519_n = 2**252 + 27742317777372353535851937790883648493
+curve25519 = MontgomeryCurve(p=curve25519_p, a=486662, b=1)
+
+
+def double_and_add(curve: Curve, k: int, p: JacobianPointABC) -> JacobianPointABC:
+    accumulator = JacobianPoint(1, 1, 0)
+    for bit in bin(k)[2:]:
+        accumulator = curve.double_jacobian_point(accumulator)
+        if bit == "1":
+            accumulator = curve.add_jacobian_points(accumulator, p)
+    return accumulator
+
+
+class ScalarMultiplicationTests(unittest.TestCase):
+    def test_digits(self) -> None:
+        for width in range(2, 7):
+            for k in range(1000):
+                digits = wnaf_digits(k, width)
+                self.assertEqual(sum(digit << i for i, digit in enumerate(digits)), k)
+                for i, digit in enumerate(digits):
+                    if digit:
+                        self.assertEqual(digit % 2, 1)
+                        self.assertLess(abs(digit), 1 << (width - 1))
+                        self.assertFalse(any(digits[i + 1:i + width]))
+
+                accumulator = 0
+                for shift, value in sliding_window_digits(k, width):
+                    self.assertLess(value, 1 << width)
+                    accumulator = (accumulator << shift) + value
+                self.assertEqual(accumulator, k)
+
+    def test_small_curve_exhaustively(self) -> None:
+        curve = Curve(p=97, a=2, b=3)
+        for g in curve.all_affine_points_by_exhaustion():
+            g_jacobian = curve.to_jacobian(g)
+            comb = FixedBaseComb(curve, g, teeth=3)
+            for k in range(200):
+                expected = curve.to_affine(double_and_add(curve, k, g_jacobian))
+                self.assertEqual(curve.to_affine(curve.scalar_mul_jacobian_point(k, g_jacobian)), expected)
+                self.assertEqual(
+                    curve.to_affine(curve.scalar_mul_jacobian_point_sliding_window(k, g_jacobian, 3)),
+                    expected,
+                )
+                self.assertEqual(comb.mul_affine(k), expected)
+
+    def test_p256(self) -> None:
+        g_jacobian = p256.to_jacobian(p256_g)
+        comb = FixedBaseComb(p256, p256_g)
+        for k in [1, 2, p256_n - 1, p256_n + 1, 1 << 300] + [randrange(p256_n) for _ in range(5)]:
+            expected = p256.to_affine(double_and_add(p256, k, g_jacobian))
+            self.assertEqual(p256.scalar_mul_affine_point(k, p256_g), expected)
+            self.assertEqual(p256.to_affine(p256.scalar_mul_jacobian_point_sliding_window(k, g_jacobian)), expected)
+            self.assertEqual(comb.mul_affine(k), expected)
+        self.assertTrue(p256.scalar_mul_affine_point(p256_n, p256_g).is_at_infinity())
+        self.assertTrue(comb.mul(p256_n).is_at_infinity())
+
+    def test_batch_operations(self) -> None:
+        g_jacobian = p256.to_jacobian(p256_g)
+        multiples = p256.multiples_of_affine_point(p256_g, 20)
+        for k, multiple in enumerate(multiples, start=1):
+            self.assertEqual(multiple, p256.to_affine(double_and_add(p256, k, g_jacobian)))
+
+        jacobians = [double_and_add(p256, k, g_jacobian) for k in (3, 0, 7)]
+        self.assertEqual(p256.to_affine_batch(jacobians), [p256.to_affine(point) for point in jacobians])
+        for point, unit_z_point in zip(jacobians, p256.unit_z_jacobian_points(jacobians)):
+            self.assertTrue(p256.eq_jacobian_points(point, unit_z_point))
+
+        pairs = [(randrange(p256_n), point) for point in multiples[:3] for _ in range(3)]
+        pairs += [(0, p256_g), (5, AffinePointAtInfinity), (p256_n, p256_g)]
+        self.assertEqual(p256.scalar_mul_affine_points(pairs), [p256.scalar_mul_affine_point(k, p) for k, p in pairs])
+
+    def test_eq_jacobian_points(self) -> None:
+        g_jacobian = p256.to_jacobian(p256_g)
+        g_scaled = p256.scale_z_jacobian_point(12345, g_jacobian)
+        self.assertTrue(p256.eq_jacobian_points(g_jacobian, g_scaled))
+        self.assertFalse(p256.eq_jacobian_points(p256.negate_jacobian_point(g_jacobian), g_scaled))
+
+    def test_raw_core(self) -> None:
+        g_jacobian = p256.scale_z_jacobian_point(12345, p256.to_jacobian(p256_g))
+        h_jacobian = p256.double_jacobian_point(g_jacobian)
+        for element_type in (int, mpz):
+            with self.subTest(element_type=element_type.__name__):
+                p, a = element_type(p256.p), element_type(p256.a)
+                g_raw = to_raw_jacobian(g_jacobian)
+                h_raw = tuple(map(element_type, (h_jacobian.x, h_jacobian.y, h_jacobian.z)))
+                self.assertEqual(from_raw_jacobian(raw_double(g_raw, p, a)), h_jacobian)
+                self.assertEqual(
+                    from_raw_jacobian(raw_add(g_raw, h_raw, p, a)),
+                    p256.add_jacobian_points(g_jacobian, h_jacobian),
+                )
+                self.assertEqual(raw_add(g_raw, raw_negate(g_raw, p), p, a)[2], 0)
+                k = randrange(p256_n)
+                self.assertEqual(
+                    from_raw_affine(raw_to_affine(raw_scalar_mul(k, h_raw, p, a), p)),
+                    p256.to_affine(double_and_add(p256, 2 * k, g_jacobian)),
+                )
+
+
+class DiscreteLogTests(unittest.TestCase):
+    def test_prime_order(self) -> None:
+        for solver in (shanks_elliptic_discrete_log, pollard_rho_elliptic_discrete_log):
+            with self.subTest(solver=solver.__name__):
+                for k in [0, 1, prime_order_n - 1, randrange(prime_order_n)]:
+                    point = prime_order_curve.scalar_mul_affine_point(k, prime_order_g)
+                    self.assertEqual(solver(prime_order_curve, prime_order_g, point, prime_order_n), k)
+
+    def test_pohlig_hellman(self) -> None:
+        for k in [0, 1, 1619, q13_n - 1] + [randrange(q13_n) for _ in range(10)]:
+            point = q13_curve.scalar_mul_affine_point(k, q13_g)
+            self.assertEqual(pohlig_hellman_elliptic_discrete_log(q13_curve, q13_g, point, q13_n), k)
+
+    def test_point_outside_subgroup(self) -> None:
+        subgroup_base = q13_curve.scalar_mul_affine_point(1619, q13_g)
+        with self.assertRaises(Exception):
+            pohlig_hellman_elliptic_discrete_log(q13_curve, subgroup_base, q13_g, 10)
+
+
+class CurveOrderTests(unittest.TestCase):
+    small_curves = [Curve(p=1009, a=a, b=b) for a, b in [(1, 5), (2, 3), (0, 7), (11, 0), (500, 600)]]
+
+    def test_trace_of_frobenius(self) -> None:
+        for curve in self.small_curves:
+            trace = curve.p + 1 - legendre_curve_order(curve)
+            division_polynomials = DivisionPolynomials(curve)
+            for prime in (2, 3, 5, 7):
+                with self.subTest(curve=curve, prime=prime):
+                    self.assertEqual(
+                        trace_of_frobenius_modulo(curve, prime, division_polynomials),
+                        trace % prime,
+                    )
+
+    def test_bsgs(self) -> None:
+        for curve in self.small_curves:
+            order = legendre_curve_order(curve)
+            with self.subTest(curve=curve):
+                self.assertEqual(bsgs_curve_order(curve), order)
+                self.assertEqual(bsgs_curve_order(curve, (curve.p + 1 - order) % 6, 6), order)
+
+    def test_curve_order(self) -> None:
+        order = curve_order(prime_order_curve)
+        self.assertEqual(order.order, prime_order_n)
+        self.assertEqual(order.cofactor, 1)
+        self.assertEqual(point_order(prime_order_curve, prime_order_g), prime_order_n)
+        self.assertEqual(point_order(q13_curve, q13_g), q13_n)
+        self.assertFalse(is_anomalous(prime_order_curve))
+        self.assertFalse(is_mov_vulnerable(prime_order_curve))
+
+    def test_supersingular(self) -> None:
+        # y^2 = x^3 + x is supersingular when p = 3 (mod 4), with p + 1 points and embedding degree 2
+        curve = Curve(p=170285879, a=1, b=0)
+        self.assertEqual(curve_order(curve).order, curve.p + 1)
+        self.assertEqual(embedding_degree(curve), 2)
+        self.assertTrue(is_mov_vulnerable(curve))
+
+
+class CurveModelTests(unittest.TestCase):
+    def test_montgomery_ladder(self) -> None:
+        # https://www.rfc-editor.org/rfc/rfc7748#section-5.2
+        scalar = bytearray.fromhex("a546e36bf0527c9d3b16154b82465edd62144c0ac1fc5a18506a2244ba449ac4")
+        scalar[0] &= 248
+        scalar[31] &= 127
+        scalar[31] |= 64
+        u = int.from_bytes(bytes.fromhex("e6db6867583030db3594c1a424b15f7c726624ec26b3353b10a903a6d0ab1c4c"), "little")
+        result = curve25519.scalar_mul_x_coordinate(int.from_bytes(scalar, "little"), u & ((1 << 255) - 1))
+        self.assertEqual(
+            result.to_bytes(32, "little").hex(),
+            "c3da55379de9c6908e94ea4df28d084f32eccf03491c71f754b4075577a28552",
+        )
+        self.assertIsNone(curve25519.scalar_mul_x_coordinate(ed25519_n, 9))
+
+    def test_edwards(self) -> None:
+        self.assertTrue(ed25519.is_affine_point_on_curve(ed25519_g))
+        self.assertEqual(ed25519.scalar_mul_affine_point(ed25519_n, ed25519_g), ed25519.identity)
+        k = randrange(ed25519_n)
+        self.assertEqual(
+            ed25519.add_affine_points(ed25519.scalar_mul_affine_point(k, ed25519_g), ed25519_g),
+            ed25519.scalar_mul_affine_point(k + 1, ed25519_g),
+        )
+
+    def test_birational_maps(self) -> None:
+        montgomery = ed25519.to_montgomery()
+        weierstrass = ed25519.to_weierstrass()
+        self.assertEqual(MontgomeryCurve.from_weierstrass(weierstrass).to_weierstrass(), weierstrass)
+        self.assertEqual(TwistedEdwardsCurve.from_montgomery(montgomery), ed25519)
+        self.assertEqual(MontgomeryCurve.from_weierstrass(curve25519.to_weierstrass()), curve25519)
+
+        montgomery_g = ed25519.to_montgomery_point(ed25519_g)
+        weierstrass_g = ed25519.to_weierstrass_point(ed25519_g)
+        self.assertTrue(montgomery.is_affine_point_on_curve(montgomery_g))
+        self.assertTrue(weierstrass.is_affine_point_on_curve(weierstrass_g))
+        self.assertEqual(ed25519.from_weierstrass_point(weierstrass_g), ed25519_g)
+        for k in [0, 1, 2, randrange(ed25519_n), ed25519_n - 1]:
+            with self.subTest(k=k):
+                edwards_product = ed25519.scalar_mul_affine_point(k, ed25519_g)
+                montgomery_product = montgomery.scalar_mul_affine_point(k, montgomery_g)
+                self.assertEqual(ed25519.to_montgomery_point(edwards_product), montgomery_product)
+                self.assertEqual(
+                    montgomery.to_weierstrass_point(montgomery_product),
+                    weierstrass.scalar_mul_affine_point(k, weierstrass_g),
+                )
+                self.assertEqual(
+                    montgomery.add_affine_points(montgomery_product, montgomery_g),
+                    montgomery.scalar_mul_affine_point(k + 1, montgomery_g),
+                )
+
+        with self.assertRaises(ValueError):
+            MontgomeryCurve.from_weierstrass(Curve(p=1009, a=0, b=7))  # x^3 + 7 has no roots
+
+
+if __name__ == "__main__":
+    unittest.main()
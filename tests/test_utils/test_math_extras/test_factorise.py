@@ -0,0 +1,106 @@
+import unittest
+from contextlib import ExitStack
+from math import prod
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from extras.math_extras import prime_table
+from extras.math_extras.factorise import prime_factorise
+from extras.math_extras.factorise.ecm import ECMFailure, ecm_factorise, ecm_factorise_with_curve
+from extras.math_extras.factorise.hybrid import StageTimeBudgets
+from extras.math_extras.factorise.lib import perfect_power
+from extras.math_extras.factorise.pollards_p_minus_1 import PollardPMinus1Failure, pollards_p_minus_1_factorise
+from extras.math_extras.factorise.pollards_rho import default_pollard_rho_factoriser
+from extras.math_extras.factorise.siqs import siqs_factorise
+from extras.math_extras.factorise.trial_division_prime import trial_division_prime_factorise
+from extras.math_extras.factorise.williams_p_plus_1 import williams_p_plus_1_factorise
+
+# p + 1 = 2 * 12 distinct primes below 5000, so p is found by p + 1 (but not p - 1) with smoothness bound 5000
+p_plus_1_smooth_prime = 154421942682680493311194283027521506231937
+prime_40_digits = 10**40 + 121
+prime_20_digits = 10**20 + 39
+prime_21_digits = 3 * 10**20 + 53
+
+_module_context = ExitStack()
+
+
+def setUpModule() -> None:
+    # Pollard p - 1 and Williams p + 1 read the default prime table; keep the one they make out of the project cache
+    dirname = _module_context.enter_context(TemporaryDirectory())
+    _module_context.enter_context(mock.patch.object(prime_table, "prime_tables_dirname", Path(dirname)))
+    prime_table.default_prime_table.cache_clear()
+    _module_context.callback(prime_table.default_prime_table.cache_clear)
+
+
+def tearDownModule() -> None:
+    _module_context.close()
+
+
+class StageTests(unittest.TestCase):
+    def test_pollards_rho(self) -> None:
+        # small values, whose factors are typically all found within one batch, so that the batch must be replayed
+        for p, q in ((3, 5), (7, 11), (71, 101), (1009, 65537)):
+            with self.subTest(value=p * q):
+                self.assertIn(default_pollard_rho_factoriser(p * q), (p, q))
+        factor = default_pollard_rho_factoriser(1_000_000_007 * 4_294_967_311)
+        self.assertIn(factor, (1_000_000_007, 4_294_967_311))
+
+    def test_trial_division(self) -> None:
+        # 131101 is beyond the prime table, so is found on the wheel
+        for factorisation in ({2: 3, 3: 2, 99991: 1}, {131101: 2, 1000003: 1}, {3: 2, 1_000_000_007: 1}):
+            n = prod(pow(p, e) for p, e in factorisation.items())
+            for vectorised in (True, False):
+                with self.subTest(n=n, vectorised=vectorised):
+                    self.assertEqual(trial_division_prime_factorise(n, vectorised), factorisation)
+
+    def test_pollards_p_minus_1(self) -> None:
+        self.assertIn(pollards_p_minus_1_factorise(15770708441, 173), (135979, 115979))
+        with self.assertRaises(PollardPMinus1Failure):
+            pollards_p_minus_1_factorise(p_plus_1_smooth_prime * prime_40_digits, 5000)
+
+    def test_williams_p_plus_1(self) -> None:
+        factor = williams_p_plus_1_factorise(p_plus_1_smooth_prime * prime_40_digits, 5000)
+        self.assertEqual(factor, p_plus_1_smooth_prime)
+
+    def test_ecm(self) -> None:
+        factor = ecm_factorise(1_000_000_000_039 * prime_40_digits)
+        self.assertEqual(factor, 1_000_000_000_039)
+
+    def test_ecm_stage_2(self) -> None:
+        # with B1 this small the giant steps start from 1 * D; this curve's order modulo the factor has one prime in
+        # (B1, B2], so only stage 2 finds it
+        value, sigma = 1_000_000_000_039 * prime_40_digits, 28
+        with self.assertRaises(ECMFailure):
+            ecm_factorise_with_curve(value, 300, 300, sigma)
+        self.assertEqual(ecm_factorise_with_curve(value, 300, 20_000, sigma), 1_000_000_000_039)
+
+    def test_siqs(self) -> None:
+        factor = siqs_factorise(prime_20_digits * prime_21_digits, seed=1)
+        self.assertIn(factor, (prime_20_digits, prime_21_digits))
+
+    def test_perfect_power(self) -> None:
+        self.assertEqual(perfect_power(prime_20_digits ** 3), (prime_20_digits, 3))
+        self.assertEqual(perfect_power(prime_20_digits * prime_21_digits), (prime_20_digits * prime_21_digits, 1))
+
+
+class PrimeFactoriseTests(unittest.TestCase):
+    def check(self, factorisation: dict[int, int], **kwargs) -> None:
+        self.assertEqual(prime_factorise(prod(pow(p, e) for p, e in factorisation.items()), **kwargs), factorisation)
+
+    def test_small(self) -> None:
+        self.check({2: 10, 3: 5, 65537: 2, 1000003: 1})
+        self.check({9_999_999_967: 1})
+
+    def test_prime_power(self) -> None:
+        self.check({3: 1, prime_20_digits: 3})
+
+    def test_weak_factor(self) -> None:
+        self.check({p_plus_1_smooth_prime: 1, prime_40_digits: 1})
+
+    def test_quadratic_sieve(self) -> None:
+        self.check({prime_20_digits: 1, prime_21_digits: 1}, time_budgets=StageTimeBudgets(0.1, 0.1, 0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
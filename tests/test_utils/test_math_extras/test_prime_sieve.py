@@ -0,0 +1,55 @@
+import unittest
+from itertools import islice
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+
+from extras.math_extras.primality import miller_rabin_primality_test
+from extras.math_extras.prime_sieve import *
+from extras.math_extras.prime_table import *
+
+
+class PrimeSieveTests(unittest.TestCase):
+    def test_primes_less_than(self) -> None:
+        self.assertEqual(sieve_primes_less_than(30), [2, 3, 5, 7, 11, 13, 17, 19, 23, 29])
+        self.assertEqual(len(primes_less_than(10**6)), 78498)
+        for bound in (0, 1, 2, 3):
+            with self.subTest(bound=bound):
+                self.assertEqual(sieve_primes_less_than(bound), [2] if bound == 3 else [])
+
+    def test_window_boundaries(self) -> None:
+        # spans several windows, so primes either side of each boundary must survive
+        primes = primes_less_than(5 * sieve_window_length)
+        self.assertEqual(len(primes), 100_786)
+        self.assertTrue(all(miller_rabin_primality_test(int(prime)) for prime in primes[-100:]))
+
+    def test_iterate_primes(self) -> None:
+        self.assertEqual(list(iterate_primes(120, 100)), [101, 103, 107, 109, 113])
+        # streaming from 10^10 only sieves the windows asked for
+        self.assertEqual(list(islice(iterate_primes(10**11, 10**10), 3)), [10**10 + 19, 10**10 + 33, 10**10 + 61])
+
+
+class PrimeTableTests(unittest.TestCase):
+    def test_queries(self) -> None:
+        with TemporaryDirectory() as dirname:
+            table = PrimeTable.open(10**6, Path(dirname))
+            self.assertIsInstance(table.primes, np.memmap)
+            self.assertEqual(len(table), 78498)
+            self.assertEqual((table[0], table[9], table[-1]), (2, 29, 999983))
+            self.assertEqual(table.count_less_than(29), 9)
+            self.assertEqual(table.count_less_than(30), 10)
+            self.assertEqual(table.next_prime_after(29), 31)
+            self.assertEqual(table.next_prime_after(1000), 1009)
+            self.assertEqual(table.primes_less_than(30).tolist(), sieve_primes_less_than(30))
+            self.assertEqual(len(table.primes_less_than(2 * 10**6)), 148933)
+            with self.assertRaises(ValueError):
+                table.next_prime_after(999983)
+
+            # reopened from the file, rather than sieved again
+            reopened = PrimeTable.open(10**6, Path(dirname))
+            self.assertTrue(np.array_equal(reopened.primes, table.primes))
+
+
+if __name__ == "__main__":
+    unittest.main()
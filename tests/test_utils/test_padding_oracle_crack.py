@@ -1,10 +1,55 @@
-from secrets import token_urlsafe
+import asyncio
+from contextvars import ContextVar
+from pathlib import Path
+from random import Random
+from secrets import token_bytes as random_bytes, token_urlsafe
+from tempfile import TemporaryDirectory
+from typing import Sequence
 import unittest
 
-from utils.padding_oracle_crack import PaddingOracleCracker
+from cryptography.hazmat.decrepit.ciphers.algorithms import TripleDES
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from utils.padding_oracle_crack import (
+    ANSIX923Padding,
+    BoundedOracleScheduler,
+    FlatGuessOrdering,
+    ISO7816Padding,
+    OracleMetrics,
+    PaddingOracleCheckpoint,
+    PaddingOracleCracker,
+    PaddingOracleForger,
+    PaddingSchemeABC,
+    PKCS7Padding,
+    TimingPaddingOracle,
+    timed,
+)
 from utils.simple_crypto import SimpleCrypto
 
 
+class PaddedCBC:
+    def __init__(self, algorithm: algorithms.BlockCipherAlgorithm, padding_scheme: PaddingSchemeABC) -> None:
+        self.algorithm = algorithm
+        self.padding_scheme = padding_scheme
+        self.block_length = algorithm.block_size // 8
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        iv = random_bytes(self.block_length)
+        encryptor = Cipher(self.algorithm, modes.CBC(iv)).encryptor()
+        padded_plaintext = self.padding_scheme.pad(plaintext, self.block_length)
+        return iv + encryptor.update(padded_plaintext) + encryptor.finalize()
+
+    async def oracle(self, iv: bytes, ciphertext: bytes) -> bool:
+        token = iv + ciphertext
+        decryptor = Cipher(self.algorithm, modes.CBC(token[:self.block_length])).decryptor()
+        padded_plaintext = decryptor.update(token[self.block_length:]) + decryptor.finalize()
+        try:
+            self.padding_scheme.unpad(padded_plaintext, self.block_length)
+        except ValueError:
+            return False
+        return True
+
+
 class PaddingOracleCrackerTests(unittest.IsolatedAsyncioTestCase):
     crypto: SimpleCrypto
 
@@ -15,6 +60,9 @@ class PaddingOracleCrackerTests(unittest.IsolatedAsyncioTestCase):
             return False
         return True
 
+    async def batch_oracle(self, queries: Sequence[tuple[bytes, bytes]]) -> list[bool]:
+        return [await self.oracle(iv, ciphertext) for iv, ciphertext in queries]
+
     def setUp(self):
         self.crypto = SimpleCrypto()
 
@@ -30,6 +78,292 @@ class PaddingOracleCrackerTests(unittest.IsolatedAsyncioTestCase):
         round_trip_message = round_trip_plaintext.decode("utf-8")
         self.assertEqual(message, round_trip_message)
 
+    async def test_crack_with_bounded_scheduler(self):
+        in_flight = 0
+        max_in_flight = 0
+
+        async def counting_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            try:
+                await asyncio.sleep(0)
+                return await self.oracle(iv, ciphertext)
+            finally:
+                in_flight -= 1
+
+        message = token_urlsafe()
+        plaintext = message.encode("utf-8")
+        iv, ciphertext = self.crypto.encrypt(plaintext)
+        scheduler = BoundedOracleScheduler(max_in_flight=8)
+        cracker = PaddingOracleCracker(iv, ciphertext, counting_oracle, render_progress=False, scheduler=scheduler)
+        round_trip_plaintext = await cracker.crack_plaintext()
+        self.assertEqual(message, round_trip_plaintext.decode("utf-8"))
+        self.assertLessEqual(max_in_flight, 8)
+        self.assertEqual(scheduler.in_flight, 0)
+
+    async def test_plaintext_prior_reduces_queries(self):
+        query_count = 0
+
+        async def counting_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            nonlocal query_count
+            query_count += 1
+            return await self.oracle(iv, ciphertext)
+
+        message = "attack at dawn, retreat at dusk"
+        iv, ciphertext = self.crypto.encrypt(message.encode("utf-8"))
+
+        query_counts = []
+        for guess_ordering in (FlatGuessOrdering(), None):
+            query_count = 0
+            cracker = PaddingOracleCracker(
+                iv, ciphertext, counting_oracle, render_progress=False, guess_ordering=guess_ordering, wave_size=1,
+            )
+            round_trip_plaintext = await cracker.crack_plaintext()
+            self.assertEqual(message, round_trip_plaintext.decode("utf-8"))
+            query_counts.append(query_count)
+
+        flat_query_count, prior_query_count = query_counts
+        self.assertLess(prior_query_count * 4, flat_query_count)
+
+    async def test_metrics(self):
+        query_count = 0
+
+        async def counting_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            nonlocal query_count
+            query_count += 1
+            await asyncio.sleep(0)
+            return await self.oracle(iv, ciphertext)
+
+        message = token_urlsafe()
+        iv, ciphertext = self.crypto.encrypt(message.encode("utf-8"))
+        cracker = PaddingOracleCracker(iv, ciphertext, counting_oracle, render_progress=False)
+        await cracker.crack_plaintext()
+
+        metrics = cracker.metrics
+        self.assertEqual(metrics.total_queries, query_count)
+        self.assertEqual(metrics.completed_queries + metrics.cancelled_queries, query_count)
+        self.assertEqual(metrics.recovered_bytes, len(ciphertext))
+        self.assertEqual(metrics.in_flight, 0)
+        self.assertGreater(metrics.max_in_flight, 1)
+        p50, p99 = metrics.latency_percentiles(50, 99).values()
+        self.assertLessEqual(p50, p99)
+        self.assertEqual(sum(bucket.count for bucket in metrics.latency_histogram()), metrics.completed_queries)
+        with self.assertRaises(ValueError):
+            metrics.latency_percentiles(100)
+
+    async def test_metrics_are_bounded(self):
+        now = 0.0
+        metrics = OracleMetrics(clock=lambda: now)
+
+        async def oracle(iv: bytes, ciphertext: bytes) -> bool:
+            nonlocal now
+            now += 1.0
+            return True
+
+        instrumented_oracle = metrics.instrument(oracle)
+        query_count = 3 * OracleMetrics.latency_sample_size
+        for _ in range(query_count):
+            await instrumented_oracle(b"", b"")
+        self.assertEqual(len(metrics.latencies), OracleMetrics.latency_sample_size)
+        self.assertEqual(metrics.latency_percentiles(50), {50: 1.0})
+        # one query in flight for the whole time
+        self.assertEqual(metrics.mean_in_flight(), 1.0)
+
+    async def test_resume_from_checkpoint(self):
+        class Interruption(Exception):
+            pass
+
+        query_count = 0
+        query_limit = None
+
+        async def interruptible_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            nonlocal query_count
+            if query_limit is not None and query_count >= query_limit:
+                raise Interruption
+            query_count += 1
+            return await self.oracle(iv, ciphertext)
+
+        message = token_urlsafe()
+        iv, ciphertext = self.crypto.encrypt(message.encode("utf-8"))
+
+        with TemporaryDirectory() as checkpoints_dirname:
+            def make_cracker() -> PaddingOracleCracker:
+                checkpoint = PaddingOracleCheckpoint.for_ciphertext(iv, ciphertext, dirname=Path(checkpoints_dirname))
+                return PaddingOracleCracker(
+                    iv, ciphertext, interruptible_oracle, render_progress=False, checkpoint=checkpoint,
+                )
+
+            query_limit = 100
+            with self.assertRaises(BaseExceptionGroup):
+                await make_cracker().crack_plaintext()
+
+            query_limit = None
+            round_trip_plaintext = await make_cracker().crack_plaintext()
+            self.assertEqual(message, round_trip_plaintext.decode("utf-8"))
+
+            # every byte is journaled, so a further attempt issues no queries at all
+            query_count = 0
+            query_limit = 0
+            round_trip_plaintext = await make_cracker().crack_plaintext()
+            self.assertEqual(message, round_trip_plaintext.decode("utf-8"))
+
+    async def test_crack_with_batch_oracle(self):
+        batch_sizes = []
+
+        async def recording_batch_oracle(queries: Sequence[tuple[bytes, bytes]]) -> list[bool]:
+            batch_sizes.append(len(queries))
+            return await self.batch_oracle(queries)
+
+        message = token_urlsafe()
+        iv, ciphertext = self.crypto.encrypt(message.encode("utf-8"))
+        cracker = PaddingOracleCracker.from_batch_oracle(
+            iv, ciphertext, recording_batch_oracle, max_batch_size=32, render_progress=False,
+        )
+        round_trip_plaintext = await cracker.crack_plaintext()
+        self.assertEqual(message, round_trip_plaintext.decode("utf-8"))
+        self.assertLessEqual(max(batch_sizes), 32)
+        # far fewer round trips than queries
+        self.assertLess(len(batch_sizes) * 4, sum(batch_sizes))
+
+    async def test_detect_block_length_and_padding(self):
+        for algorithm in (algorithms.AES(random_bytes(16)), TripleDES(random_bytes(24))):
+            for padding_scheme in (PKCS7Padding(), ISO7816Padding(), ANSIX923Padding()):
+                cbc = PaddedCBC(algorithm, padding_scheme)
+                # one and two bytes of padding are the ambiguous cases
+                for message in ("attack at dawn!", "attack at dawn", "attack at dawn, then retreat at dusk"):
+                    with self.subTest(algorithm=algorithm.name, padding_scheme=padding_scheme.name, message=message):
+                        cracker = await PaddingOracleCracker.from_token(
+                            cbc.encrypt(message.encode("utf-8")), cbc.oracle, render_progress=False,
+                        )
+                        self.assertEqual(cracker.block_length, cbc.block_length)
+                        round_trip_plaintext = await cracker.crack_plaintext()
+                        self.assertEqual(message, round_trip_plaintext.decode("utf-8"))
+                        self.assertEqual(type(cracker.padding_scheme), type(padding_scheme))
+
+    async def test_crack_with_timing_oracle(self):
+        random = Random(0)
+        # a simulated clock, which each task (so each concurrently sampled query) sees advance only by its own requests
+        now = ContextVar("now", default=0.0)
+
+        async def request(iv: bytes, ciphertext: bytes) -> None:
+            # correctly padded queries take a millisecond longer to answer, hidden in jitter of the same magnitude
+            delay = 0.005 + random.gauss(0, 0.001)
+            if await self.oracle(iv, ciphertext):
+                delay += 0.001
+            await asyncio.sleep(0)
+            now.set(now.get() + delay)
+
+        message = "attack at dawn, retreat at dusk"
+        iv, ciphertext = self.crypto.encrypt(message.encode("utf-8"))
+        oracle = await TimingPaddingOracle.calibrated(timed(request, clock=now.get), iv, ciphertext)
+        cracker = PaddingOracleCracker(iv, ciphertext, oracle, render_progress=False)
+        round_trip_plaintext = await cracker.crack_plaintext()
+        self.assertEqual(message, round_trip_plaintext.decode("utf-8"))
+        # a fixed sample size achieving the same error rates would take around 50 samples per decision
+        self.assertLess(oracle.mean_samples_per_decision, 25)
+
+
+class BoundedOracleSchedulerTests(unittest.IsolatedAsyncioTestCase):
+    @staticmethod
+    async def succeed(iv: bytes, ciphertext: bytes) -> bool:
+        return True
+
+    async def test_window_shrinks_and_recovers(self):
+        scheduler = BoundedOracleScheduler(max_in_flight=8, backoff_base_delay=0.001)
+        limits = []
+        failure_count = 3
+
+        async def flaky_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            nonlocal failure_count
+            limits.append(scheduler.limit)
+            if failure_count > 0:
+                failure_count -= 1
+                raise ConnectionRefusedError
+            return True
+
+        self.assertTrue(await scheduler.submit(0, flaky_oracle, b"", b""))
+        # halved on each failure, down to the minimum
+        self.assertEqual(limits, [8, 4, 2, 1])
+        self.assertLess(scheduler.limit, 8)
+
+        # raised by about one per window's worth of successes
+        for _ in range(64):
+            await scheduler.submit(0, self.succeed, b"", b"")
+        self.assertEqual(scheduler.limit, 8)
+
+    async def test_gives_up_after_max_attempts(self):
+        scheduler = BoundedOracleScheduler(max_attempts=3, backoff_base_delay=0.001)
+        attempt_count = 0
+
+        async def failing_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            nonlocal attempt_count
+            attempt_count += 1
+            raise TimeoutError
+
+        with self.assertRaises(TimeoutError):
+            await scheduler.submit(0, failing_oracle, b"", b"")
+        self.assertEqual(attempt_count, 3)
+        self.assertEqual(scheduler.in_flight, 0)
+
+        async def broken_oracle(iv: bytes, ciphertext: bytes) -> bool:
+            raise ValueError
+
+        # not transient, so neither retried nor taken as a sign of congestion
+        limit = scheduler.limit
+        with self.assertRaises(ValueError):
+            await scheduler.submit(0, broken_oracle, b"", b"")
+        self.assertEqual(scheduler.limit, limit)
+
+    async def test_lanes_share_capacity(self):
+        scheduler = BoundedOracleScheduler(max_in_flight=1)
+        gate = asyncio.Event()
+        order = []
+
+        def lane_oracle(lane: str):
+            async def oracle(iv: bytes, ciphertext: bytes) -> bool:
+                await gate.wait()
+                order.append(lane)
+                return True
+
+            return scheduler.bind(lane, oracle)
+
+        # lane 'a' queues many queries before lane 'b' queues any
+        tasks = [asyncio.create_task(lane_oracle("a")(b"", b"")) for _ in range(20)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(lane_oracle("b")(b"", b"")) for _ in range(2)]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(*tasks)
+
+        # the first 'a' query was already in flight; after it, the lanes take turns
+        self.assertEqual(order[:5], ["a", "a", "b", "a", "b"])
+
+
+class PaddingOracleForgerTests(unittest.IsolatedAsyncioTestCase):
+    crypto: SimpleCrypto
+
+    async def oracle(self, iv: bytes, ciphertext: bytes) -> bool:
+        try:
+            self.crypto.decrypt(iv, ciphertext)
+        except (ValueError, AssertionError):
+            return False
+        return True
+
+    def setUp(self):
+        self.crypto = SimpleCrypto()
+
+    def tearDown(self):
+        self.crypto = None
+
+    async def test_forge(self):
+        message = '{"username": "admin", "is_admin": true}'
+        forger = PaddingOracleForger(message.encode("utf-8"), self.oracle, render_progress=False)
+        iv, ciphertext = await forger.forge()
+        self.assertEqual(ciphertext[-16:], forger.final_ciphertext_block)
+        round_trip_message = self.crypto.decrypt(iv, ciphertext).decode("utf-8")
+        self.assertEqual(message, round_trip_message)
+
 
 if __name__ == '__main__':
     unittest.main()